@@ -1,7 +1,5 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from dotenv import load_dotenv
 import os
 
@@ -9,7 +7,10 @@ import os
 load_dotenv()
 
 # --- Initialize Flask app ---
+from services.json_provider import FastJSONProvider
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)   # orjson when installed (see services/json_provider.py)
 
 CORS(app, origins=[
     "http://localhost:5173",
@@ -18,38 +19,41 @@ CORS(app, origins=[
     "https://www.buttonsai.org"
 ])
 
-# --- Google Login Configuration ---
-GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
-
+# Reject oversized request bodies before they are read (uploads are also capped in parser_service)
+app.config["MAX_CONTENT_LENGTH"] = (int(os.getenv("MAX_UPLOAD_MB", "20")) + 1) * 1024 * 1024
 
-from google.oauth2 import id_token
-from google.auth.transport import requests
-import time
+# --- Google Login ---
+from db.base import get_db
+from db.models import User
+from services.auth import verify_google_token, issue_session_token
 
 @app.route("/auth/google", methods=["POST"])
 def google_login():
-    """Handle Google Sign-In token verification."""
-    token = request.json.get("id_token")
+    """
+    Verify a Google Sign-In token (certs are cached, see services/auth.py)
+    and return our own session token for the Authorization header.
+    """
+    token = (request.json or {}).get("id_token")
 
     try:
-        idinfo = id_token.verify_oauth2_token(
-            token,
-            requests.Request(),
-            GOOGLE_CLIENT_ID,
-            clock_skew_in_seconds=5  
-        )
-        user_id = idinfo["sub"]
-        email = idinfo["email"]
-        name = idinfo.get("name", "")
-
-        return jsonify({
-            "success": True,
-            "user": {"id": user_id, "email": email, "name": name}
-        })
+        identity = verify_google_token(token)
     except Exception as e:
         print(f"[Auth Error] {e}")
         return jsonify({"success": False, "error": str(e)}), 400
 
+    db = get_db()
+    user = db.get(User, identity["id"])
+    if not user:
+        db.add(User(id=identity["id"], email=identity["email"], name=identity["name"]))
+    elif (user.email, user.name) != (identity["email"], identity["name"]):
+        user.email, user.name = identity["email"], identity["name"]
+    db.commit()
+
+    return jsonify({
+        "success": True,
+        "user": identity,
+        "token": issue_session_token(identity),
+    })
 
 
 # --- Health Check Route ---
@@ -66,16 +70,34 @@ def ping():
 
 
 # --- Database Initialization ---
-from db.base import engine
-from db.models import Base
+from db.base import engine, init_app
+from db.migrations import init_db
 
-# Automatically create tables
-Base.metadata.create_all(bind=engine)
+# Automatically create tables, then patch older databases. Every worker does
+# this on import; set AUTO_MIGRATE=0 to run `python -m db.migrations` once as a
+# release step instead.
+if os.getenv("AUTO_MIGRATE", "1") == "1":
+    init_db(engine)
+
+# One session per request, closed when the request ends (see db/base.py)
+init_app(app)
+
+# --- Request timing / profiling (see services/request_timing.py) ---
+from services.request_timing import init_request_timing
+init_request_timing(app, engine)
+
+# --- Response compression, after timing so sizes are on-the-wire (see services/compression.py) ---
+from services.compression import init_compression
+init_compression(app)
 
 # --- Register Routes ---
 from routes.class_routes import bp as classes_bp
 app.register_blueprint(classes_bp)
 
+# Pick up syllabus parse jobs queued before a restart
+from services.parse_jobs import resume_pending_jobs
+resume_pending_jobs()
+
 # ✅ Register Schedule Routes
 try:
     from routes.schedule_routes import bp as schedule_bp
@@ -92,6 +114,10 @@ try:
 except Exception as e:
     print(f"⚠️ Could not load chat routes: {e}")
 
+# --- Metrics (Prometheus text at /api/metrics) ---
+from routes.metrics_routes import bp as metrics_bp
+app.register_blueprint(metrics_bp)
+
 # --- Run the App ---
 if __name__ == "__main__":
     print("🚀 Flask backend starting on port 5000...")
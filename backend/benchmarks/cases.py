@@ -0,0 +1,406 @@
+import io
+import re
+import json
+import types
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from benchmarks.data import seed_users, synthetic_events, synthetic_schedule, synthetic_syllabus
+from benchmarks.pdf import build_pdf
+
+# ===== Benchmark cases =====
+#
+# Each case is registered with @case(group) and returns a dict:
+#   {"fn": callable, "setup": optional callable run untimed before each call,
+#    "params": dict recorded alongside the timings}
+# Imports of app modules happen inside the cases, after run.py has pointed
+# DATABASE_URL at the temporary database.
+
+CASES = {}
+
+
+def case(group):
+    def register(fn):
+        CASES[fn.__name__] = (group, fn)
+        return fn
+    return register
+
+
+class Context:
+    """Shared state for one run: the seeded DB and the size parameters."""
+
+    def __init__(self, args):
+        self.args = args
+        self._user_ids = None
+
+    @property
+    def user_ids(self):
+        if self._user_ids is None:
+            from db.base import SessionLocal
+            db = SessionLocal()
+            try:
+                a = self.args
+                self._user_ids = seed_users(db, users=a.users, classes=a.classes, meetings=a.meetings,
+                                            assignments=a.assignments, events=a.events, seed=a.seed)
+            finally:
+                db.close()
+        return self._user_ids
+
+    @property
+    def size_params(self):
+        a = self.args
+        return {"classes": a.classes, "meetings": a.meetings, "assignments": a.assignments, "events": a.events}
+
+
+def _month_window():
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=today.weekday())
+    return start, start + timedelta(days=42)
+
+
+# ----- schedule building -----
+
+def _build_case(ctx, window, cached):
+    from db.base import SessionLocal
+    from db.models import User
+    from routes.schedule_routes import _build_events_for_user
+    from services.schedule_cache import schedule_cache
+
+    user_id = ctx.user_ids[0]
+    db = SessionLocal()
+    start, end = window or (None, None)
+
+    def setup():
+        db.expire_all()
+        if not cached:
+            schedule_cache.invalidate(user_id)
+
+    def fn():
+        user = db.get(User, user_id)
+        return _build_events_for_user(user, db, start, end)
+
+    if cached:
+        fn()
+    return {"fn": fn, "setup": setup, "params": dict(ctx.size_params, window="6w" if window else "all"),
+            "teardown": db.close}
+
+
+@case("schedule")
+def build_events_full(ctx):
+    return _build_case(ctx, None, cached=False)
+
+
+@case("schedule")
+def build_events_window(ctx):
+    return _build_case(ctx, _month_window(), cached=False)
+
+
+@case("schedule")
+def build_events_cached(ctx):
+    return _build_case(ctx, None, cached=True)
+
+
+# ----- GET /api/schedule through the Flask app -----
+
+def _http_case(ctx, query, mode):
+    from app import app
+    from services.auth import issue_session_token
+    from services.schedule_cache import schedule_cache
+
+    user_id = ctx.user_ids[0]
+    client = app.test_client()
+    token = issue_session_token({"id": user_id, "email": f"{user_id}@example.edu"})
+    headers = {"Authorization": f"Bearer {token}"}
+    url = "/api/schedule" + query
+    if mode == "not_modified":
+        headers["If-None-Match"] = client.get(url, headers=headers).headers["ETag"]
+
+    def setup():
+        if mode == "cold":
+            schedule_cache.invalidate(user_id)
+
+    def fn():
+        r = client.get(url, headers=headers)
+        assert r.status_code in (200, 304), r.status_code
+        return r
+
+    return {"fn": fn, "setup": setup, "params": dict(ctx.size_params, query=query, mode=mode)}
+
+
+@case("http")
+def http_schedule_cold(ctx):
+    return _http_case(ctx, "", "cold")
+
+
+@case("http")
+def http_schedule_cached(ctx):
+    return _http_case(ctx, "", "cached")
+
+
+@case("http")
+def http_schedule_not_modified(ctx):
+    return _http_case(ctx, "", "not_modified")
+
+
+@case("http")
+def http_schedule_window_cold(ctx):
+    start, end = _month_window()
+    return _http_case(ctx, f"?start={start.date().isoformat()}&end={end.date().isoformat()}", "cold")
+
+
+# ----- conflict checks -----
+
+def _conflict_inputs(ctx):
+    existing = synthetic_events(ctx.args.conflict_events, seed=ctx.args.seed)
+    candidates = synthetic_events(ctx.args.conflict_candidates, seed=ctx.args.seed + 1)
+    return existing, [(datetime.fromisoformat(c["start"]), datetime.fromisoformat(c["end"])) for c in candidates]
+
+
+@case("conflicts")
+def is_conflict_linear(ctx):
+    from services.ai_scheduler import is_conflict
+    existing, candidates = _conflict_inputs(ctx)
+    pairs = [(s.isoformat(), e.isoformat()) for s, e in candidates]
+
+    def fn():
+        return sum(1 for s, e in pairs if is_conflict(s, e, existing))
+
+    return {"fn": fn, "params": {"existing": len(existing), "candidates": len(candidates)}}
+
+
+@case("conflicts")
+def occupancy_bitmap(ctx):
+    from services.occupancy import WeeklyOccupancy
+    existing, candidates = _conflict_inputs(ctx)
+    spans = [(datetime.fromisoformat(e["start"]), datetime.fromisoformat(e["end"])) for e in existing]
+
+    def fn():
+        occ = WeeklyOccupancy()
+        for s, e in spans:
+            occ.add_span(s, e)
+        return sum(1 for s, e in candidates if not occ.is_free(s, e))
+
+    return {"fn": fn, "params": {"existing": len(existing), "candidates": len(candidates)}}
+
+
+# ----- scheduler -----
+
+_DEADLINE_LINE = re.compile(r"^(\S+) \w+ '.*' due (\S+)$")
+
+
+class StubLLM:
+    """
+    Stands in for services.llm.llm: answers the scheduler prompt instantly
+    with a plausible plan (three 1h sessions before every deadline), so the
+    benchmark measures our own pre/post-processing, not the network.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def chat(self, route="unknown", user_id=None, timeout=None, **kwargs):
+        self.calls += 1
+        events = []
+        for line in kwargs["messages"][-1]["content"].splitlines():
+            m = _DEADLINE_LINE.match(line.strip())
+            if not m:
+                continue
+            try:
+                due = datetime.fromisoformat(m.group(2))
+            except ValueError:
+                continue
+            for back in (1, 2, 3):
+                start = (due - timedelta(days=back)).replace(hour=10 + back, minute=0, second=0)
+                events.append({
+                    "title": f"Study for {m.group(1)}",
+                    "class_code": m.group(1),
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(hours=1)).isoformat(),
+                })
+        message = types.SimpleNamespace(content=json.dumps({"events": events}))
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=None)
+
+
+@contextmanager
+def stubbed_llm():
+    import services.ai_scheduler as scheduler
+    original = scheduler.llm
+    scheduler.llm = StubLLM()
+    try:
+        yield scheduler.llm
+    finally:
+        scheduler.llm = original
+
+
+def _schedule_case(ctx, planner):
+    from db.base import SessionLocal
+    from db.models import User, Event
+    from services.ai_scheduler import ai_schedule_for_user
+
+    user_id = ctx.user_ids[0]
+    db = SessionLocal()
+    stub = stubbed_llm()
+    stub.__enter__()
+
+    def setup():
+        # Drop what the previous iteration added so every run plans from the same state
+        db.query(Event).filter_by(user_id=user_id, origin="ai", type="study").delete(synchronize_session=False)
+        db.commit()
+        db.expire_all()
+
+    def fn():
+        user = db.get(User, user_id)
+        result = ai_schedule_for_user(user, settings={"planner": planner}, db=db)
+        assert result.get("success"), result
+        return result
+
+    def teardown():
+        setup()
+        stub.__exit__(None, None, None)
+        db.close()
+
+    return {"fn": fn, "setup": setup, "teardown": teardown, "params": dict(ctx.size_params, planner=planner)}
+
+
+@case("scheduler")
+def ai_schedule_stubbed_llm(ctx):
+    return _schedule_case(ctx, "ai")
+
+
+@case("scheduler")
+def ai_schedule_local_planner(ctx):
+    return _schedule_case(ctx, "local")
+
+
+# ----- response serialization and compression -----
+
+# A five-class student, and one whose calendar is mostly AI study sessions
+SCHEDULE_PRESETS = {
+    "typical": {"classes": 5, "meetings": 3, "assignments": 10, "events": 20},
+    "heavy": {"classes": 8, "meetings": 5, "assignments": 30, "events": 300},
+}
+
+
+def _json_case(ctx, preset, fast):
+    from flask.json.provider import DefaultJSONProvider
+    from app import app
+    from services.json_provider import FastJSONProvider, orjson
+
+    if fast and orjson is None:
+        raise RuntimeError("orjson is not installed")
+    payload = synthetic_schedule(seed=ctx.args.seed, **SCHEDULE_PRESETS[preset])
+    provider = FastJSONProvider(app) if fast else DefaultJSONProvider(app)
+
+    def fn():
+        return provider.response(payload).get_data()
+
+    return {"fn": fn, "params": dict(SCHEDULE_PRESETS[preset], preset=preset,
+                                     events_out=len(payload["events"]), wire_bytes=len(fn()))}
+
+
+def _compress_case(ctx, preset, encoding):
+    from flask.json.provider import DefaultJSONProvider
+    from app import app
+    from services.compression import compress, available_encodings
+
+    if encoding not in available_encodings():
+        raise RuntimeError(f"{encoding} is not available (brotli not installed?)")
+    data = DefaultJSONProvider(app).response(
+        synthetic_schedule(seed=ctx.args.seed, **SCHEDULE_PRESETS[preset])).get_data()
+
+    def fn():
+        return compress(data, encoding)
+
+    return {"fn": fn, "params": dict(preset=preset, encoding=encoding,
+                                     raw_bytes=len(data), wire_bytes=len(fn()))}
+
+
+@case("serialize")
+def json_stdlib_typical(ctx):
+    return _json_case(ctx, "typical", fast=False)
+
+
+@case("serialize")
+def json_fast_typical(ctx):
+    return _json_case(ctx, "typical", fast=True)
+
+
+@case("serialize")
+def json_stdlib_heavy(ctx):
+    return _json_case(ctx, "heavy", fast=False)
+
+
+@case("serialize")
+def json_fast_heavy(ctx):
+    return _json_case(ctx, "heavy", fast=True)
+
+
+@case("serialize")
+def gzip_typical(ctx):
+    return _compress_case(ctx, "typical", "gzip")
+
+
+@case("serialize")
+def brotli_typical(ctx):
+    return _compress_case(ctx, "typical", "br")
+
+
+@case("serialize")
+def gzip_heavy(ctx):
+    return _compress_case(ctx, "heavy", "gzip")
+
+
+@case("serialize")
+def brotli_heavy(ctx):
+    return _compress_case(ctx, "heavy", "br")
+
+
+# ----- parsing -----
+
+@case("parser")
+def extract_meetings_large(ctx):
+    from services.ai_parser import extract_meetings_from_text
+    text = synthetic_syllabus(ctx.args.syllabus_chars, seed=ctx.args.seed)
+
+    def fn():
+        return extract_meetings_from_text(text)
+
+    return {"fn": fn, "params": {"chars": len(text)}}
+
+
+@case("parser")
+def extract_meetings_adversarial(ctx):
+    # One long line full of day names and dangling times: the worst case for a
+    # backtracking pattern, and a check that extraction stays linear.
+    from services.ai_parser import extract_meetings_from_text
+    text = ("Monday and Wednesday, see TuTh notes 9:00- " * (ctx.args.syllabus_chars // 43 + 1))[:ctx.args.syllabus_chars]
+
+    def fn():
+        return extract_meetings_from_text(text)
+
+    return {"fn": fn, "params": {"chars": len(text)}}
+
+
+def _upload_case(ctx, filename, payload):
+    from werkzeug.datastructures import FileStorage
+    from services.parser_service import extract_text_from_upload
+
+    def fn():
+        return extract_text_from_upload(FileStorage(stream=io.BytesIO(payload), filename=filename))
+
+    return {"fn": fn, "params": {"bytes": len(payload), "file": filename}}
+
+
+@case("extract")
+def extract_upload_pdf_small(ctx):
+    return _upload_case(ctx, "syllabus-small.pdf", build_pdf(synthetic_syllabus(8000, seed=ctx.args.seed)))
+
+
+@case("extract")
+def extract_upload_pdf_large(ctx):
+    # Far past the parser's character budget: measures how early extraction stops
+    return _upload_case(ctx, "syllabus-large.pdf", build_pdf(synthetic_syllabus(200000, seed=ctx.args.seed)))
+
+
+@case("extract")
+def extract_upload_txt(ctx):
+    return _upload_case(ctx, "syllabus.txt", synthetic_syllabus(200000, seed=ctx.args.seed).encode("utf-8"))
@@ -0,0 +1,165 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+# ===== Synthetic data =====
+#
+# Deterministic (seeded) users shaped like real ones: N classes, each with
+# M weekly meetings, K assignments and K custom events. Deadlines are placed
+# in the weeks after "now" so the scheduler has work to do.
+
+MEETING_SLOTS = [
+    ("Monday", "09:00", "09:50"), ("Wednesday", "09:00", "09:50"), ("Friday", "09:00", "09:50"),
+    ("Tuesday", "14:30", "15:45"), ("Thursday", "14:30", "15:45"),
+    ("Monday", "13:00", "13:50"), ("Wednesday", "16:00", "17:15"), ("Friday", "11:00", "11:50"),
+]
+MEETING_TYPES = ["Lecture", "Discussion", "Lab"]
+
+
+def current_term(now):
+    return f"{'Spring' if now.month < 7 else 'Fall'} {now.year}"
+
+
+def make_class(rng, user_id, idx, meetings, assignments, now):
+    term = current_term(now)
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "user_id": user_id,
+        "title": f"Benchmark Course {idx}",
+        "code": f"BENCH{100 + idx}",
+        "instructor": f"Prof. {idx}",
+        "term": term,
+        "meetings": [
+            {
+                "type": MEETING_TYPES[m % len(MEETING_TYPES)],
+                "day": MEETING_SLOTS[m % len(MEETING_SLOTS)][0],
+                "start_time": MEETING_SLOTS[m % len(MEETING_SLOTS)][1],
+                "end_time": MEETING_SLOTS[m % len(MEETING_SLOTS)][2],
+                "location": f"Hall {rng.randint(1, 40)}",
+            }
+            for m in range(meetings)
+        ],
+        "assignments": [
+            {
+                "title": f"Homework {a + 1}",
+                "weight": 5.0,
+                "due_date": (now + timedelta(days=3 + 4 * a + idx % 3)).strftime("%Y-%m-%d"),
+                "details": None,
+            }
+            for a in range(assignments)
+        ],
+        "exams": [
+            {"title": "Midterm", "weight": 25.0, "date": (now + timedelta(days=30 + idx)).strftime("%Y-%m-%d")},
+            {"title": "Final", "weight": 35.0, "date": (now + timedelta(days=60 + idx)).strftime("%Y-%m-%d")},
+        ],
+    }
+
+
+def seed_users(db, users=1, classes=6, meetings=3, assignments=10, events=20, seed=1234):
+    """
+    Insert synthetic users into `db` and commit. Returns their IDs.
+    Each user gets `classes` classes with `meetings` meetings and
+    `assignments` assignments each, plus `events` custom events per class.
+    """
+    from db.models import User, Class, Event
+
+    rng = random.Random(seed)
+    now = datetime.now().replace(second=0, microsecond=0)
+    user_ids = []
+    for u in range(users):
+        user_id = f"bench-user-{u}"
+        db.add(User(id=user_id, email=f"{user_id}@example.edu", name=f"Bench User {u}"))
+        for c in range(classes):
+            row = make_class(rng, user_id, c, meetings, assignments, now)
+            db.add(Class(**row))
+            for e in range(events):
+                start = (now + timedelta(days=rng.randint(-30, 90))).replace(
+                    hour=rng.randint(8, 20), minute=rng.choice([0, 30]))
+                db.add(Event(
+                    id=str(uuid.UUID(int=rng.getrandbits(128))),
+                    user_id=user_id,
+                    class_id=row["id"],
+                    title=f"Custom event {e}",
+                    start=start,
+                    end=start + timedelta(minutes=rng.choice([30, 60, 90])),
+                    type=rng.choice(["custom", "study", "assignment"]),
+                    repeat="none",
+                    origin=rng.choice(["custom", "ai"]),
+                ))
+        user_ids.append(user_id)
+    db.commit()
+    return user_ids
+
+
+def synthetic_events(count, seed=1234):
+    """Event dicts (ISO start/end) like the scheduler's conflict inputs."""
+    rng = random.Random(seed)
+    base = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    out = []
+    for _ in range(count):
+        start = base + timedelta(days=rng.randint(0, 120), hours=rng.randint(7, 21), minutes=rng.choice([0, 15, 30, 45]))
+        end = start + timedelta(minutes=rng.choice([30, 50, 75, 90]))
+        out.append({"start": start.isoformat(), "end": end.isoformat()})
+    return out
+
+
+def synthetic_schedule(classes=5, meetings=3, assignments=10, events=20, seed=1234):
+    """
+    A full-semester GET /api/schedule payload built in memory (no DB):
+    generated entries from the real builder plus `events` custom/AI events
+    per class, shaped like routes.schedule_routes.event_view().
+    """
+    from types import SimpleNamespace
+    from routes.schedule_routes import _iter_class_events, pick_class_color
+
+    rng = random.Random(seed)
+    now = datetime.now().replace(second=0, microsecond=0)
+    out = []
+    for c in range(classes):
+        row = make_class(rng, "bench-user-0", c, meetings, assignments, now)
+        out.extend(_iter_class_events(SimpleNamespace(schedule=[], **row)))
+        for e in range(events):
+            start = (now + timedelta(days=rng.randint(-30, 90))).replace(hour=rng.randint(8, 20))
+            out.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "title": f"Study for {row['code']} ({e + 1})",
+                "start": start.isoformat(),
+                "end": (start + timedelta(minutes=60)).isoformat(),
+                "type": "study",
+                "repeat": "none",
+                "origin": "ai",
+                "color": pick_class_color(row["code"]),
+                "textColor": "#ffffff",
+                "dotColor": "#9CC5A1",
+                "class": row["code"],
+            })
+    return {"events": out}
+
+
+SYLLABUS_BLOCK = """
+Course Information
+Lecture: MWF 9:00-9:50 AM in Lincoln Hall 1002
+Discussion: TuTh 2:30 - 3:45 PM at Siebel Center 1404
+Lab: Thursday 16:00-17:50 in Engineering Lab 3
+Office hours are held Monday 10-11 AM in Room 101 and by appointment.
+Homework is due every Friday at 11:59 PM on the course website. Late work loses
+10% per day. Exams cover all material from lectures, readings and labs; please
+bring a photo ID. Academic integrity violations are reported to the college.
+"""
+
+FILLER = (
+    "This paragraph of the syllabus talks about grading policies, accommodations, "
+    "attendance, and other course logistics without mentioning any meeting times. "
+)
+
+
+def synthetic_syllabus(chars, seed=1234):
+    """Roughly `chars` characters of syllabus text with meeting lines scattered through it."""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < chars:
+        chunk = SYLLABUS_BLOCK if rng.random() < 0.2 else FILLER * rng.randint(1, 6) + "\n"
+        parts.append(chunk)
+        total += len(chunk)
+    return "".join(parts)[:chars]
@@ -0,0 +1,71 @@
+# ===== Minimal PDF writer =====
+#
+# Enough of the PDF format to produce text-only sample syllabi for the
+# extraction benchmark without a PDF library: one Helvetica font, one
+# content stream per page, and a correct xref table so pdfminer reads it
+# like any other file.
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+LINE_HEIGHT = 14
+MARGIN = 54
+CHARS_PER_LINE = 90
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text, width=CHARS_PER_LINE):
+    for paragraph in text.splitlines():
+        line = ""
+        for word in paragraph.split():
+            if line and len(line) + 1 + len(word) > width:
+                yield line
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        yield line
+
+
+def _page_stream(lines):
+    y = PAGE_HEIGHT - MARGIN
+    ops = ["BT", "/F1 10 Tf", f"{LINE_HEIGHT} TL", f"{MARGIN} {y} Td"]
+    for line in lines:
+        ops.append(f"({_escape(line)}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1", errors="replace")
+
+
+def build_pdf(text):
+    """Lay `text` out over as many Letter pages as it needs; returns the PDF bytes."""
+    lines_per_page = (PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT
+    lines = list(_wrap(text))
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # 1: catalog, 2: page tree, 3: font, then (page, content) pairs
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page_lines in pages:
+        stream = _page_stream(page_lines)
+        page_num = len(objects) + 1
+        kids.append(f"{page_num} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_num + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
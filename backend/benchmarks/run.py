@@ -0,0 +1,174 @@
+"""
+Benchmark the schedule, scheduler and parser hot paths.
+
+Run from backend/:
+    python -m benchmarks.run                          # everything, default sizes
+    python -m benchmarks.run --only schedule,http     # groups or case names
+    python -m benchmarks.run --classes 12 --events 100 --out after.json
+    python -m benchmarks.run --compare before.json    # exit 1 on regressions
+
+Every run uses a fresh temporary SQLite database and a stubbed LLM, so
+results depend only on the code and the machine.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    ms = lambda s: round(s * 1000, 4)
+    return {
+        "runs": len(ordered),
+        "min_ms": ms(ordered[0]),
+        "median_ms": ms(statistics.median(ordered)),
+        "mean_ms": ms(statistics.fmean(ordered)),
+        "p95_ms": ms(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]),
+        "max_ms": ms(ordered[-1]),
+    }
+
+
+def measure(fn, setup=None, repeat=20, warmup=2, min_seconds=0.0):
+    """Time fn() `repeat` times (more if min_seconds isn't reached); setup() runs untimed before each call."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat or time.perf_counter() - started < min_seconds:
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print median ratios against a previous results file; returns the regressed case names."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["benchmarks"]
+    regressed = []
+    print(f"\n[Bench] Compared with {baseline_path} (regression if median > {threshold:.2f}x)")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before or "median_ms" not in current or not before.get("median_ms"):
+            continue
+        ratio = current["median_ms"] / before["median_ms"]
+        flag = "REGRESSED" if ratio > threshold else ""
+        print(f"  {name:<32} {before['median_ms']:>10.3f}ms -> {current['median_ms']:>10.3f}ms  {ratio:5.2f}x {flag}")
+        if ratio > threshold:
+            regressed.append(name)
+    return regressed
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--only", help="comma-separated groups or case names")
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--warmup", type=int, default=2)
+    p.add_argument("--min-seconds", type=float, default=0.0, help="keep sampling each case at least this long")
+    p.add_argument("--users", type=int, default=1)
+    p.add_argument("--classes", type=int, default=6)
+    p.add_argument("--meetings", type=int, default=3, help="weekly meetings per class")
+    p.add_argument("--assignments", type=int, default=10, help="assignments per class")
+    p.add_argument("--events", type=int, default=20, help="custom/AI events per class")
+    p.add_argument("--conflict-events", type=int, default=2000)
+    p.add_argument("--conflict-candidates", type=int, default=500)
+    p.add_argument("--syllabus-chars", type=int, default=200000)
+    p.add_argument("--seed", type=int, default=1234)
+    p.add_argument("--out", default=None, help="results file (default: benchmarks/results/<timestamp>.json)")
+    p.add_argument("--compare", help="previous results file to compare medians against")
+    p.add_argument("--verbose", action="store_true", help="show the app's own log output while timing")
+    p.add_argument("--threshold", type=float, default=1.25, help="median ratio counted as a regression")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Point the app at a throwaway database before anything imports db.base
+    workdir = tempfile.mkdtemp(prefix="buttons-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.pop("SCHEDULE_CACHE_PATH", None)
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-no-network")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from db.base import engine
+    from db.models import Base
+    from benchmarks.cases import CASES, Context
+    Base.metadata.create_all(bind=engine)
+
+    wanted = set(filter(None, (args.only or "").split(",")))
+    selected = [(name, group, build) for name, (group, build) in CASES.items()
+                if not wanted or name in wanted or group in wanted]
+    if not selected:
+        print(f"[Bench] Nothing matches --only {args.only}; cases: {', '.join(CASES)}")
+        return 2
+
+    ctx = Context(args)
+    results = {}
+    for name, group, build in selected:
+        try:
+            spec = build(ctx)
+        except Exception as e:
+            print(f"[Bench] {name}: skipped: {e}")
+            results[name] = {"group": group, "error": repr(e)}
+            continue
+        try:
+            # The code under test logs with print(); keep it out of the timings and the report
+            with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+                stats = measure(spec["fn"], spec.get("setup"), args.repeat, args.warmup, args.min_seconds)
+        except Exception as e:
+            print(f"[Bench] {name}: failed: {e!r}")
+            results[name] = {"group": group, "error": repr(e)}
+            continue
+        finally:
+            if spec.get("teardown"):
+                spec["teardown"]()
+        params = spec.get("params", {})
+        results[name] = dict(stats, group=group, params=params)
+        wire = f"  {params['wire_bytes']:>9,} bytes" if "wire_bytes" in params else ""
+        print(f"[Bench] {name:<32} median {stats['median_ms']:>10.3f}ms  p95 {stats['p95_ms']:>10.3f}ms  ({stats['runs']} runs){wire}")
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": vars(args),
+        "benchmarks": results,
+    }
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "results",
+                                   datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[Bench] Results written to {out}")
+
+    if args.compare:
+        if compare(results, args.compare, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
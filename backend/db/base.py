@@ -1,5 +1,6 @@
 import os
-from sqlalchemy import create_engine
+from flask import g
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 
@@ -7,6 +8,69 @@ load_dotenv()
 
 DB_URL = os.getenv("DATABASE_URL", "sqlite:///buttons.db")
 
-engine = create_engine(DB_URL, echo=False, future=True)
+# Connection pool (per process). SQLite files get the same pool; only
+# in-memory SQLite is left on SQLAlchemy's single-connection default.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+is_sqlite = DB_URL.startswith("sqlite")
+is_memory = is_sqlite and (DB_URL in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in DB_URL)
+
+engine_options = {"echo": False, "future": True}
+if not is_memory:
+    engine_options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+if not is_sqlite:
+    engine_options.update(pool_pre_ping=True, pool_recycle=DB_POOL_RECYCLE)
+
+engine = create_engine(DB_URL, **engine_options)
+
+
+if is_sqlite:
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, connection_record):
+        """
+        WAL lets schedule reads proceed while add_event / auto_schedule write;
+        NORMAL sync is safe under WAL; busy_timeout makes writers wait for the
+        lock instead of failing with "database is locked".
+        """
+        cursor = dbapi_conn.cursor()
+        if not is_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
+
+
+# ===== Request-scoped sessions =====
+
+def get_db():
+    """
+    The session for the current request, opened on first use and closed by
+    close_db when the app context ends. Background jobs (no request) keep
+    using SessionLocal() directly.
+    """
+    if "db" not in g:
+        g.db = SessionLocal()
+    return g.db
+
+
+def close_db(exc=None):
+    """Close the request's session (if one was opened); uncommitted work is rolled back."""
+    db = g.pop("db", None)
+    if db is not None:
+        db.close()
+
+
+def init_app(app):
+    app.teardown_appcontext(close_db)
@@ -0,0 +1,131 @@
+from datetime import datetime
+from sqlalchemy import inspect, insert, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+from db.models import Base, Class, Event
+
+# Every step here is safe to run concurrently: when several gunicorn workers
+# start at once they may all migrate, and the ones that lose a race skip
+# work that is already done instead of crashing. Deployments that would
+# rather migrate once can set AUTO_MIGRATE=0 and run
+#     python -m db.migrations
+# as a release step.
+
+# (table, column, DDL type) added after the table first shipped.
+# create_all() never alters existing tables, so these are applied by hand.
+ADDED_COLUMNS = [
+    ("users", "schedule_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("parse_jobs", "worker_id", "VARCHAR"),
+    ("users", "feed_nonce", "VARCHAR"),
+]
+
+
+def init_db(engine):
+    """Create missing tables, then patch older databases."""
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+
+def _add_column(engine, table, column, ddl):
+    """ALTER TABLE ... ADD COLUMN, tolerating another process having just added it."""
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    except (OperationalError, ProgrammingError):
+        if column not in {c["name"] for c in inspect(engine).get_columns(table)}:
+            raise
+        return
+    print(f"[DB] Added column {table}.{column}")
+
+
+def run_migrations(engine):
+    """Bring an existing database up to the current models. Safe to run on every start."""
+    insp = inspect(engine)
+    tables = set(insp.get_table_names())
+    for table, column, ddl in ADDED_COLUMNS:
+        if table not in tables:
+            continue
+        existing = {c["name"] for c in insp.get_columns(table)}
+        if column not in existing:
+            _add_column(engine, table, column, ddl)
+
+    migrate_custom_events(engine)
+
+
+def _to_datetime(value):
+    s = (value or "").strip()
+    if not s:
+        return None
+    if "T" not in s:
+        s = f"{s}T09:00"
+    for candidate in (s, s[:16]):
+        try:
+            return datetime.fromisoformat(candidate).replace(tzinfo=None, microsecond=0)
+        except ValueError:
+            continue
+    return None
+
+
+def _insert_events(db, rows):
+    """Insert event rows, skipping ids that already exist (e.g. written by another worker)."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(Event).values(rows)
+        return db.execute(stmt.on_conflict_do_nothing(index_elements=["id"])).rowcount
+    written = 0
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.execute(insert(Event).values(row))
+            written += 1
+        except IntegrityError:
+            pass
+    return written
+
+
+def migrate_custom_events(engine):
+    """
+    One-time move of Class.custom_events JSON into the events table.
+    Each class's blob is emptied once its rows are written, so re-running is a no-op.
+    """
+    with Session(engine) as db:
+        pending = [c for c in db.query(Class).filter(Class.custom_events.isnot(None)).all()
+                   if c.custom_events]
+        if not pending:
+            return
+
+        seen = set()
+        rows = []
+        skipped = 0
+        for c in pending:
+            for ce in c.custom_events:
+                start = _to_datetime(ce.get("start"))
+                eid = ce.get("id")
+                if not eid or eid in seen or start is None or not c.user_id:
+                    skipped += 1
+                    continue
+                seen.add(eid)
+                rows.append({
+                    "id": eid,
+                    "user_id": c.user_id,
+                    "class_id": c.id,
+                    "title": ce.get("title"),
+                    "start": start,
+                    "end": _to_datetime(ce.get("end")),
+                    "type": ce.get("type") or "custom",
+                    "repeat": ce.get("repeat") or "none",
+                    "origin": ce.get("origin") or "custom",
+                })
+            c.custom_events = []
+
+        moved = sum(_insert_events(db, rows[i:i + 500]) for i in range(0, len(rows), 500))
+        db.commit()
+        print(f"[DB] Migrated {moved} custom events into the events table "
+              f"({skipped} skipped, {len(rows) - moved} already present).")
+
+
+if __name__ == "__main__":
+    from db.base import engine
+    init_db(engine)
+    print("[DB] Migrations complete.")
@@ -1,13 +1,24 @@
-from sqlalchemy import Column, String, Text, ForeignKey, JSON
+from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey, JSON, Index
+from datetime import datetime, timezone
 from sqlalchemy.orm import relationship
 from db.base import Base
 
+
+def utcnow():
+    """Current UTC time as a naive datetime, which is how DateTime columns store timestamps."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class User(Base):
     __tablename__ = "users"
 
     id = Column(String, primary_key=True)
     email = Column(String, index=True)
     name = Column(String)
+    # Bumped on every write to the user's classes/events; drives schedule ETags
+    schedule_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Signed into calendar feed URLs; replacing it revokes every URL issued so far
+    feed_nonce = Column(String)
     classes = relationship("Class", back_populates="owner", cascade="all, delete-orphan")
 
 
@@ -29,7 +40,71 @@ class Class(Base):
     exams = Column(JSON, default=list)      
     schedule = Column(JSON, default=list)  
 
-
+    # Legacy: custom/AI events used to live here. db.migrations moves them
+    # into the events table on startup; new code reads and writes Event rows.
     custom_events = Column(JSON, default=list) 
 
     owner = relationship("User", back_populates="classes")
+    events = relationship("Event", back_populates="owner_class", cascade="all, delete-orphan",
+                          order_by="Event.start")
+
+
+class Event(Base):
+    """A user-added or AI-scheduled calendar entry attached to one class."""
+    __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_user_start", "user_id", "start"),
+    )
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    class_id = Column(String, ForeignKey("classes.id", ondelete="CASCADE"), nullable=False, index=True)
+    title = Column(String)
+    start = Column(DateTime, nullable=False)
+    end = Column(DateTime)
+    type = Column(String, default="custom")
+    repeat = Column(String, default="none")
+    origin = Column(String, default="custom")
+
+    owner_class = relationship("Class", back_populates="events")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "start": self.start.isoformat() if self.start else None,
+            "end": self.end.isoformat() if self.end else None,
+            "type": self.type or "custom",
+            "repeat": self.repeat or "none",
+            "origin": self.origin or "custom",
+        }
+
+
+class ParseCache(Base):
+    """Syllabus parse results keyed by a hash of the extracted text + parser version."""
+    __tablename__ = "parse_cache"
+
+    key = Column(String(64), primary_key=True)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
+    last_used_at = Column(DateTime, nullable=False, index=True)
+    hits = Column(Integer, nullable=False, default=0)
+
+
+class ParseJob(Base):
+    """A queued syllabus upload being extracted and parsed in the background."""
+    __tablename__ = "parse_jobs"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    filename = Column(String)
+    upload_path = Column(String)
+    status = Column(String, nullable=False, default="queued")   # queued | running | done | failed
+    stage = Column(String)                                      # extracting | parsing
+    worker_id = Column(String)                                  # host:pid:boot of the process running it
+    progress = Column(Integer, nullable=False, default=0)
+    result = Column(JSON)
+    cached = Column(Boolean, nullable=False, default=False)
+    error = Column(Text)
+    created_at = Column(DateTime, nullable=False, index=True)
+    updated_at = Column(DateTime, nullable=False)
@@ -0,0 +1,29 @@
+from sqlalchemy.orm import load_only
+from db.models import Class
+
+# ===== Shared read queries =====
+#
+# The schedule builder and the scheduler only need a handful of columns per
+# class. Loading them with one projected query (instead of walking
+# user.classes and refreshing each row) keeps the number of round-trips per
+# request constant however many classes the user has.
+
+SCHEDULE_COLUMNS = (
+    Class.id, Class.user_id, Class.code, Class.title, Class.term,
+    Class.meetings, Class.assignments, Class.exams,
+)
+
+
+def load_schedule_classes(db, user_id):
+    """
+    All of a user's classes with just the columns needed to build a schedule,
+    in a single SELECT. Rows already in the session are overwritten with the
+    database values, which is what the old per-class db.refresh() was for.
+    """
+    return (
+        db.query(Class)
+        .options(load_only(*SCHEDULE_COLUMNS))
+        .filter(Class.user_id == user_id)
+        .populate_existing()
+        .all()
+    )
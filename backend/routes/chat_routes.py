@@ -1,34 +1,85 @@
-import os, json
-from flask import Blueprint, request, jsonify
-from db.base import SessionLocal
-from db.models import User, Class
-from openai import OpenAI
-from routes.schedule_routes import _build_events_for_user
+import json
+from flask import Blueprint, Response, request, jsonify
+from db.base import get_db, close_db
+from services.chat_context import load_chat_rows, build_chat_context
+from services.relevance import check_relevance
+from services.llm import llm, LLMError
+from services.auth import current_user_id
 
 bp = Blueprint("chat", __name__, url_prefix="/api/chat")
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+RELEVANCE_PROMPT = (
+    "You are a strict filter for a class/schedule assistant. "
+    "The student may ask any question. Your job is to respond ONLY with 'yes' or 'no' "
+    "to indicate whether the question is about their courses, instructors, "
+    "assignments, exams, meetings, or schedule/times. "
+    "If it’s not clearly related to those, answer 'no'."
+)
 
-def get_current_user(db):
-    uid = request.headers.get("X-User-Id")
-    email = request.headers.get("X-User-Email")
-    name = request.headers.get("X-User-Name", "")
-    if not uid:
-        return None
-    user = db.get(User, uid)
-    if not user:
-        user = User(id=uid, email=email, name=name)
-        db.add(user)
-        db.commit()
-    return user
+
+def llm_relevance_check(user_msg, user_id=None):
+    """Fallback yes/no relevance call for messages the local classifier can't decide."""
+    relevance_check = llm.chat(
+        route="chat.relevance",
+        user_id=user_id,
+        timeout=10,
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": RELEVANCE_PROMPT},
+            {"role": "user", "content": user_msg},
+        ],
+        max_tokens=5,
+    )
+    return relevance_check.choices[0].message.content.strip().lower().startswith("y")
+
+
+OFF_TOPIC_REPLY = "❌ I can only answer questions related to your classes, assignments, exams, or schedule."
+
+SYSTEM_PROMPT = (
+    "You are a helpful academic assistant. You must only use the provided data "
+    "about this student’s classes, assignments, exams, and schedule. "
+    "Answer clearly and concisely. If the information doesn’t exist, say so politely."
+)
+
+
+def _prepare_chat(db, user_id, user_msg):
+    """
+    Run the relevance check and build the answer prompt.
+    Returns (refusal, messages): refusal is the canned reply for off-topic
+    questions (messages is then None), otherwise None plus the chat messages.
+    """
+    print(f"[Chat AI] User asked: {user_msg}")
+
+    rows = load_chat_rows(db, user_id)
+
+    # --- Step 1: Relevance Check (cache / local classifier, LLM only when unsure) ---
+    relevant, source = check_relevance(user_msg, rows, lambda msg: llm_relevance_check(msg, user_id))
+    print(f"[Chat AI] Relevance detected: {'yes' if relevant else 'no'} (via {source})")
+
+    if not relevant:
+        return OFF_TOPIC_REPLY, None
+
+    # --- Step 2: Context (counts and summaries straight from the class rows) ---
+    context = build_chat_context(rows)
+
+    return None, [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Data: {json.dumps(context)}"},
+        {"role": "user", "content": user_msg},
+    ]
+
+
+def sse(event, data):
+    """One Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 @bp.post("")
 def chat_with_ai():
-    db = SessionLocal()
+    db = get_db()
     try:
-        user = get_current_user(db)
-        if not user:
+        user_id = current_user_id()
+        if not user_id:
             return jsonify({"error": "Unauthorized"}), 401
 
         payload = request.json or {}
@@ -36,81 +87,93 @@ def chat_with_ai():
         if not user_msg:
             return jsonify({"error": "Empty message"}), 400
 
-        print(f"[Chat AI] User asked: {user_msg}")
-
-        # --- Step 1: Relevance Check ---
-        relevance_prompt = (
-            "You are a strict filter for a class/schedule assistant. "
-            "The student may ask any question. Your job is to respond ONLY with 'yes' or 'no' "
-            "to indicate whether the question is about their courses, instructors, "
-            "assignments, exams, meetings, or schedule/times. "
-            "If it’s not clearly related to those, answer 'no'."
-        )
-
-        relevance_check = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": relevance_prompt},
-                {"role": "user", "content": user_msg},
-            ],
-            max_tokens=5,
-        )
-
-        relevance_answer = (
-            relevance_check.choices[0].message.content.strip().lower()
-        )
-        print(f"[Chat AI] Relevance detected: {relevance_answer}")
-
-        if not relevance_answer.startswith("y"):
-            return jsonify({
-                "reply": "❌ I can only answer questions related to your classes, assignments, exams, or schedule."
-            })
-
-        # --- Step 2: Context and Real Answer ---
-        classes = db.query(Class).filter_by(user_id=user.id).all()
-        events = _build_events_for_user(user, db)
-
-        context = {
-            "classes_summary": [
-                {
-                    "title": c.title,
-                    "code": c.code,
-                    "instructor": c.instructor,
-                    "assignments": [
-                        {"title": a.get("title"), "due_date": a.get("due_date")}
-                        for a in (c.assignments or [])
-                    ],
-                    "exams": [
-                        {"title": e.get("title"), "date": e.get("date")}
-                        for e in (c.exams or [])
-                    ],
-                }
-                for c in classes
-            ],
-            "events_count": len(events),
-        }
-
-        system_prompt = (
-            "You are a helpful academic assistant. You must only use the provided data "
-            "about this student’s classes, assignments, exams, and schedule. "
-            "Answer clearly and concisely. If the information doesn’t exist, say so politely."
-        )
+        refusal, messages = _prepare_chat(db, user_id, user_msg)
+        if refusal:
+            return jsonify({"reply": refusal})
 
-        response = client.chat.completions.create(
+        # --- Step 3: Real Answer ---
+        response = llm.chat(
+            route="chat",
+            user_id=user_id,
             model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Data: {json.dumps(context)}"},
-                {"role": "user", "content": user_msg},
-            ],
+            messages=messages,
             max_tokens=300,
         )
 
         reply = response.choices[0].message.content.strip()
         return jsonify({"reply": reply})
 
+    except LLMError as e:
+        print("[Chat AI Error]", e)
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        print("[Chat AI Error]", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.post("/stream")
+def chat_stream():
+    """
+    Same as POST /api/chat, but the reply is streamed as Server-Sent Events:
+    `token` frames with {"text"} as they arrive, then `done` (or `error`).
+    If the client disconnects, the upstream completion is closed so it stops
+    generating tokens.
+    """
+    db = get_db()
+    try:
+        user_id = current_user_id()
+        if not user_id:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        payload = request.json or {}
+        user_msg = payload.get("message", "").strip()
+        if not user_msg:
+            return jsonify({"error": "Empty message"}), 400
+
+        refusal, messages = _prepare_chat(db, user_id, user_msg)
+    except LLMError as e:
+        print("[Chat AI Error]", e)
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         print("[Chat AI Error]", e)
         return jsonify({"error": str(e)}), 500
     finally:
-        db.close()
+        # Everything below only talks to OpenAI; don't hold a DB connection while streaming
+        close_db()
+
+    def generate():
+        if refusal:
+            yield sse("token", {"text": refusal})
+            yield sse("done", {})
+            return
+
+        stream = None
+        finished = False
+        try:
+            stream = llm.stream_chat(
+                route="chat.stream",
+                user_id=user_id,
+                model="gpt-4o-mini",
+                messages=messages,
+                max_tokens=300,
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield sse("token", {"text": delta})
+            finished = True
+            yield sse("done", {})
+        except GeneratorExit:
+            print("[Chat AI] Client disconnected; cancelling completion.")
+            raise
+        except Exception as e:
+            print("[Chat AI Stream Error]", e)
+            yield sse("error", {"error": str(e)})
+        finally:
+            if stream is not None and not finished:
+                stream.close()
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
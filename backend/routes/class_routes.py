@@ -1,26 +1,17 @@
 import uuid
+from datetime import datetime
 from flask import Blueprint, request, jsonify
-from db.base import SessionLocal
-from db.models import User, Class
-from services.parser_service import extract_text_from_upload
-from services.ai_parser import parse_with_ai
+from sqlalchemy.orm import selectinload, load_only
+from db.base import get_db
+from db.models import Class, Event, ParseJob
+from services.parser_service import UploadRejected
+from services.parse_jobs import submit_parse_job, job_view, fail_if_orphaned
+from services.schedule_cache import schedule_cache
+from services.versioning import bump_schedule_version, schedule_etag, conditional_json
+from services.auth import get_current_user, current_user_id
 
 bp = Blueprint("classes", __name__, url_prefix="/api")
 
-def get_current_user(db):
-    uid = request.headers.get("X-User-Id")
-    email = request.headers.get("X-User-Email")
-    name = request.headers.get("X-User-Name", "")
-    if not uid:
-        return None
-    user = db.get(User, uid)
-    if not user:
-        user = User(id=uid, email=email, name=name)
-        db.add(user)
-        db.commit()
-    return user
-
-
 def pick_class_color(seed: str) -> str:
     palette = [
         "#216869", "#49A078", "#74C0FC", "#FFD43B",
@@ -30,141 +21,261 @@ def pick_class_color(seed: str) -> str:
     return palette[h % len(palette)]
 
 
+def _to_datetime(value):
+    try:
+        return datetime.fromisoformat((value or "").strip()).replace(tzinfo=None, microsecond=0)
+    except ValueError:
+        return None
+
+
+def sync_class_events(cls, incoming):
+    """
+    Make a class's Event rows match the list the Edit modal sent back:
+    update rows it kept, add new ones, drop the ones it removed. Only ids
+    of this class's own events are reused; new rows always get a fresh id.
+    """
+    existing = {ev.id: ev for ev in cls.events}
+    keep = set()
+    for item in incoming:
+        start = _to_datetime(item.get("start"))
+        if start is None:
+            continue
+        ev = existing.get(item.get("id"))
+        if ev is None:
+            ev = Event(id=str(uuid.uuid4()), user_id=cls.user_id, class_id=cls.id)
+            cls.events.append(ev)
+        ev.title = item.get("title", ev.title)
+        ev.start = start
+        ev.end = _to_datetime(item.get("end"))
+        ev.type = item.get("type") or ev.type or "custom"
+        ev.repeat = item.get("repeat") or ev.repeat or "none"
+        ev.origin = item.get("origin") or ev.origin or "custom"
+        keep.add(ev.id)
+    for eid, ev in existing.items():
+        if eid not in keep:
+            cls.events.remove(ev)
+
+
 @bp.post("/classes/parse")
 def parse_class():
-    db = SessionLocal()
+    """Queue a syllabus for background parsing; poll GET /classes/parse/<job_id> for the draft."""
+    db = get_db()
+    user_id = current_user_id()
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    if "file" not in request.files:
+        return jsonify({"error": "No file uploaded"}), 400
+
     try:
-        user = get_current_user(db)
-        if not user:
-            return jsonify({"error": "Unauthorized"}), 401
-        if "file" not in request.files:
-            return jsonify({"error": "No file uploaded"}), 400
+        job = submit_parse_job(db, user_id, request.files["file"])
+    except UploadRejected as e:
+        return jsonify({"error": str(e)}), e.status
+    return jsonify(job_view(job)), 202
+
 
-        f = request.files["file"]
-        text = extract_text_from_upload(f)
-        parsed = parse_with_ai(text)
-        return jsonify({"draft": parsed})
-    finally:
-        db.close()
+@bp.get("/classes/parse/<job_id>")
+def parse_status(job_id):
+    db = get_db()
+    user_id = current_user_id()
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    job = db.query(ParseJob).filter_by(id=job_id, user_id=user_id).first()
+    if not job:
+        return jsonify({"error": "Parse job not found"}), 404
+    return jsonify(job_view(fail_if_orphaned(db, job)))
 
 
 @bp.post("/classes")
 def create_class():
-    db = SessionLocal()
-    try:
-        user = get_current_user(db)
-        if not user:
-            return jsonify({"error": "Unauthorized"}), 401
-
-        data = request.json or {}
-        class_id = str(uuid.uuid4())
-
-        new_class = Class(
-            id=class_id,
-            user_id=user.id,
-            title=data.get("title"),
-            code=data.get("code"),
-            instructor=data.get("instructor"),
-            term=data.get("term"),
-            notes=data.get("notes"),
-            grading_policy=data.get("grading_policy"),
-            meetings=data.get("meetings", []),
-            assignments=data.get("assignments", []),
-            exams=data.get("exams", []),
-            schedule=data.get("schedule", [])
-        )
-
-        db.add(new_class)
-        db.commit()
-        return jsonify({"success": True, "id": class_id})
-    finally:
-        db.close()
+    db = get_db()
+    user_id = current_user_id()
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.json or {}
+    class_id = str(uuid.uuid4())
+
+    new_class = Class(
+        id=class_id,
+        user_id=user_id,
+        title=data.get("title"),
+        code=data.get("code"),
+        instructor=data.get("instructor"),
+        term=data.get("term"),
+        notes=data.get("notes"),
+        grading_policy=data.get("grading_policy"),
+        meetings=data.get("meetings", []),
+        assignments=data.get("assignments", []),
+        exams=data.get("exams", []),
+        schedule=data.get("schedule", [])
+    )
+
+    db.add(new_class)
+    bump_schedule_version(db, user_id)
+    db.commit()
+    schedule_cache.invalidate(user_id)
+    return jsonify({"success": True, "id": class_id})
+
+
+# ===== Class representations =====
+#
+# GET /api/classes returns full classes by default (the Edit modal's shape).
+# Lists that only show names ask for ?summary=1 or ?fields=a,b,c, and only
+# the columns behind those fields are read: the JSON blobs, notes and the
+# events relationship stay unloaded unless a requested field needs them.
+
+# field -> Class columns it is built from
+CLASS_FIELDS = {
+    "id": (Class.id,),
+    "title": (Class.title,),
+    "code": (Class.code,),
+    "instructor": (Class.instructor,),
+    "term": (Class.term,),
+    "notes": (Class.notes,),
+    "grading_policy": (Class.grading_policy,),
+    "meetings": (Class.meetings,),
+    "assignments": (Class.assignments,),
+    "exams": (Class.exams,),
+    "schedule": (Class.schedule,),
+    "custom_events": (),            # Event rows, see class_query
+    "color": (Class.code, Class.title),
+}
+SUMMARY_FIELDS = ("id", "title", "code", "instructor", "term", "color")
+
+
+def requested_fields(args):
+    """
+    Field list from ?fields= / ?summary=, or None for the full class.
+    Raises ValueError naming any unknown field.
+    """
+    if args.get("fields"):
+        names = [f.strip() for f in args["fields"].split(",") if f.strip()]
+        unknown = [f for f in names if f not in CLASS_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        return ["id"] + [f for f in dict.fromkeys(names) if f != "id"]
+    if args.get("summary", "").lower() in ("1", "true", "yes"):
+        return list(SUMMARY_FIELDS)
+    return None
+
+
+def class_query(db, user_id, fields):
+    """Query for the user's classes that loads only what `fields` needs."""
+    fields = fields or list(CLASS_FIELDS)
+    columns = {col for f in fields for col in CLASS_FIELDS[f]} | {Class.id}
+    q = db.query(Class).options(load_only(*columns)).filter_by(user_id=user_id)
+    if "custom_events" in fields:
+        q = q.options(selectinload(Class.events))
+    return q
+
+
+def class_view(c, fields=None):
+    """JSON dict for a class with just `fields` (all of CLASS_FIELDS when None)."""
+    out = {}
+    for f in fields or CLASS_FIELDS:
+        if f == "custom_events":
+            out[f] = [ev.to_dict() for ev in c.events]
+        elif f == "color":
+            out[f] = pick_class_color(c.code or c.title or "")
+        elif f in ("meetings", "assignments", "exams", "schedule"):
+            out[f] = getattr(c, f) or []
+        else:
+            out[f] = getattr(c, f)
+    return out
 
 
 @bp.get("/classes")
 def list_classes():
     """
     Returns all classes for the logged-in user.
-    Includes full class data (meetings, assignments, exams, etc.)
-    so the Edit modal can prefill properly.
+    Full class data by default; ?summary=1 for the dashboard cards
+    (id, title, code, instructor, term, color) or ?fields=id,code,...
+    for any other subset.
     """
-    db = SessionLocal()
+    db = get_db()
+    user = get_current_user(db)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        fields = requested_fields(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def build():
+        classes = class_query(db, user.id, fields).all()
+        return {"classes": [class_view(c, fields) for c in classes]}
+
+    etag = schedule_etag(user, "classes", ",".join(fields) if fields else "full")
+    return conditional_json(etag, build)
+
+
+@bp.get("/classes/<class_id>")
+def get_class(class_id):
+    """One class in full (what the Edit modal prefills from); ?fields= works here too."""
+    db = get_db()
+    user_id = current_user_id()
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
     try:
-        user = get_current_user(db)
-        if not user:
-            return jsonify({"error": "Unauthorized"}), 401
-
-        classes = db.query(Class).filter_by(user_id=user.id).all()
-        out = []
-        for c in classes:
-            label = c.code or c.title or ""
-            out.append({
-                "id": c.id,
-                "title": c.title,
-                "code": c.code,
-                "instructor": c.instructor,
-                "term": c.term,
-                "notes": c.notes,
-                "grading_policy": c.grading_policy,
-                "meetings": c.meetings or [],
-                "assignments": c.assignments or [],
-                "exams": c.exams or [],
-                "schedule": c.schedule or [],
-                "custom_events": c.custom_events or [],
-                "color": pick_class_color(label),
-            })
-        return jsonify({"classes": out})
-    finally:
-        db.close()
+        fields = requested_fields(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cls = class_query(db, user_id, fields).filter(Class.id == class_id).first()
+    if not cls:
+        return jsonify({"error": "Class not found"}), 404
+    return jsonify(class_view(cls, fields))
 
 
 @bp.delete("/classes/<class_id>")
 def delete_class(class_id):
-    db = SessionLocal()
-    try:
-        user = get_current_user(db)
-        if not user:
-            return jsonify({"error": "Unauthorized"}), 401
+    db = get_db()
+    user_id = current_user_id()
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
 
-        cls = db.query(Class).filter_by(id=class_id, user_id=user.id).first()
-        if not cls:
-            return jsonify({"error": "Class not found"}), 404
+    cls = db.query(Class).filter_by(id=class_id, user_id=user_id).first()
+    if not cls:
+        return jsonify({"error": "Class not found"}), 404
 
-        db.delete(cls)
-        db.commit()
-        return jsonify({"success": True})
-    finally:
-        db.close()
+    db.delete(cls)
+    bump_schedule_version(db, user_id)
+    db.commit()
+    schedule_cache.invalidate(user_id)
+    return jsonify({"success": True})
 
 
 @bp.put("/classes/<class_id>")
 def update_class(class_id):
-    db = SessionLocal()
-    try:
-        user = get_current_user(db)
-        if not user:
-            return jsonify({"error": "Unauthorized"}), 401
-
-        data = request.json or {}
-        cls = db.query(Class).filter_by(id=class_id, user_id=user.id).first()
-        if not cls:
-            return jsonify({"error": "Class not found"}), 404
-
-        # Update all editable fields
-        cls.title = data.get("title", cls.title)
-        cls.code = data.get("code", cls.code)
-        cls.instructor = data.get("instructor", cls.instructor)
-        cls.term = data.get("term", cls.term)
-        cls.notes = data.get("notes", cls.notes)
-        cls.grading_policy = data.get("grading_policy", cls.grading_policy)
-        cls.meetings = data.get("meetings", cls.meetings)
-        cls.assignments = data.get("assignments", cls.assignments)
-        cls.exams = data.get("exams", cls.exams)
-        cls.schedule = data.get("schedule", cls.schedule)
-        cls.custom_events = data.get("custom_events", cls.custom_events)
-
-        db.commit()
-        db.refresh(cls)
-        return jsonify({"success": True, "updated": class_id})
-    finally:
-        db.close()
+    db = get_db()
+    user_id = current_user_id()
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.json or {}
+    cls = db.query(Class).filter_by(id=class_id, user_id=user_id).first()
+    if not cls:
+        return jsonify({"error": "Class not found"}), 404
+
+    # Update all editable fields
+    cls.title = data.get("title", cls.title)
+    cls.code = data.get("code", cls.code)
+    cls.instructor = data.get("instructor", cls.instructor)
+    cls.term = data.get("term", cls.term)
+    cls.notes = data.get("notes", cls.notes)
+    cls.grading_policy = data.get("grading_policy", cls.grading_policy)
+    cls.meetings = data.get("meetings", cls.meetings)
+    cls.assignments = data.get("assignments", cls.assignments)
+    cls.exams = data.get("exams", cls.exams)
+    cls.schedule = data.get("schedule", cls.schedule)
+    if "custom_events" in data:
+        sync_class_events(cls, data.get("custom_events") or [])
+
+    bump_schedule_version(db, user_id)
+    db.commit()
+    schedule_cache.invalidate(user_id)
+    db.refresh(cls)
+    return jsonify({"success": True, "updated": class_id})
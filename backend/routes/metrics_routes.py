@@ -0,0 +1,52 @@
+import os
+import hmac
+from flask import Blueprint, Response, request, jsonify
+from services.metrics import registry
+from services.schedule_cache import schedule_cache
+from services.llm import llm
+
+bp = Blueprint("metrics", __name__, url_prefix="/api/metrics")
+
+# Shared secret for the scraper: Authorization: Bearer <METRICS_TOKEN>.
+# The endpoint is off (404) until it is set.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+BREAKER_STATES = ("closed", "half_open", "open")
+
+
+@registry.collector
+def schedule_cache_metrics():
+    stats = schedule_cache.stats()
+    return [
+        ("schedule_cache_lookups_total", "counter", "Schedule cache lookups by result.", [
+            ({"result": "hit"}, stats["hits"]),
+            ({"result": "shared_hit"}, stats["shared_hits"]),
+            ({"result": "miss"}, stats["misses"]),
+        ]),
+        ("schedule_cache_invalidations_total", "counter", "Per-user schedule cache invalidations.", [
+            ({}, stats["invalidations"]),
+        ]),
+        ("schedule_cache_users", "gauge", "Users with windows held in the in-process tier.", [
+            ({}, stats["users"]),
+        ]),
+    ]
+
+
+@registry.collector
+def llm_breaker_metrics():
+    state = llm.breaker.state
+    return [
+        ("llm_breaker_state", "gauge", "1 for the circuit breaker's current state.", [
+            ({"state": s}, 1 if s == state else 0) for s in BREAKER_STATES
+        ]),
+    ]
+
+
+@bp.get("")
+def metrics():
+    """Prometheus text exposition of this worker's counters and histograms."""
+    if not METRICS_TOKEN:
+        return jsonify({"error": "Metrics are disabled (METRICS_TOKEN is not set)"}), 404
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        return jsonify({"error": "Unauthorized"}), 401
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
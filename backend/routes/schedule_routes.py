@@ -1,91 +1,23 @@
 import uuid
 from datetime import datetime, timedelta
-from flask import Blueprint, request, jsonify
-from db.base import SessionLocal
-from db.models import User, Class
+from flask import Blueprint, Response, request, jsonify, make_response, url_for
+from sqlalchemy import or_
+from db.base import get_db, close_db
+from db.models import User, Class, Event
+from db.queries import load_schedule_classes
 from services.ai_scheduler import ai_schedule_for_user
+from services.calendar_utils import WEEKDAYS, term_dates, normalize_day, normalize_date, ensure_iso_datetime, parse_clock
+from services.ics import vevent, weekly_rrule, iter_calendar, utc_stamp
+from services.schedule_cache import schedule_cache
+from services.versioning import stable_event_id, bump_schedule_version, schedule_etag, conditional_json
+from services.auth import (
+    get_current_user, current_user_id, issue_feed_token, read_feed_token, feed_token_valid, rotate_feed_nonce,
+)
 
 bp = Blueprint("schedule", __name__, url_prefix="/api/schedule")
 
 # ----------------- Helpers -----------------
 
-def get_current_user(db):
-    uid = request.headers.get("X-User-Id")
-    email = request.headers.get("X-User-Email")
-    name = request.headers.get("X-User-Name", "")
-    if not uid:
-        return None
-    user = db.get(User, uid)
-    if not user:
-        user = User(id=uid, email=email, name=name)
-        db.add(user)
-        db.commit()
-    return user
-
-
-def term_dates(term_str):
-    if not term_str:
-        return None, None
-    term = term_str.lower()
-    year = "".join([c for c in term if c.isdigit()]) or str(datetime.now().year)
-    if "spring" in term:
-        start = datetime(int(year), 1, 15)
-        end = datetime(int(year), 5, 15)
-    elif "fall" in term:
-        start = datetime(int(year), 8, 15)
-        end = datetime(int(year), 12, 15)
-    else:
-        start = datetime(int(year), 1, 1)
-        end = datetime(int(year), 12, 31)
-    return start, end
-
-
-def normalize_date(date_str, default_year):
-    """Accepts 'YYYY-MM-DD', 'MM/DD', or ISO; returns same (ISO preserved)."""
-    try:
-        s = (date_str or "").strip()
-        if "T" in s:
-            return s
-        if "-" in s and len(s) >= 8:
-            return s
-        if "/" in s:
-            m, d = s.split("/")
-            return f"{default_year}-{int(m):02d}-{int(d):02d}"
-    except Exception:
-        pass
-    return date_str
-
-
-def normalize_day(day_str):
-    if not day_str:
-        return None
-    d = day_str.strip().lower()
-    mapping = {
-        "m": "monday", "mon": "monday", "monday": "monday",
-        "t": "tuesday", "tue": "tuesday", "tuesday": "tuesday",
-        "w": "wednesday", "wed": "wednesday", "wednesday": "wednesday",
-        "th": "thursday", "thu": "thursday", "thursday": "thursday",
-        "f": "friday", "fri": "friday", "friday": "friday",
-        "s": "saturday", "sat": "saturday", "saturday": "saturday",
-        "su": "sunday", "sun": "sunday", "sunday": "sunday"
-    }
-    return mapping.get(d)
-
-
-def ensure_iso_datetime(value: str) -> str:
-    """Ensure consistent ISO format; date-only becomes 09:00 local."""
-    if not value:
-        return value
-    s = value.strip()
-    if "T" in s:
-        try:
-            dt = datetime.fromisoformat(s)
-            return dt.replace(microsecond=0).isoformat()
-        except Exception:
-            return s[:16]
-    return f"{s}T09:00"
-
-
 def pick_class_color(seed: str) -> str:
     palette = [
         "#216869", "#49A078", "#74C0FC", "#FFD43B",
@@ -104,201 +36,419 @@ TYPE_DOT_COLORS = {
     "custom": "#49A078",
 }
 
+def parse_bound(value):
+    """Parse a ?start= / ?end= bound (date or ISO datetime) into a naive datetime."""
+    if not value:
+        return None
+    s = value.strip().replace(" ", "+")
+    if s.endswith("Z"):
+        s = s[:-1]
+    dt = datetime.fromisoformat(s)
+    return dt.replace(tzinfo=None)
+
+
+def parse_window(args):
+    """
+    Read the optional calendar window from query args.
+    Returns (start, end); either may be None for an open-ended window.
+    Raises ValueError on malformed bounds or an inverted range.
+    """
+    start = parse_bound(args.get("start"))
+    end = parse_bound(args.get("end"))
+    if start and end and end <= start:
+        raise ValueError("end must be after start")
+    return start, end
+
+
+def _parse_event_dt(value):
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except Exception:
+        return None
+
+
+def in_window(start_iso, end_iso, window_start, window_end):
+    """True if an event overlaps [window_start, window_end). Unparseable dates are kept."""
+    if window_start is None and window_end is None:
+        return True
+    s = _parse_event_dt(start_iso)
+    if s is None:
+        return True
+    e = _parse_event_dt(end_iso) if end_iso else None
+    e = e or s
+    if window_end is not None and s >= window_end:
+        return False
+    if window_start is not None and e < window_start:
+        return False
+    return True
+
+
+def iter_meeting_dates(day_num, term_start, term_end, window_start=None, window_end=None):
+    """
+    Yield each date a weekly meeting falls on, clipped to both the term and
+    the requested window (day granularity). Jumps straight to the first
+    occurrence in range instead of walking the term from its first day.
+    """
+    lo = term_start
+    if window_start is not None:
+        lo = max(lo, window_start.replace(hour=0, minute=0, second=0, microsecond=0))
+    current = lo + timedelta(days=(day_num - lo.weekday()) % 7)
+    while current <= term_end and (window_end is None or current < window_end):
+        yield current
+        current += timedelta(days=7)
+
+
 # ----------------- Internal -----------------
 
-def _build_events_for_user(user, db):
-    """Build full schedule view for a user (generated + custom/AI)."""
-    db.refresh(user)
-    for c in user.classes:
-        db.refresh(c)
+def _iter_class_events(c, window_start=None, window_end=None):
+    """Lazily yield the generated entries (assignments, exams, meetings) for one class inside the window."""
+    class_label = c.code or c.title or "Class"
+    class_color = pick_class_color(class_label)
+    term_start, term_end = term_dates(c.term)
+    year = term_start.year if term_start else datetime.now().year
+
+    # ---- Assignments ----
+    for idx, a in enumerate(c.assignments or []):
+        date_raw = a.get("due_date") or a.get("start")
+        if not date_raw:
+            continue
+        start = ensure_iso_datetime(normalize_date(date_raw, year))
+        if not in_window(start, None, window_start, window_end):
+            continue
+        yield {
+            "id": stable_event_id(c.id, "assignment", idx, start),
+            "title": f"{class_label}: {a.get('title', 'Assignment')}",
+            "start": start,
+            "type": "assignment",
+            "color": class_color,
+            "dotColor": TYPE_DOT_COLORS["assignment"],
+            "class": class_label,
+            "origin": "generated",
+            "textColor": "#ffffff",
+        }
 
-    events = []
-    days = {"monday": 0, "tuesday": 1, "wednesday": 2,
-            "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6}
-
-    for c in user.classes:
-        class_label = c.code or c.title or "Class"
-        class_color = pick_class_color(class_label)
-        term_start, term_end = term_dates(c.term)
-        year = term_start.year if term_start else datetime.now().year
-
-        # ---- Assignments ----
-        for a in (c.assignments or []):
-            date_raw = a.get("due_date") or a.get("start")
-            if not date_raw:
-                continue
-            date_fixed = normalize_date(date_raw, year)
-            events.append({
-                "id": str(uuid.uuid4()),
-                "title": f"{class_label}: {a.get('title', 'Assignment')}",
-                "start": ensure_iso_datetime(date_fixed),
-                "type": "assignment",
-                "color": class_color,
-                "dotColor": TYPE_DOT_COLORS["assignment"],
-                "class": class_label,
-                "origin": "generated",
-                "textColor": "#ffffff",
-            })
+    # ---- Exams ----
+    for idx, e in enumerate(c.exams or []):
+        date_raw = e.get("date") or e.get("start")
+        if not date_raw:
+            continue
+        start = ensure_iso_datetime(normalize_date(date_raw, year))
+        if not in_window(start, None, window_start, window_end):
+            continue
+        yield {
+            "id": stable_event_id(c.id, "exam", idx, start),
+            "title": f"{class_label}: {e.get('title', 'Exam')}",
+            "start": start,
+            "type": "exam",
+            "color": class_color,
+            "dotColor": TYPE_DOT_COLORS["exam"],
+            "class": class_label,
+            "origin": "generated",
+            "textColor": "#ffffff",
+        }
 
-        # ---- Exams ----
-        for e in (c.exams or []):
-            date_raw = e.get("date") or e.get("start")
-            if not date_raw:
-                continue
-            date_fixed = normalize_date(date_raw, year)
-            events.append({
-                "id": str(uuid.uuid4()),
-                "title": f"{class_label}: {e.get('title', 'Exam')}",
-                "start": ensure_iso_datetime(date_fixed),
-                "type": "exam",
+    # ---- Meetings ----
+    for idx, m in enumerate(c.meetings or []):
+        day_name = normalize_day(m.get("day"))
+        if not day_name or not m.get("start_time") or not term_start:
+            continue
+        day_num = WEEKDAYS.get(day_name)
+        if day_num is None:
+            continue
+
+        title = f"{class_label} {m.get('type', 'Lecture')} @ {m.get('location', 'TBD')}"
+        for current in iter_meeting_dates(day_num, term_start, term_end, window_start, window_end):
+            start_dt = f"{current.strftime('%Y-%m-%d')}T{m['start_time']}"
+            yield {
+                "id": stable_event_id(c.id, "meeting", idx, current.date().isoformat()),
+                "title": title,
+                "start": ensure_iso_datetime(start_dt),
+                "type": "meeting",
                 "color": class_color,
-                "dotColor": TYPE_DOT_COLORS["exam"],
+                "dotColor": TYPE_DOT_COLORS["lecture"],
                 "class": class_label,
                 "origin": "generated",
                 "textColor": "#ffffff",
-            })
+            }
+
 
-        # ---- Meetings ----
-        for m in (c.meetings or []):
-            day_name = normalize_day(m.get("day"))
-            if not day_name or not m.get("start_time") or not term_start:
+def _iter_class_vevents(c, dtstamp):
+    """
+    ICS VEVENTs for one class. Meetings that share a type, time and place
+    become one recurring event (MWF 9:00 -> BYDAY=MO,WE,FR) running through
+    the end of term; assignments and exams are single all-day (or timed)
+    events with the same IDs the JSON schedule uses.
+    """
+    class_label = c.code or c.title or "Class"
+    term_start, term_end = term_dates(c.term)
+    year = term_start.year if term_start else datetime.now().year
+
+    for kind, items, date_key, default_title in (
+        ("assignment", c.assignments, "due_date", "Assignment"),
+        ("exam", c.exams, "date", "Exam"),
+    ):
+        for idx, item in enumerate(items or []):
+            date_raw = item.get(date_key) or item.get("start")
+            if not date_raw:
                 continue
-            day_num = days.get(day_name)
-            if day_num is None:
+            normalized = normalize_date(date_raw, year)
+            start = _parse_event_dt(ensure_iso_datetime(normalized))
+            if start is None:
                 continue
+            all_day = "T" not in normalized
+            yield vevent(
+                uid=f"{stable_event_id(c.id, kind, idx, ensure_iso_datetime(normalized))}@buttonsai.org",
+                summary=f"{class_label}: {item.get('title') or default_title}",
+                start=start.date() if all_day else start,
+                end=(start + timedelta(days=1)).date() if all_day else None,
+                all_day=all_day,
+                categories=kind,
+                dtstamp=dtstamp,
+            )
+
+    if not term_start:
+        return
+    groups = {}   # (type, start_min, end_min, location) -> (first index, [weekdays])
+    for idx, m in enumerate(c.meetings or []):
+        day_num = WEEKDAYS.get(normalize_day(m.get("day")))
+        start_min = parse_clock(m.get("start_time"))
+        if day_num is None or start_min is None:
+            continue
+        end_min = parse_clock(m.get("end_time"))
+        if end_min is not None and end_min <= start_min:
+            end_min = None
+        key = (m.get("type") or "Lecture", start_min, end_min, m.get("location") or "")
+        groups.setdefault(key, (idx, []))[1].append(day_num)
+
+    for (meeting_type, start_min, end_min, location), (idx, days) in groups.items():
+        first = min(term_start + timedelta(days=(d - term_start.weekday()) % 7) for d in days)
+        if first > term_end:
+            continue
+        yield vevent(
+            uid=f"{stable_event_id(c.id, 'meeting', idx, 'weekly')}@buttonsai.org",
+            summary=f"{class_label} {meeting_type}",
+            start=first + timedelta(minutes=start_min),
+            end=first + timedelta(minutes=end_min) if end_min is not None else None,
+            location=location or None,
+            rrule=weekly_rrule(days, term_end),
+            categories="meeting",
+            dtstamp=dtstamp,
+        )
+
+
+def _iter_feed_events(classes, events):
+    """Every VEVENT for the feed: generated entries per class, then persisted events."""
+    dtstamp = utc_stamp()
+    labels = {}
+    for c in classes:
+        labels[c.id] = c.code or c.title or "Class"
+        yield from _iter_class_vevents(c, dtstamp)
+    for ev in events:
+        yield vevent(
+            uid=f"{ev.id}@buttonsai.org",
+            summary=ev.title or labels.get(ev.class_id, "Class"),
+            start=ev.start,
+            end=ev.end,
+            description=labels.get(ev.class_id, "Class"),
+            categories=ev.type or "custom",
+            dtstamp=dtstamp,
+        )
+
+
+def event_view(ev, class_label):
+    """Calendar dict for a persisted Event, colored like its class."""
+    out = ev.to_dict()
+    out["color"] = pick_class_color(class_label)
+    out["textColor"] = "#ffffff"
+    out["dotColor"] = TYPE_DOT_COLORS.get(out["type"], TYPE_DOT_COLORS["custom"])
+    out["class"] = class_label
+    return out
+
+
+def _query_events(db, user_id, window_start=None, window_end=None):
+    """Persisted custom/AI events overlapping the window, via ix_events_user_start."""
+    q = db.query(Event).filter(Event.user_id == user_id)
+    if window_end is not None:
+        q = q.filter(Event.start < window_end)
+    if window_start is not None:
+        q = q.filter(or_(Event.start >= window_start, Event.end >= window_start))
+    return q.all()
+
+
+def _build_events_for_user(user, db, start=None, end=None):
+    """
+    Build the schedule view for a user (generated + custom/AI).
+    With start/end, only entries overlapping that window are expanded.
+    Served from the schedule cache while the user's schedule_version is unchanged.
+    """
+    window_key = f"{start.isoformat() if start else ''}/{end.isoformat() if end else ''}"
+    cached = schedule_cache.get(user.id, user.schedule_version, window_key)
+    if cached is not None:
+        return cached
 
-            current = term_start
-            while current.weekday() != day_num:
-                current += timedelta(days=1)
-
-            while current <= term_end:
-                start_dt = f"{current.strftime('%Y-%m-%d')}T{m['start_time']}"
-                events.append({
-                    "id": str(uuid.uuid4()),
-                    "title": f"{class_label} {m.get('type', 'Lecture')} @ {m.get('location', 'TBD')}",
-                    "start": ensure_iso_datetime(start_dt),
-                    "type": "meeting",
-                    "color": class_color,
-                    "dotColor": TYPE_DOT_COLORS["lecture"],
-                    "class": class_label,
-                    "origin": "generated",
-                    "textColor": "#ffffff",
-                })
-                current += timedelta(days=7)
-
-        # ---- Custom + AI (persisted) ----
-        for ce in (c.custom_events or []):
-            ce = dict(ce)
-            ce["color"] = class_color
-            ce["textColor"] = "#ffffff"
-            ce["dotColor"] = TYPE_DOT_COLORS.get(ce.get("type", "custom"), TYPE_DOT_COLORS["custom"])
-            ce["class"] = ce.get("class") or class_label
-            ce["origin"] = ce.get("origin", "custom")
-            ce["start"] = ensure_iso_datetime(ce.get("start"))
-            if ce.get("end"):
-                ce["end"] = ensure_iso_datetime(ce["end"])
-            events.append(ce)
+    events = []
+    labels = {}
+    for c in load_schedule_classes(db, user.id):
+        labels[c.id] = c.code or c.title or "Class"
+        events.extend(_iter_class_events(c, start, end))
+
+    # ---- Custom + AI (persisted) ----
+    for ev in _query_events(db, user.id, start, end):
+        events.append(event_view(ev, labels.get(ev.class_id, "Class")))
 
+    schedule_cache.put(user.id, user.schedule_version, window_key, events)
     return events
 
 # ----------------- Routes -----------------
 
 @bp.get("")
 def get_schedule():
-    db = SessionLocal()
+    db = get_db()
+    user = get_current_user(db)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
     try:
-        user = get_current_user(db)
-        if not user:
-            return jsonify({"error": "Unauthorized"}), 401
+        start, end = parse_window(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date range: {e}"}), 400
 
-        events = _build_events_for_user(user, db)
-        return jsonify({"events": events})
-    finally:
-        db.close()
+    etag = schedule_etag(user, "schedule", start, end)
+    return conditional_json(etag, lambda: {"events": _build_events_for_user(user, db, start, end)})
 
 
-@bp.post("/add")
-def add_event():
-    db = SessionLocal()
-    try:
-        user = get_current_user(db)
-        if not user:
-            return jsonify({"error": "Unauthorized"}), 401
-
-        data = request.json or {}
-        class_id = data.get("class_id")
-        event_type = (data.get("type") or "custom").lower()
-
-        cls = db.query(Class).filter_by(id=class_id, user_id=user.id).first()
-        if not cls:
-            return jsonify({"error": "No class found"}), 404
-
-        class_label = cls.code or cls.title or "Class"
-        new_event = {
-            "id": str(uuid.uuid4()),
-            "title": data.get("title"),
-            "start": ensure_iso_datetime(data.get("start")),
-            "end": ensure_iso_datetime(data.get("end")) if data.get("end") else None,
-            "type": event_type,
-            "repeat": data.get("repeat", "none"),
-            "color": pick_class_color(class_label),
-            "textColor": "#ffffff",
-            "dotColor": TYPE_DOT_COLORS.get(event_type, TYPE_DOT_COLORS["custom"]),
-            "class": class_label,
-            "origin": "custom",
-        }
+@bp.get("/feed")
+def feed_link():
+    """Subscription URL for the user's .ics feed (Google / Apple / Outlook calendars)."""
+    user = get_current_user(get_db())
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+    return jsonify({"url": url_for("schedule.ics_feed", token=issue_feed_token(user), _external=True)})
 
-        if not cls.custom_events:
-            cls.custom_events = []
-        cls.custom_events.append(new_event)
-
-        # handle repeats (weekly/biweekly)
-        extra = []
-        if new_event["repeat"] in ["weekly", "biweekly"]:
-            interval = 7 if new_event["repeat"] == "weekly" else 14
-            start_dt = datetime.fromisoformat(new_event["start"])
-            for i in range(1, 8):
-                nxt = start_dt + timedelta(days=interval * i)
-                ev = dict(new_event)
-                ev["id"] = str(uuid.uuid4())
-                ev["start"] = nxt.replace(microsecond=0).isoformat()
-                extra.append(ev)
-        cls.custom_events.extend(extra)
-
-        db.commit()
-        db.refresh(cls)
-        db.refresh(user)
 
-        events = _build_events_for_user(user, db)
+@bp.post("/feed/rotate")
+def rotate_feed_link():
+    """Revoke every existing feed URL (e.g. one that leaked) and return a new one."""
+    db = get_db()
+    user = get_current_user(db)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+    rotate_feed_nonce(user)
+    db.commit()
+    print(f"[Feed] Rotated feed URL for user {user.id}")
+    return jsonify({"url": url_for("schedule.ics_feed", token=issue_feed_token(user), _external=True)})
 
-        return jsonify({"success": True, "added": [new_event] + extra, "events": events})
-    finally:
-        db.close()
+
+@bp.get("/feed/<token>.ics")
+def ics_feed(token):
+    """
+    The user's schedule as an iCalendar feed. Weekly meetings are one
+    recurring VEVENT each instead of one entry per week, so a subscribed
+    calendar syncs a fraction of GET /api/schedule, and polls that find
+    nothing new get a 304. Calendar apps can't send our Authorization
+    header; the signed token in the URL identifies the user.
+    """
+    claims = read_feed_token(token)
+    db = get_db()
+    user = db.get(User, claims[0]) if claims else None
+    if not user or not feed_token_valid(user, claims[1]):
+        return jsonify({"error": "Feed not found"}), 404
+
+    etag = schedule_etag(user, "ics")
+    if request.if_none_match.contains_weak(etag):
+        resp = make_response("", 304)
+    else:
+        classes = load_schedule_classes(db, user.id)
+        events = _query_events(db, user.id)
+        name = f"Buttons - {user.name}" if user.name else "Buttons"
+        # The rows are loaded; formatting them doesn't need a DB connection
+        close_db()
+        resp = Response(iter_calendar(name, _iter_feed_events(classes, events)), mimetype="text/calendar")
+        resp.headers["Content-Disposition"] = 'inline; filename="buttons.ics"'
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+@bp.post("/add")
+def add_event():
+    db = get_db()
+    user_id = current_user_id()
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.json or {}
+    class_id = data.get("class_id")
+    event_type = (data.get("type") or "custom").lower()
+
+    cls = db.query(Class).filter_by(id=class_id, user_id=user_id).first()
+    if not cls:
+        return jsonify({"error": "No class found"}), 404
+
+    start_dt = _parse_event_dt(ensure_iso_datetime(data.get("start")))
+    if start_dt is None:
+        return jsonify({"error": "Invalid start time"}), 400
+    end_dt = _parse_event_dt(ensure_iso_datetime(data.get("end"))) if data.get("end") else None
+
+    new_event = Event(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        class_id=cls.id,
+        title=data.get("title"),
+        start=start_dt.replace(microsecond=0),
+        end=end_dt.replace(microsecond=0) if end_dt else None,
+        type=event_type,
+        repeat=data.get("repeat", "none"),
+        origin="custom",
+    )
+    added = [new_event]
+
+    # handle repeats (weekly/biweekly)
+    if new_event.repeat in ["weekly", "biweekly"]:
+        interval = 7 if new_event.repeat == "weekly" else 14
+        duration = (new_event.end - new_event.start) if new_event.end else None
+        for i in range(1, 8):
+            nxt = new_event.start + timedelta(days=interval * i)
+            added.append(Event(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                class_id=cls.id,
+                title=new_event.title,
+                start=nxt,
+                end=new_event.end if duration is None else nxt + duration,
+                type=event_type,
+                repeat=new_event.repeat,
+                origin="custom",
+            ))
+    db.add_all(added)
+
+    bump_schedule_version(db, user_id)
+    db.commit()
+    schedule_cache.invalidate(user_id)
+
+    class_label = cls.code or cls.title or "Class"
+    added_view = [event_view(ev, class_label) for ev in added]
+    # The rebuilt schedule is stamped with the new schedule_version, so this one needs the row
+    events = _build_events_for_user(db.get(User, user_id), db)
+
+    return jsonify({"success": True, "added": added_view, "events": events})
 
 
 @bp.delete("/<event_id>")
 def delete_event(event_id):
-    db = SessionLocal()
-    try:
-        user = get_current_user(db)
-        if not user:
-            return jsonify({"error": "Unauthorized"}), 401
-
-        removed = False
-        for c in user.classes:
-            lst = c.custom_events or []
-            new_list = [e for e in lst if e.get("id") != event_id]
-            if len(new_list) != len(lst):
-                c.custom_events = new_list
-                removed = True
+    db = get_db()
+    user_id = current_user_id()
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
 
-        if not removed:
-            return jsonify({"error": "Event not found or not deletable"}), 404
+    removed = db.query(Event).filter_by(id=event_id, user_id=user_id).delete(synchronize_session=False)
+    if not removed:
+        return jsonify({"error": "Event not found or not deletable"}), 404
 
-        db.commit()
-        return jsonify({"success": True, "deleted": event_id})
-    finally:
-        db.close()
+    bump_schedule_version(db, user_id)
+    db.commit()
+    schedule_cache.invalidate(user_id)
+    return jsonify({"success": True, "deleted": event_id})
 
 
 @bp.post("/auto")
@@ -307,31 +457,30 @@ def auto_schedule():
     Ask AI to generate study/work sessions with user preferences.
     Returns a fresh, complete event list including AI + user-added sessions.
     """
-    db = SessionLocal()
-    try:
-        user = get_current_user(db)
-        if not user:
-            return jsonify({"error": "Unauthorized"}), 401
-
-        payload = request.json or {}
-        settings = payload.get("settings", {})
-
-        # Run AI scheduler with same DB session
-        result = ai_schedule_for_user(user, settings=settings, db=db)
-
-        if result.get("success"):
-            db.expire_all()
-            db.refresh(user)
-
-            # Rebuild full schedule with all updates
-            events = _build_events_for_user(user, db)
-
-            return jsonify({
-                "success": True,
-                "added": result.get("added", []),
-                "events": events
-            })
-        else:
-            return jsonify(result)
-    finally:
-        db.close()
+    db = get_db()
+    user = get_current_user(db)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    payload = request.json or {}
+    settings = payload.get("settings", {})
+
+    # Run AI scheduler with same DB session; it saves the new events and
+    # bumps schedule_version in one commit
+    result = ai_schedule_for_user(user, settings=settings, db=db)
+
+    if result.get("success"):
+        if result.get("added"):
+            schedule_cache.invalidate(user.id)
+
+        # Rebuild full schedule with all updates (the commit expired `user`,
+        # so its schedule_version is re-read once here)
+        events = _build_events_for_user(user, db)
+
+        return jsonify({
+            "success": True,
+            "added": result.get("added", []),
+            "events": events
+        })
+    else:
+        return jsonify(result)
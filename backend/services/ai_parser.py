@@ -1,61 +1,18 @@
-import os, re, json
-from openai import OpenAI
+import json
 from dotenv import load_dotenv
+from services.llm import llm
+from services.meeting_extractor import extract_meetings_from_text
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-# ===== Helper: regex fallback for lecture/discussion times =====
-def extract_meetings_from_text(text: str):
-    """
-    Scan syllabus text for meeting patterns like:
-      MWF 9:00–9:50 AM
-      TuTh 2:30–3:45 PM
-      Monday 10-11 AM in Room 101
-    Returns a list of meeting dicts with {type, day, start_time, end_time, location}.
-    """
-    # Match day patterns and times
-    day_pattern = r"(Mon(?:day)?|Tue(?:sday)?|Wed(?:nesday)?|Thu(?:rsday)?|Fri(?:day)?|Sat(?:urday)?|Sun(?:day)?|MWF|TR|TTh|TuTh)"
-    time_pattern = r"(\d{1,2}:\d{2}\s?(?:AM|PM|am|pm)?)[\s–\-to]+(\d{1,2}:\d{2}\s?(?:AM|PM|am|pm)?)"
-    loc_pattern = r"(?:in|at)\s+([A-Z]?[A-Za-z0-9\s\-]+(?:Hall|Room|Bldg|Building|Auditorium|Center|Lab|Rm)?\s*\d*)"
-
-    combined = re.findall(
-        rf"({day_pattern}.*?)({time_pattern})(?:.*?{loc_pattern})?",
-        text, re.IGNORECASE
-    )
-
-    meetings = []
-    for match in combined:
-        raw = " ".join(match)
-        # Normalize day codes
-        day_segment = match[0]
-        day_segment = day_segment.strip().replace("TTh", "TuTh")
-        days = []
-        if "MWF" in day_segment.upper():
-            days = ["Mon", "Wed", "Fri"]
-        elif re.search(r"T.?R", day_segment.upper()):
-            days = ["Tue", "Thu"]
-        else:
-            for d in ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]:
-                if d.lower() in day_segment.lower():
-                    days.append(d)
-
-        start_time, end_time = match[2], match[3]
-        location = match[4].strip() if len(match) > 4 and match[4] else ""
-
-        for d in days:
-            meetings.append({
-                "type": "Lecture",
-                "day": d,
-                "start_time": start_time.replace(" ", ""),
-                "end_time": end_time.replace(" ", ""),
-                "location": location
-            })
-    return meetings
+PARSER_MODEL = "gpt-4o-mini"
+# Bump whenever the prompt or post-processing changes so cached parses are not reused
+PARSER_VERSION = "2"
+MAX_PROMPT_CHARS = 15000
 
 
 # ===== Core Parser =====
-def parse_with_ai(text: str) -> dict:
+def parse_with_ai(text: str, user_id=None) -> dict:
     """
     Uses GPT-4o-mini to parse syllabus text into structured JSON.
     Also regex-detects meeting patterns as backup.
@@ -115,13 +72,15 @@ def parse_with_ai(text: str) -> dict:
     - Prefer explicit times and days (e.g. “MWF 9:00–9:50 AM” or “TTh 2:30-3:45 PM”).
     - If time/day missing, leave them blank but keep entry.
     Syllabus text:
-    {text[:15000]}
+    {text[:MAX_PROMPT_CHARS]}
     """
 
     try:
         # ---- Run AI parser ----
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = llm.chat(
+            route="parser",
+            user_id=user_id,
+            model=PARSER_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
@@ -1,13 +1,16 @@
-import os
 import json
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 from dotenv import load_dotenv
-from openai import OpenAI
-from db.models import Class
+from sqlalchemy import or_
+from db.models import Event
+from db.queries import load_schedule_classes
+from services.occupancy import build_occupancy
+from services.local_planner import plan_sessions, DEFAULT_SESSION_MINUTES
+from services.llm import llm
+from services.versioning import bump_schedule_version
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 # ===== Helpers =====
 
@@ -24,6 +27,7 @@ def overlaps(a_start, a_end, b_start, b_end):
     return not (a_end <= b_start or a_start >= b_end)
 
 def is_conflict(candidate_start, candidate_end, existing_events):
+    """One-off linear check over raw event dicts; for repeated checks use services.occupancy."""
     c_start = parse_iso(candidate_start)
     c_end = parse_iso(candidate_end)
     if not c_start or not c_end:
@@ -36,20 +40,29 @@ def is_conflict(candidate_start, candidate_end, existing_events):
     return False
 
 def format_event(cls, title, start, end):
-    class_label = cls.code or cls.title or "Class"
-    return {
-        "id": str(uuid.uuid4()),
-        "title": title,
-        "start": start,
-        "end": end,
-        "type": "study",
-        "repeat": "none",
+    """New AI study session row for a class; start/end are naive datetimes."""
+    return Event(
+        id=str(uuid.uuid4()),
+        user_id=cls.user_id,
+        class_id=cls.id,
+        title=title,
+        start=start,
+        end=end,
+        type="study",
+        repeat="none",
+        origin="ai",
+    )
+
+def event_payload(cls, ev):
+    """Response dict for an AI-created event."""
+    out = ev.to_dict()
+    out.update({
         "color": "#9CC5A1",
         "textColor": "#fff",
         "dotColor": "#9CC5A1",
-        "class": class_label,
-        "origin": "ai",
-    }
+        "class": cls.code or cls.title or "Class",
+    })
+    return out
 
 def extract_term_year(term: str, default_year: int) -> int:
     if not term:
@@ -111,6 +124,120 @@ def clamp_to_hours(start_dt: datetime, end_dt: datetime, start_hour: int, end_ho
 
 # ===== Core =====
 
+def plan_with_gpt(classes, upcoming, occupancy, now, start_hour_str, end_hour_str,
+                  avoid_weekends, sessions_per_week, user_id=None):
+    """
+    Ask GPT for a study plan and keep only sessions that pass every check
+    (year fix-up, working hours, weekends, deadline, conflicts).
+    Returns [{"title", "class_code", "start", "end"}] or None if the reply isn't JSON.
+    """
+    current_year = now.year
+    start_hour = int(start_hour_str.split(":")[0])
+    end_hour = int(end_hour_str.split(":")[0])
+
+    # Build a strict prompt with absolute ISO dates + today's date
+    today_str = now.replace(microsecond=0).isoformat()
+    deadlines_lines = [
+        f"{u['class']} {u['kind']} '{u['title']}' due {u['date']}"
+        for u in upcoming
+    ]
+    user_summary = "\n".join(deadlines_lines)
+
+    system_prompt = (
+        "You are a university scheduling assistant that plans study/work sessions for students.\n"
+        f"Today's date is {today_str}. Use the *exact year* shown in the deadlines below.\n"
+        f"Study sessions must be between {start_hour_str} and {end_hour_str} local time. "
+        f"Schedule about {sessions_per_week} sessions per week per course, evenly spaced before each deadline. "
+        + ("Avoid weekends completely. " if avoid_weekends else "")
+        + "Output STRICT JSON with no extra commentary in this schema:\n"
+        '{ "events": [ { "title": "string", "class_code": "string", "start": "YYYY-MM-DDTHH:MM:SS", "end": "YYYY-MM-DDTHH:MM:SS" } ] }\n'
+        "Ensure start < end and all events are ON OR BEFORE the corresponding deadline (not after)."
+    )
+
+    print("[AI Scheduler] Requesting study plan from GPT...")
+    response = llm.chat(
+        route="scheduler",
+        user_id=user_id,
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_summary},
+        ],
+        response_format={"type": "json_object"},
+    )
+
+    try:
+        content = response.choices[0].message.content
+        parsed = json.loads(content)
+    except Exception as e:
+        print("[AI Scheduler] Invalid GPT JSON:", e)
+        return None
+
+    # Map deadlines to look up and reject sessions after due date
+    deadline_by_class = {}
+    for u in upcoming:
+        # keep the farthest future deadline per class for a conservative bound
+        d = parse_iso(u["date"])
+        if not d:
+            continue
+        key = u["class"]
+        if key not in deadline_by_class or d > deadline_by_class[key]:
+            deadline_by_class[key] = d
+
+    accepted = []
+
+    for e in parsed.get("events", []):
+        title = e.get("title")
+        code = e.get("class_code")
+        start_raw = e.get("start")
+        end_raw = e.get("end")
+        if not (title and code and start_raw and end_raw):
+            continue
+
+        # 1) Fix obvious past-year outputs: put in term/current year
+        #    We pick class term year; sessions for unknown classes are dropped.
+        t_year = None
+        for c in classes:
+            if (c.code or c.title) == code:
+                t_year = extract_term_year(c.term, current_year)
+                break
+        if t_year is None:
+            continue
+
+        start_iso = ensure_year(start_raw, t_year)
+        end_iso = ensure_year(end_raw, t_year)
+
+        s_dt = parse_iso(start_iso)
+        e_dt = parse_iso(end_iso)
+        if not s_dt or not e_dt:
+            continue
+
+        # 2) Enforce working-hour clamps
+        s_dt, e_dt = clamp_to_hours(s_dt, e_dt, start_hour, end_hour)
+
+        # 3) Skip if still in the past relative to now
+        if e_dt <= now:
+            continue
+
+        # 4) Respect "avoid weekends"
+        if avoid_weekends and (s_dt.weekday() >= 5 or e_dt.weekday() >= 5):
+            continue
+
+        # 5) Reject anything after course's latest deadline
+        dl = deadline_by_class.get(code)
+        if dl and s_dt > dl:
+            continue
+
+        # 6) Conflict check vs class meetings and existing items
+        if not occupancy.is_free(s_dt, e_dt):
+            continue
+
+        # 7) Accept and reserve the slot for later candidates
+        occupancy.add_span(s_dt, e_dt)
+        accepted.append({"title": title, "class_code": code, "start": s_dt, "end": e_dt})
+
+    return accepted
+
 def ai_schedule_for_user(user, settings=None, db=None):
     """
     Generate AI study/work sessions before assignments/exams.
@@ -118,6 +245,8 @@ def ai_schedule_for_user(user, settings=None, db=None):
       - startHour / endHour
       - avoidWeekends
       - sessionsPerWeek
+      - planner: "ai" (GPT, default) or "local" (deterministic, no LLM call)
+      - sessionMinutes (local planner only)
     Ensures: dates are in the correct (term/current) year and not in the past.
     Requires the active SQLAlchemy session (db).
     """
@@ -137,15 +266,18 @@ def ai_schedule_for_user(user, settings=None, db=None):
         now = datetime.now()
         current_year = now.year
 
-        classes = user.classes
+        classes = load_schedule_classes(db, user.id)
         if not classes:
             return {"success": False, "message": "No classes found."}
 
-        # Collect existing custom/ai events to avoid conflicts
-        all_existing = []
-        for c in classes:
-            if c.custom_events:
-                all_existing.extend(c.custom_events)
+        # Busy slots: recurring class meetings plus custom/ai events not already over
+        existing = (
+            db.query(Event)
+            .filter(Event.user_id == user.id)
+            .filter(or_(Event.start >= now, Event.end >= now))
+            .all()
+        )
+        occupancy = build_occupancy(classes, existing)
 
         # Build absolute, year-resolved deadlines for the prompt
         upcoming = []
@@ -168,117 +300,44 @@ def ai_schedule_for_user(user, settings=None, db=None):
         if not upcoming:
             return {"success": False, "message": "No due dates found to schedule around."}
 
-        # Build a strict prompt with absolute ISO dates + today's date
-        today_str = now.replace(microsecond=0).isoformat()
-        deadlines_lines = [
-            f"{u['class']} {u['kind']} '{u['title']}' due {u['date']}"
-            for u in upcoming
-        ]
-        user_summary = "\n".join(deadlines_lines)
-
-        system_prompt = (
-            "You are a university scheduling assistant that plans study/work sessions for students.\n"
-            f"Today's date is {today_str}. Use the *exact year* shown in the deadlines below.\n"
-            f"Study sessions must be between {start_hour_str} and {end_hour_str} local time. "
-            f"Schedule about {sessions_per_week} sessions per week per course, evenly spaced before each deadline. "
-            + ("Avoid weekends completely. " if avoid_weekends else "")
-            + "Output STRICT JSON with no extra commentary in this schema:\n"
-            '{ "events": [ { "title": "string", "class_code": "string", "start": "YYYY-MM-DDTHH:MM:SS", "end": "YYYY-MM-DDTHH:MM:SS" } ] }\n'
-            "Ensure start < end and all events are ON OR BEFORE the corresponding deadline (not after)."
-        )
-
-        print("[AI Scheduler] Requesting study plan from GPT...")
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_summary},
-            ],
-            response_format={"type": "json_object"},
-        )
-
-        try:
-            content = response.choices[0].message.content
-            parsed = json.loads(content)
-        except Exception as e:
-            print("[AI Scheduler] Invalid GPT JSON:", e)
-            return {"success": False, "message": "AI returned invalid JSON."}
-
-        # Map deadlines to look up and reject sessions after due date
-        deadline_by_class = {}
-        for u in upcoming:
-            # keep the farthest future deadline per class for a conservative bound
-            d = parse_iso(u["date"])
-            if not d:
-                continue
-            key = u["class"]
-            if key not in deadline_by_class or d > deadline_by_class[key]:
-                deadline_by_class[key] = d
+        if settings.get("planner", "ai") == "local":
+            print("[AI Scheduler] Planning study sessions locally...")
+            sessions = plan_sessions(
+                upcoming, occupancy, now,
+                start_hour=start_hour,
+                end_hour=end_hour,
+                avoid_weekends=avoid_weekends,
+                sessions_per_week=sessions_per_week,
+                session_minutes=int(settings.get("sessionMinutes", DEFAULT_SESSION_MINUTES)),
+            )
+        else:
+            sessions = plan_with_gpt(
+                classes, upcoming, occupancy, now,
+                start_hour_str, end_hour_str, avoid_weekends, sessions_per_week,
+                user_id=user.id,
+            )
+            if sessions is None:
+                return {"success": False, "message": "AI returned invalid JSON."}
+
+        # Persist each accepted session to the matching class
+        class_by_label = {}
+        for c in classes:
+            class_by_label.setdefault(c.code or c.title, c)
 
         added_events = []
-
-        for e in parsed.get("events", []):
-            title = e.get("title")
-            code = e.get("class_code")
-            start_raw = e.get("start")
-            end_raw = e.get("end")
-            if not (title and code and start_raw and end_raw):
-                continue
-
-            # 1) Fix obvious past-year outputs: put in term/current year
-            #    We pick class term year; if not available, current year.
-            t_year = None
-            for c in classes:
-                if (c.code or c.title) == code:
-                    t_year = extract_term_year(c.term, current_year)
-                    break
-            if t_year is None:
-                t_year = current_year
-
-            start_iso = ensure_year(start_raw, t_year)
-            end_iso = ensure_year(end_raw, t_year)
-
-            s_dt = parse_iso(start_iso)
-            e_dt = parse_iso(end_iso)
-            if not s_dt or not e_dt:
-                continue
-
-            # 2) Enforce working-hour clamps
-            s_dt, e_dt = clamp_to_hours(s_dt, e_dt, start_hour, end_hour)
-
-            # 3) Skip if still in the past relative to now
-            if e_dt <= now:
-                continue
-
-            # 4) Respect "avoid weekends"
-            if avoid_weekends and (s_dt.weekday() >= 5 or e_dt.weekday() >= 5):
-                continue
-
-            # 5) Reject anything after course's latest deadline
-            dl = deadline_by_class.get(code)
-            if dl and s_dt > dl:
+        for sess in sessions:
+            c = class_by_label.get(sess["class_code"])
+            if c is None:
                 continue
-
-            # 6) Conflict check vs existing items
-            if is_conflict(s_dt.isoformat(), e_dt.isoformat(), all_existing):
-                continue
-
-            # 7) Persist to the matching class
-            for c in classes:
-                if (c.code or c.title) == code:
-                    ev = format_event(c, title, s_dt.replace(microsecond=0).isoformat(), e_dt.replace(microsecond=0).isoformat())
-                    if not c.custom_events:
-                        c.custom_events = []
-                    c.custom_events.append(ev)
-                    all_existing.append(ev)
-                    added_events.append(ev)
-                    print(f"[AI Scheduler] Added: {title} ({ev['start']} - {ev['end']}) for {code}")
-                    break
-
+            row = format_event(c, sess["title"], sess["start"].replace(microsecond=0), sess["end"].replace(microsecond=0))
+            db.add(row)
+            ev = event_payload(c, row)
+            added_events.append(ev)
+            print(f"[AI Scheduler] Added: {row.title} ({ev['start']} - {ev['end']}) for {sess['class_code']}")
+
+        if added_events:
+            bump_schedule_version(db, user.id)
         db.commit()
-        db.flush()
-        for c in classes:
-            db.refresh(c)
 
         print(f"[AI Scheduler] ✅ Added {len(added_events)} new AI study/work sessions.")
         return {
@@ -0,0 +1,161 @@
+import os
+import re
+import time
+import secrets
+import threading
+import requests
+from flask import g, request
+from google.oauth2 import id_token
+from google.auth.transport import requests as google_requests
+from itsdangerous import URLSafeSerializer, URLSafeTimedSerializer, BadSignature, SignatureExpired
+from dotenv import load_dotenv
+from db.models import User
+
+load_dotenv()
+
+# ===== Authentication =====
+#
+# Login: the Google ID token is verified once, against Google's public certs
+# (cached for as long as Google's Cache-Control allows), and we hand back our
+# own signed session token. Every API call after that sends
+# `Authorization: Bearer <token>`, which is checked with SESSION_SECRET alone:
+# no network call, no DB lookup. The verified identity is kept on flask.g, so
+# it is decoded at most once per request. Routes that only need the caller's
+# id use current_user_id(); get_current_user() reads the User row (one
+# SELECT) for the few that need its columns, e.g. schedule_version for ETags.
+
+GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
+SESSION_MAX_AGE_SECONDS = int(os.getenv("SESSION_MAX_AGE_DAYS", "30")) * 24 * 3600
+SESSION_SALT = "buttons-session"
+FEED_SALT = "buttons-feed"
+
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+if not SESSION_SECRET:
+    # Fine for local dev; in production every worker must share one secret
+    SESSION_SECRET = secrets.token_urlsafe(32)
+    print("[Auth] ⚠️ SESSION_SECRET not set; using a random per-process secret (sessions end on restart).")
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class CachingRequest(google_requests.Request):
+    """
+    google-auth transport that reuses one pooled requests.Session and keeps
+    successful GET responses (Google's signing certs) until their
+    Cache-Control max-age runs out.
+    """
+
+    def __init__(self, session=None):
+        super().__init__(session=session or requests.Session())
+        self._cache = {}    # url -> (expires_at, response)
+        self._lock = threading.Lock()
+
+    def __call__(self, url, method="GET", body=None, headers=None, **kwargs):
+        if method != "GET" or body is not None:
+            return super().__call__(url, method=method, body=body, headers=headers, **kwargs)
+
+        with self._lock:
+            cached = self._cache.get(url)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        response = super().__call__(url, method=method, headers=headers, **kwargs)
+        cache_control = response.headers.get("cache-control") or ""
+        match = _MAX_AGE_RE.search(cache_control)
+        if response.status == 200 and match and "no-store" not in cache_control:
+            response.data   # read the body now so the cached object is self-contained
+            with self._lock:
+                self._cache[url] = (time.monotonic() + int(match.group(1)), response)
+        return response
+
+
+google_request = CachingRequest()
+_serializer = URLSafeTimedSerializer(SESSION_SECRET, salt=SESSION_SALT)
+_feed_serializer = URLSafeSerializer(SESSION_SECRET, salt=FEED_SALT)
+
+
+def verify_google_token(token):
+    """Google ID token -> {"id", "email", "name"}. Raises ValueError if invalid."""
+    idinfo = id_token.verify_oauth2_token(
+        token,
+        google_request,
+        GOOGLE_CLIENT_ID,
+        clock_skew_in_seconds=5,
+    )
+    return {"id": idinfo["sub"], "email": idinfo.get("email"), "name": idinfo.get("name", "")}
+
+
+def issue_session_token(identity):
+    return _serializer.dumps({"id": identity["id"], "email": identity.get("email"), "name": identity.get("name", "")})
+
+
+def read_session_token(token):
+    """Identity dict from a session token, or None if it is forged, mangled or expired."""
+    try:
+        data = _serializer.loads(token, max_age=SESSION_MAX_AGE_SECONDS)
+    except (SignatureExpired, BadSignature):
+        return None
+    return data if isinstance(data, dict) and data.get("id") else None
+
+
+def issue_feed_token(user):
+    """
+    Token for the calendar feed URL. Calendar apps can't send headers, so it
+    lives in the URL and only grants read access to that user's feed. It has
+    no expiry (subscriptions are long-lived) but carries the user's
+    feed_nonce, so rotate_feed_nonce() revokes every URL issued before it.
+    """
+    return _feed_serializer.dumps({"id": user.id, "n": user.feed_nonce})
+
+
+def read_feed_token(token):
+    """
+    (user_id, nonce) from a feed token, or None if it is forged or mangled.
+    Tokens from before nonces existed carry just the user ID (nonce None).
+    """
+    try:
+        data = _feed_serializer.loads(token)
+    except BadSignature:
+        return None
+    if isinstance(data, str):
+        return data, None
+    if isinstance(data, dict) and isinstance(data.get("id"), str):
+        return data["id"], data.get("n")
+    return None
+
+
+def feed_token_valid(user, nonce):
+    """Whether a token carrying `nonce` is still current for `user`."""
+    if user.feed_nonce is None or nonce is None:
+        return user.feed_nonce is None and nonce is None
+    return secrets.compare_digest(user.feed_nonce, nonce)
+
+
+def rotate_feed_nonce(user):
+    """Give the user a new feed nonce, invalidating all earlier feed URLs."""
+    user.feed_nonce = secrets.token_urlsafe(16)
+
+
+def current_identity():
+    """The verified caller for this request ({"id", "email", "name"}) or None."""
+    if "identity" not in g:
+        header = request.headers.get("Authorization", "")
+        token = header[7:].strip() if header[:7].lower() == "bearer " else ""
+        g.identity = read_session_token(token) if token else None
+    return g.identity
+
+
+def current_user_id():
+    """The verified caller's user id, or None. No DB access."""
+    identity = current_identity()
+    return identity["id"] if identity else None
+
+
+def get_current_user(db):
+    """
+    User row for the verified caller, or None (no valid token, or the row is
+    gone). The row is created at login; use current_user_id() when the id
+    is all you need.
+    """
+    user_id = current_user_id()
+    return db.get(User, user_id) if user_id else None
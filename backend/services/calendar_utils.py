@@ -0,0 +1,88 @@
+import re
+from datetime import datetime
+
+# Shared calendar helpers used by both the schedule routes and the scheduler.
+
+WEEKDAYS = {"monday": 0, "tuesday": 1, "wednesday": 2,
+            "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6}
+
+_CLOCK_RE = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?(?::\d{2})?\s*([ap])?\.?m?\.?\s*$", re.IGNORECASE)
+
+
+def term_dates(term_str):
+    if not term_str:
+        return None, None
+    term = term_str.lower()
+    year = "".join([c for c in term if c.isdigit()]) or str(datetime.now().year)
+    if "spring" in term:
+        start = datetime(int(year), 1, 15)
+        end = datetime(int(year), 5, 15)
+    elif "fall" in term:
+        start = datetime(int(year), 8, 15)
+        end = datetime(int(year), 12, 15)
+    else:
+        start = datetime(int(year), 1, 1)
+        end = datetime(int(year), 12, 31)
+    return start, end
+
+
+def normalize_date(date_str, default_year):
+    """Accepts 'YYYY-MM-DD', 'MM/DD', or ISO; returns same (ISO preserved)."""
+    try:
+        s = (date_str or "").strip()
+        if "T" in s:
+            return s
+        if "-" in s and len(s) >= 8:
+            return s
+        if "/" in s:
+            m, d = s.split("/")
+            return f"{default_year}-{int(m):02d}-{int(d):02d}"
+    except Exception:
+        pass
+    return date_str
+
+
+def ensure_iso_datetime(value: str) -> str:
+    """Ensure consistent ISO format; date-only becomes 09:00 local."""
+    if not value:
+        return value
+    s = value.strip()
+    if "T" in s:
+        try:
+            dt = datetime.fromisoformat(s)
+            return dt.replace(microsecond=0).isoformat()
+        except Exception:
+            return s[:16]
+    return f"{s}T09:00"
+
+
+def normalize_day(day_str):
+    if not day_str:
+        return None
+    d = day_str.strip().lower()
+    mapping = {
+        "m": "monday", "mon": "monday", "monday": "monday",
+        "t": "tuesday", "tue": "tuesday", "tuesday": "tuesday",
+        "w": "wednesday", "wed": "wednesday", "wednesday": "wednesday",
+        "th": "thursday", "thu": "thursday", "thursday": "thursday",
+        "f": "friday", "fri": "friday", "friday": "friday",
+        "s": "saturday", "sat": "saturday", "saturday": "saturday",
+        "su": "sunday", "sun": "sunday", "sunday": "sunday"
+    }
+    return mapping.get(d)
+
+
+def parse_clock(value):
+    """'14:30', '9:00AM', '9 pm' -> minutes after midnight, or None."""
+    m = _CLOCK_RE.match(value or "")
+    if not m:
+        return None
+    hour, minute = int(m.group(1)), int(m.group(2) or 0)
+    meridiem = (m.group(3) or "").lower()
+    if meridiem == "p" and hour < 12:
+        hour += 12
+    elif meridiem == "a" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+from db.models import Class, Event
+from services.calendar_utils import WEEKDAYS, term_dates, normalize_day, normalize_date, ensure_iso_datetime
+
+# ===== Chat prompt context =====
+#
+# The chat only needs per-class summaries, an events total and what is
+# coming up next. All of it is computed from one projected query over the
+# class rows: recurring meetings are counted arithmetically per weekday
+# rather than expanded, and persisted events are counted in SQL.
+
+UPCOMING_LIMIT = 10
+
+
+def load_chat_rows(db, user_id):
+    """One query: the class columns the chat uses plus each class's persisted event count."""
+    event_count = (
+        select(func.count(Event.id))
+        .where(Event.class_id == Class.id)
+        .correlate(Class)
+        .scalar_subquery()
+    )
+    return db.execute(
+        select(
+            Class.id, Class.title, Class.code, Class.instructor, Class.term,
+            Class.meetings, Class.assignments, Class.exams,
+            event_count.label("event_count"),
+        ).where(Class.user_id == user_id)
+    ).all()
+
+
+def count_weekday(day_num, start, end):
+    """How many dates in [start, end] fall on weekday day_num (0 = Monday)."""
+    first = start + timedelta(days=(day_num - start.weekday()) % 7)
+    if first > end:
+        return 0
+    return (end - first).days // 7 + 1
+
+
+def _meeting_instances(row):
+    """Same meetings the schedule builder would expand for this class, counted not materialized."""
+    term_start, term_end = term_dates(row.term)
+    if not term_start:
+        return 0
+    total = 0
+    for m in (row.meetings or []):
+        day_num = WEEKDAYS.get(normalize_day(m.get("day")))
+        if day_num is None or not m.get("start_time"):
+            continue
+        total += count_weekday(day_num, term_start, term_end)
+    return total
+
+
+def _dated(items, date_keys, year):
+    """(iso, item) for items carrying one of date_keys, normalized like the schedule builder."""
+    for item in (items or []):
+        raw = next((item.get(k) for k in date_keys if item.get(k)), None)
+        if raw:
+            yield ensure_iso_datetime(normalize_date(raw, year)), item
+
+
+def build_chat_context(rows, now=None, upcoming_limit=UPCOMING_LIMIT):
+    now = now or datetime.now()
+    now_iso = now.replace(microsecond=0).isoformat()
+    events_count = 0
+    upcoming = []
+    summaries = []
+
+    for row in rows:
+        label = row.code or row.title or "Class"
+        term_start, _ = term_dates(row.term)
+        year = term_start.year if term_start else now.year
+
+        assignments = list(_dated(row.assignments, ("due_date", "start"), year))
+        exams = list(_dated(row.exams, ("date", "start"), year))
+        events_count += len(assignments) + len(exams) + _meeting_instances(row) + (row.event_count or 0)
+
+        for kind, dated in (("assignment", assignments), ("exam", exams)):
+            for iso, item in dated:
+                if iso >= now_iso:
+                    upcoming.append({"class": label, "kind": kind, "title": item.get("title"), "date": iso})
+
+        summaries.append({
+            "title": row.title,
+            "code": row.code,
+            "instructor": row.instructor,
+            "meetings": [
+                {k: m.get(k) for k in ("type", "day", "start_time", "end_time", "location")}
+                for m in (row.meetings or [])
+            ],
+            "assignments": [
+                {"title": a.get("title"), "due_date": a.get("due_date")}
+                for a in (row.assignments or [])
+            ],
+            "exams": [
+                {"title": e.get("title"), "date": e.get("date")}
+                for e in (row.exams or [])
+            ],
+        })
+
+    upcoming.sort(key=lambda u: u["date"])
+    return {
+        "today": now_iso,
+        "classes_summary": summaries,
+        "events_count": events_count,
+        "upcoming": upcoming[:upcoming_limit],
+    }
@@ -0,0 +1,71 @@
+import os
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:   # optional; gzip only
+    brotli = None
+
+# ===== Response compression =====
+#
+# JSON and text responses larger than COMPRESS_MIN_BYTES are compressed with
+# the best encoding the client accepts: brotli (when installed) or gzip.
+# Small bodies aren't worth the CPU. Streamed responses (the chat SSE stream)
+# pass through untouched, because buffering them would hold back every token
+# until the end. ETags are weak, so a 304 still matches whichever encoding
+# the client cached.
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = {"application/json", "application/javascript", "image/svg+xml"}
+
+
+def available_encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _compressible(response):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if "Content-Encoding" in response.headers:
+        return False
+    mimetype = response.mimetype or ""
+    if mimetype == "text/event-stream":
+        return False
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES
+
+
+def _compress_response(response):
+    if not _compressible(response):
+        return response
+    response.vary.add("Accept-Encoding")
+
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if not encoding:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_compression(app):
+    """
+    Register the compression hook. Call after init_request_timing so the
+    size it records is what actually goes over the wire.
+    """
+    app.after_request(_compress_response)
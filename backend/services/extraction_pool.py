@@ -0,0 +1,193 @@
+import os
+import atexit
+import resource
+import threading
+import multiprocessing
+from services.parser_service import extract_text_from_file, UploadRejected
+
+# ===== Out-of-process PDF extraction =====
+#
+# pdfminer is pure Python and CPU-bound, so extraction runs in worker
+# processes instead of the request thread. Each worker is owned by one job
+# at a time: its wall-clock timeout starts when the worker picks the job
+# up (not while it waits for a free worker), and a job that overruns gets
+# only its own worker killed, so other uploads in flight are unaffected.
+# Workers are also retired after a number of jobs or once their peak RSS
+# crosses a limit, so pdfminer's memory growth never accumulates.
+# Admission is bounded: past workers + queue size, callers get
+# ExtractionBusy right away instead of piling up.
+
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "20"))
+EXTRACT_MAX_JOBS_PER_WORKER = int(os.getenv("EXTRACT_MAX_JOBS_PER_WORKER", "50"))
+EXTRACT_MAX_RSS_MB = int(os.getenv("EXTRACT_MAX_RSS_MB", "512"))
+EXTRACT_QUEUE_SIZE = int(os.getenv("EXTRACT_QUEUE_SIZE", "8"))
+EXTRACT_START_METHOD = os.getenv("EXTRACT_START_METHOD") or None
+
+
+class ExtractionBusy(UploadRejected):
+    def __init__(self):
+        super().__init__("Too many syllabi are being processed right now, please retry shortly", status=503)
+
+
+class ExtractionTimeout(UploadRejected):
+    def __init__(self, seconds):
+        super().__init__(f"The file took longer than {seconds:g}s to read", status=422)
+
+
+class ExtractionFailed(UploadRejected):
+    def __init__(self, message="Could not read the uploaded file"):
+        super().__init__(message, status=422)
+
+
+def _extract_job(path, filename):
+    """Runs in a worker process. Returns (text, peak RSS in MB)."""
+    with open(path, "rb") as fp:
+        text = extract_text_from_file(fp, filename)
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+    return text, rss_mb
+
+
+def _worker_main(conn, job):
+    """Worker process loop: run (path, filename) requests until told to stop."""
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        try:
+            conn.send(("ok", job(*request)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    """One extraction process and the pipe to it."""
+
+    def __init__(self, ctx, job):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child, job), daemon=True)
+        self.proc.start()
+        child.close()
+        self.jobs = 0
+
+    def run(self, path, filename, timeout):
+        """
+        (status, payload) from the worker. Raises TimeoutError if it doesn't
+        answer within `timeout` seconds, EOFError/OSError if it died.
+        """
+        self.jobs += 1
+        self.conn.send((path, filename))
+        if not self.conn.poll(timeout):
+            raise TimeoutError()
+        return self.conn.recv()
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.proc.join(timeout=1)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join()
+        self.conn.close()
+
+
+class ExtractionPool:
+    def __init__(self, workers=EXTRACT_WORKERS, timeout=EXTRACT_TIMEOUT_SECONDS,
+                 max_jobs_per_worker=EXTRACT_MAX_JOBS_PER_WORKER, max_rss_mb=EXTRACT_MAX_RSS_MB,
+                 queue_size=EXTRACT_QUEUE_SIZE, start_method=EXTRACT_START_METHOD, job=_extract_job):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_jobs = max(1, max_jobs_per_worker)
+        self.max_rss_mb = max_rss_mb
+        self.start_method = start_method
+        self.job = job
+        self._slots = threading.BoundedSemaphore(max(1, workers) + max(0, queue_size))
+        self._running = threading.BoundedSemaphore(max(1, workers))
+        self._lock = threading.Lock()
+        self._idle = []
+        self._all = set()
+        self.stats = {"completed": 0, "timeouts": 0, "failures": 0, "rejected": 0, "recycled": 0}
+
+    def _checkout(self):
+        """An idle worker, or a new one. Caller holds a _running slot."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        ctx = multiprocessing.get_context(self.start_method)
+        worker = _Worker(ctx, self.job)
+        with self._lock:
+            self._all.add(worker)
+        return worker
+
+    def _checkin(self, worker, rss_mb):
+        if worker.jobs < self.max_jobs and rss_mb <= self.max_rss_mb:
+            with self._lock:
+                self._idle.append(worker)
+            return
+        self.stats["recycled"] += 1
+        self._discard(worker)
+        worker.stop()
+
+    def _discard(self, worker):
+        with self._lock:
+            self._all.discard(worker)
+
+    def extract(self, path, filename):
+        if not self._slots.acquire(blocking=False):
+            self.stats["rejected"] += 1
+            raise ExtractionBusy()
+        try:
+            if self.workers <= 0:
+                text, _ = self.job(path, filename)
+                self.stats["completed"] += 1
+                return text
+
+            # Waiting here for a free worker doesn't count against the timeout
+            with self._running:
+                worker = self._checkout()
+                try:
+                    status, payload = worker.run(path, filename, self.timeout)
+                except TimeoutError:
+                    self.stats["timeouts"] += 1
+                    print(f"[Extraction] ⚠️ {filename} exceeded {self.timeout:g}s; killing its worker")
+                    self._discard(worker)
+                    worker.kill()
+                    raise ExtractionTimeout(self.timeout)
+                except (EOFError, OSError):
+                    self.stats["failures"] += 1
+                    self._discard(worker)
+                    worker.kill()
+                    raise ExtractionFailed("The file reader crashed, please retry")
+
+                if status != "ok":
+                    self.stats["failures"] += 1
+                    print(f"[Extraction Error] {filename}: {payload}")
+                    self._checkin(worker, 0)
+                    raise ExtractionFailed()
+
+                text, rss_mb = payload
+                self.stats["completed"] += 1
+                self._checkin(worker, rss_mb)
+                return text
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._all, self._idle = list(self._all), set(), []
+        for worker in workers:
+            worker.kill()
+
+
+extraction_pool = ExtractionPool()
+atexit.register(extraction_pool.shutdown)
@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+
+# ===== iCalendar (RFC 5545) writer =====
+#
+# Small streaming writer for the subscription feed. Components are yielded
+# one at a time as UTF-8 bytes (one chunk per VEVENT), so a feed never has
+# to be held in memory as a whole. Times are "floating" (no TZID / Z), like
+# every other datetime in the app: 09:00 stays 09:00 in the subscriber's
+# own timezone.
+
+PRODID = "-//Buttons//Schedule Feed//EN"
+BYDAY = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+def escape_text(value):
+    """Escape a TEXT value: backslash, semicolon, comma and newlines."""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+        .replace("\r", "\\n")
+    )
+
+
+def fold(line):
+    """Fold a content line at 75 octets (continuation lines start with a space)."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return data + b"\r\n"
+    parts = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while cut > 0 and (data[cut] & 0xC0) == 0x80:
+            cut -= 1   # don't split a multi-byte character
+        parts.append(data[:cut])
+        data = data[cut:]
+        limit = 74     # room for the leading space
+    parts.append(data)
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def fmt_datetime(dt):
+    return dt.strftime("%Y%m%dT%H%M%S")
+
+
+def fmt_date(d):
+    return d.strftime("%Y%m%d")
+
+
+def utc_stamp():
+    """DTSTAMP value for now."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def vevent(uid, summary, start, end=None, all_day=False, location=None, description=None,
+           rrule=None, categories=None, dtstamp=None):
+    """One VEVENT as bytes. `start`/`end` are naive datetimes (dates when all_day)."""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{dtstamp or utc_stamp()}",
+    ]
+    if all_day:
+        lines.append(f"DTSTART;VALUE=DATE:{fmt_date(start)}")
+        if end:
+            lines.append(f"DTEND;VALUE=DATE:{fmt_date(end)}")
+    else:
+        lines.append(f"DTSTART:{fmt_datetime(start)}")
+        if end:
+            lines.append(f"DTEND:{fmt_datetime(end)}")
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+    lines.append(f"SUMMARY:{escape_text(summary)}")
+    if location:
+        lines.append(f"LOCATION:{escape_text(location)}")
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    if categories:
+        lines.append(f"CATEGORIES:{escape_text(categories)}")
+    lines.append("END:VEVENT")
+    return b"".join(fold(l) for l in lines)
+
+
+def weekly_rrule(weekdays, until):
+    """RRULE for a meeting on `weekdays` (0=Mon) every week through the day `until`."""
+    days = ",".join(BYDAY[d] for d in sorted(set(weekdays)))
+    return f"FREQ=WEEKLY;BYDAY={days};UNTIL={fmt_date(until)}T235959"
+
+
+def iter_calendar(name, events, refresh_minutes=60):
+    """Yield a whole VCALENDAR: header, each pre-rendered VEVENT from `events`, footer."""
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:PT{refresh_minutes}M",
+        f"X-PUBLISHED-TTL:PT{refresh_minutes}M",
+    ]
+    yield b"".join(fold(l) for l in header)
+    yield from events
+    yield fold("END:VCALENDAR")
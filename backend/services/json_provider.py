@@ -0,0 +1,50 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:   # optional; the stdlib encoder is used instead
+    orjson = None
+
+# ===== JSON provider =====
+#
+# Schedules are lists of thousands of small dicts, and Flask's stdlib encoder
+# spends most of a cached /api/schedule request serializing them. When
+# orjson is installed, jsonify() goes through it instead. The output means
+# the same: keys are still sorted, and dates still go through Flask's
+# default() and come out as HTTP dates. Two things differ: non-ASCII
+# characters are written as UTF-8 rather than \u escapes, and anything
+# orjson can't encode is handed back to the stdlib encoder.
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that serializes with orjson when it is available."""
+
+    def _orjson_options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dumpb(self, obj, indent=False):
+        """orjson bytes, or None if orjson is missing or can't encode obj."""
+        if orjson is None:
+            return None
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        except TypeError:
+            return None   # e.g. ints beyond 64 bits
+
+    def dumps(self, obj, **kwargs):
+        # Callers asking for stdlib-specific formatting (cls=, separators=...) get the stdlib
+        data = None if kwargs else self._dumpb(obj)
+        return data.decode("utf-8") if data is not None else super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        data = self._dumpb(obj, indent)
+        if data is None:
+            return super().response(obj)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
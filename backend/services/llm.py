@@ -0,0 +1,379 @@
+import os
+import time
+import random
+import threading
+import httpx
+import openai
+from openai import OpenAI
+from dotenv import load_dotenv
+from services.metrics import registry
+
+load_dotenv()
+
+# ===== LLM gateway =====
+#
+# Every chat-completion call in the app goes through `llm`:
+#   - one OpenAI client over one pooled httpx connection pool
+#   - a deadline per call (LLM_TIMEOUT_SECONDS unless the caller passes one)
+#   - bounded retries with exponential backoff + full jitter on transient errors
+#   - a global and a per-user cap on in-flight requests
+#   - a circuit breaker that fails fast while the upstream keeps failing
+# OPENAI_BASE_URL points the client at a local stub server for tests.
+
+LLM_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_CONCURRENCY_PER_USER = int(os.getenv("LLM_MAX_CONCURRENCY_PER_USER", "2"))
+LLM_POOL_CONNECTIONS = int(os.getenv("LLM_POOL_CONNECTIONS", "20"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# USD per 1M tokens (prompt, completion), used for the cost counter.
+# Override or extend with LLM_PRICES="model=prompt:completion,model2=...".
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+for _entry in filter(None, os.getenv("LLM_PRICES", "").split(",")):
+    _model, _, _rates = _entry.partition("=")
+    _prompt, _, _completion = _rates.partition(":")
+    MODEL_PRICES[_model.strip()] = (float(_prompt), float(_completion))
+
+# Worth retrying and counted against the breaker; anything else (bad request,
+# auth) is the caller's problem and is raised immediately.
+TRANSIENT_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+LLM_DURATION = registry.histogram(
+    "llm_request_duration_seconds",
+    "Wall time of LLM calls, including waiting for a slot and retries.",
+    ("route", "model", "outcome"),
+)
+LLM_FIRST_CHUNK = registry.histogram(
+    "llm_stream_first_chunk_seconds",
+    "Time until the first streamed chunk arrives.",
+    ("route", "model"),
+)
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total",
+    "Tokens billed, by kind (prompt/completion).",
+    ("route", "model", "kind"),
+)
+LLM_COST = registry.counter(
+    "llm_cost_usd_total",
+    "Estimated spend from MODEL_PRICES.",
+    ("route", "model"),
+)
+LLM_RETRIES = registry.counter(
+    "llm_retries_total",
+    "Retried attempts after transient errors.",
+    ("route", "model"),
+)
+
+
+class LLMError(Exception):
+    """Raised by the gateway itself (as opposed to errors passed through from the API)."""
+
+
+class LLMUnavailable(LLMError):
+    def __init__(self):
+        super().__init__("The AI service is temporarily unavailable, please try again shortly")
+
+
+class LLMTimeout(LLMError):
+    def __init__(self):
+        super().__init__("The AI service did not answer in time")
+
+
+class LLMBusy(LLMError):
+    def __init__(self):
+        super().__init__("Too many AI requests in flight, please try again shortly")
+
+
+def call_outcome(exc):
+    """Metric label for how a call ended (None = success)."""
+    if exc is None:
+        return "ok"
+    if isinstance(exc, LLMBusy):
+        return "busy"
+    if isinstance(exc, LLMUnavailable):
+        return "unavailable"
+    if isinstance(exc, (LLMTimeout, openai.APITimeoutError)):
+        return "timeout"
+    if isinstance(exc, openai.RateLimitError):
+        return "rate_limited"
+    if isinstance(exc, GeneratorExit):
+        return "cancelled"
+    if isinstance(exc, TRANSIENT_ERRORS):
+        return "transient_error"
+    return "error"
+
+
+def record_usage(route, model, usage):
+    """Add a response's token usage (and its estimated cost) to the counters."""
+    if usage is None:
+        return
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    completion = getattr(usage, "completion_tokens", 0) or 0
+    LLM_TOKENS.inc(prompt, route=route, model=model, kind="prompt")
+    LLM_TOKENS.inc(completion, route=route, model=model, kind="completion")
+    prices = MODEL_PRICES.get(model)
+    if prices:
+        LLM_COST.inc((prompt * prices[0] + completion * prices[1]) / 1_000_000, route=route, model=model)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive transient failures;
+    open -> half-open after `cooldown` seconds, letting one probe through;
+    the probe's outcome closes or re-opens it. A probe that ends without a
+    verdict (deadline hit before sending, client hung up mid-stream) is
+    released and the next call probes again.
+    """
+
+    def __init__(self, threshold=LLM_BREAKER_FAILURES, cooldown=LLM_BREAKER_COOLDOWN_SECONDS):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                return "half_open"
+            return "open"
+
+    def allow(self):
+        """
+        "closed" if the call may go ahead, "probe" if it is the half-open
+        probe, None if the breaker is open. A probe must end in
+        record_success(), record_failure() or release("probe").
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at < self.cooldown or self._probing:
+                return None
+            self._probing = True
+            return "probe"
+
+    def release(self, ticket):
+        """End a call with no verdict on the upstream; the state is left as it was."""
+        if ticket == "probe":
+            with self._lock:
+                self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class LLMGateway:
+    def __init__(self, client=None, base_url=LLM_BASE_URL, timeout=LLM_TIMEOUT_SECONDS,
+                 max_retries=LLM_MAX_RETRIES, max_concurrency=LLM_MAX_CONCURRENCY,
+                 max_per_user=LLM_MAX_CONCURRENCY_PER_USER, breaker=None):
+        self._client = client
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_per_user = max_per_user
+        self.breaker = breaker or CircuitBreaker()
+        self._global = threading.BoundedSemaphore(max_concurrency)
+        self._in_flight = {}    # user_id -> requests in flight; entries vanish at zero
+        self._user_cond = threading.Condition()
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The shared OpenAI client, built on first use so importing this module is free."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    http_client = httpx.Client(
+                        limits=httpx.Limits(
+                            max_connections=LLM_POOL_CONNECTIONS,
+                            max_keepalive_connections=LLM_POOL_CONNECTIONS,
+                        ),
+                        timeout=httpx.Timeout(self.timeout, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+                    )
+                    self._client = OpenAI(
+                        api_key=os.getenv("OPENAI_API_KEY"),
+                        base_url=self.base_url,
+                        max_retries=0,   # retries are ours, so they respect the deadline and the breaker
+                        http_client=http_client,
+                    )
+        return self._client
+
+    # ----- concurrency slots -----
+
+    def _acquire_user(self, user_id, deadline):
+        with self._user_cond:
+            while self._in_flight.get(user_id, 0) >= self.max_per_user:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LLMBusy()
+                self._user_cond.wait(remaining)
+            self._in_flight[user_id] = self._in_flight.get(user_id, 0) + 1
+
+    def _release_user(self, user_id):
+        with self._user_cond:
+            left = self._in_flight.get(user_id, 1) - 1
+            if left:
+                self._in_flight[user_id] = left
+            else:
+                self._in_flight.pop(user_id, None)
+            self._user_cond.notify_all()
+
+    def _acquire(self, user_id, deadline):
+        if user_id:
+            self._acquire_user(user_id, deadline)
+        if not self._global.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            if user_id:
+                self._release_user(user_id)
+            raise LLMBusy()
+
+    def _release(self, user_id):
+        self._global.release()
+        if user_id:
+            self._release_user(user_id)
+
+    # ----- calls -----
+
+    def _backoff(self, attempt, deadline):
+        """Sleep with full jitter; False if the deadline leaves no room for another attempt."""
+        delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * (2 ** attempt)))
+        if time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _create(self, route, deadline, kwargs):
+        """
+        chat.completions.create with retries inside the deadline. Caller holds
+        the slots. Returns (response, breaker ticket); for a stream the caller
+        settles the ticket once the stream ends.
+        """
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMTimeout()
+            ticket = self.breaker.allow()
+            if not ticket:
+                raise LLMUnavailable()
+            try:
+                response = self.client.chat.completions.create(timeout=remaining, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or not self._backoff(attempt, deadline):
+                    raise
+                attempt += 1
+                LLM_RETRIES.inc(route=route, model=kwargs.get("model", "unknown"))
+                print(f"[LLM] {route}: retrying after {type(e).__name__} (attempt {attempt + 1})")
+                continue
+            except openai.APIStatusError:
+                # A 400/401/404...: the request was bad, but the upstream answered
+                self.breaker.record_success()
+                raise
+            except BaseException:
+                self.breaker.release(ticket)
+                raise
+            return response, ticket
+
+    def chat(self, route="unknown", user_id=None, timeout=None, **kwargs):
+        """
+        Drop-in for client.chat.completions.create(**kwargs).
+        `route` names the caller; `timeout` is the total deadline in seconds
+        across all attempts, including time spent waiting for a slot.
+        """
+        model = kwargs.get("model", "unknown")
+        started = time.monotonic()
+        deadline = started + (timeout or self.timeout)
+        error = None
+        try:
+            self._acquire(user_id, deadline)
+            try:
+                response, _ = self._create(route, deadline, kwargs)
+                self.breaker.record_success()
+            finally:
+                self._release(user_id)
+            record_usage(route, model, getattr(response, "usage", None))
+            return response
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            LLM_DURATION.observe(time.monotonic() - started, route=route, model=model, outcome=call_outcome(error))
+
+    def stream_chat(self, route="unknown", user_id=None, timeout=None, **kwargs):
+        """
+        Generator over streamed completion chunks. Slots are held until the
+        stream ends or the generator is closed, which also closes the
+        upstream response. Only opening the stream is retried.
+        Usage is requested on the final chunk so streamed calls are metered too.
+        """
+        model = kwargs.get("model", "unknown")
+        kwargs = dict(kwargs, stream=True)
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        started = time.monotonic()
+        deadline = started + (timeout or self.timeout)
+        error = None
+        stream = None
+        try:
+            self._acquire(user_id, deadline)
+            try:
+                stream, ticket = self._create(route, deadline, kwargs)
+                try:
+                    first = True
+                    for chunk in stream:
+                        if first:
+                            LLM_FIRST_CHUNK.observe(time.monotonic() - started, route=route, model=model)
+                            first = False
+                        record_usage(route, model, getattr(chunk, "usage", None))
+                        yield chunk
+                    self.breaker.record_success()
+                except TRANSIENT_ERRORS:
+                    self.breaker.record_failure()
+                    raise
+                except BaseException:
+                    # Client went away (GeneratorExit) or a non-transient error mid-stream
+                    self.breaker.release(ticket)
+                    raise
+            finally:
+                if stream is not None:
+                    stream.close()
+                self._release(user_id)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            LLM_DURATION.observe(time.monotonic() - started, route=route, model=model, outcome=call_outcome(error))
+
+    def stats(self):
+        return {"breaker": self.breaker.state, "breaker_failures": self.breaker.failures}
+
+
+llm = LLMGateway()
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+# ===== Deterministic study-session planner =====
+#
+# Places sessions straight into free slots of a WeeklyOccupancy instead of
+# asking the LLM and filtering its output. Every session it returns is
+# inside working hours, on an allowed day, before its deadline and free of
+# conflicts, so the caller can persist the result as-is.
+
+DEFAULT_SESSION_MINUTES = 60
+SLOT_STEP_MINUTES = 30
+LEAD_DAYS = 7   # sessions for a deadline are spread over the week before it
+
+
+def parse_deadline(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _day_slots(day, start_hour, end_hour, length, earliest, latest):
+    """Candidate (start, end) pairs on `day`, in working hours and inside [earliest, latest]."""
+    t = datetime(day.year, day.month, day.day, start_hour)
+    close = datetime(day.year, day.month, day.day, 0) + timedelta(hours=end_hour)
+    step = timedelta(minutes=SLOT_STEP_MINUTES)
+    while t + length <= close:
+        if t >= earliest and t + length <= latest:
+            yield t, t + length
+        t += step
+
+
+def plan_sessions(upcoming, occupancy, now, start_hour=9, end_hour=18,
+                  avoid_weekends=True, sessions_per_week=3,
+                  session_minutes=DEFAULT_SESSION_MINUTES):
+    """
+    Greedy allocator. For each upcoming deadline (dicts with class/kind/title/date,
+    as built by ai_schedule_for_user), aim for `sessions_per_week` sessions spread
+    evenly over the LEAD_DAYS before it, taking the earliest free slot on each
+    target day and falling back to earlier days. Accepted sessions are marked
+    busy in `occupancy` as they are placed.
+
+    Returns a list of {"title", "class_code", "start", "end"} with datetime values.
+    """
+    length = timedelta(minutes=session_minutes)
+    earliest = now.replace(second=0, microsecond=0)
+    per_day = set()   # (class, date): at most one session per class per day
+    planned = []
+
+    ordered = sorted(
+        (u for u in upcoming if parse_deadline(u["date"])),
+        key=lambda u: parse_deadline(u["date"]),
+    )
+    for u in ordered:
+        deadline = parse_deadline(u["date"])
+        if deadline <= earliest:
+            continue
+
+        first_day = earliest.date()
+        lead = min(LEAD_DAYS, (deadline.date() - first_day).days + 1)
+        wanted = max(1, min(sessions_per_week, lead))
+        spacing = max(1, lead // wanted)
+        targets = [deadline.date() - timedelta(days=spacing * k) for k in range(1, wanted + 1)]
+        targets = [d if d >= first_day else first_day for d in targets]
+
+        verb = "Study for" if u["kind"] == "exam" else "Work on"
+        title = f"{verb} {u['title']}"
+
+        for target in targets:
+            day = target
+            placed = False
+            while day >= first_day and not placed:
+                if (u["class"], day) in per_day or (avoid_weekends and day.weekday() >= 5):
+                    day -= timedelta(days=1)
+                    continue
+                for s, e in _day_slots(day, start_hour, end_hour, length, earliest, deadline):
+                    if occupancy.is_free(s, e):
+                        occupancy.add_span(s, e)
+                        per_day.add((u["class"], day))
+                        planned.append({"title": title, "class_code": u["class"], "start": s, "end": e})
+                        placed = True
+                        break
+                day -= timedelta(days=1)
+
+    return planned
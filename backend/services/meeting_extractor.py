@@ -0,0 +1,198 @@
+import re
+
+# ===== Meeting extraction (regex fallback for the AI parser) =====
+#
+# One pass over each line with a single precompiled tokenizer. Tokens are
+# day sets ("MWF", "Tu/Th", "Mon & Wed"), time ranges ("9:00-9:50 AM",
+# "14:00–15:15") and meeting types ("Lecture", "Lab"). A tiny state machine
+# pairs each time range with the day set next to it (either order) and
+# reads an optional "in/at <Location>" right after either of them.
+#
+# Every pattern is a bounded alternation with no nested or lazy quantifiers,
+# and tokens never span lines, so the cost is linear in the text length.
+
+DAY_CODES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Words (case-insensitive) and letter codes (case-sensitive) -> weekday index
+DAY_WORDS = {
+    "mon": 0, "monday": 0,
+    "tu": 1, "tue": 1, "tues": 1, "tuesday": 1,
+    "wed": 2, "weds": 2, "wednesday": 2,
+    "th": 3, "thu": 3, "thur": 3, "thurs": 3, "thursday": 3,
+    "fri": 4, "friday": 4,
+    "sat": 5, "saturday": 5,
+    "sun": 6, "sunday": 6,
+}
+DAY_LETTERS = {"M": 0, "T": 1, "Tu": 1, "W": 2, "Th": 3, "R": 3, "F": 4, "S": 5, "Sa": 5, "U": 6, "Su": 6}
+
+MEETING_TYPES = {
+    "lecture": "Lecture", "lec": "Lecture", "lectures": "Lecture",
+    "discussion": "Discussion", "disc": "Discussion", "dis": "Discussion",
+    "lab": "Lab", "labs": "Lab", "laboratory": "Lab",
+    "recitation": "Recitation", "rec": "Recitation",
+    "seminar": "Seminar", "section": "Section", "studio": "Studio", "tutorial": "Tutorial",
+    "office": "Office Hours",
+    # One-off events, not weekly meetings: the rest of the line is ignored
+    "exam": None, "exams": None, "midterm": None, "final": None, "quiz": None,
+    "due": None, "deadline": None,
+}
+
+_DAY_WORD = r"(?i:mondays?|mon|tuesdays?|tues|tue|tu|wednesdays?|weds|wed|thursdays?|thurs|thur|thu|th|fridays?|fri|saturdays?|sat|sundays?|sun)\.?"
+# Packed letter codes like MWF, TTh, TuTh, TR, MTWRF (weekdays only; two or more)
+_PACKED = r"(?:Tu|Th|M|T|W|R|F){2,5}"
+_LETTER = r"(?:Tu|Th|Sa|Su|M|T|W|R|F|S|U)"
+_DAY_ATOM = rf"(?:{_DAY_WORD}|{_PACKED}|{_LETTER})(?![A-Za-z])"
+_DAY_SET = rf"(?<![A-Za-z]){_DAY_ATOM}(?:\s*(?:/|,|&|\+|and)\s*{_DAY_ATOM}){{0,6}}"
+
+_CLOCK = r"(\d{1,2})(?::([0-5]\d))?(?:\s*([AaPp])\.?[Mm]\.?(?![A-Za-z]))?"
+_TIME_RANGE = rf"(?<![\d:/.]){_CLOCK}\s*(?:-|–|—|to|until)\s*{_CLOCK}(?![\d:])"
+
+_TYPE = r"(?<![A-Za-z])(?i:" + "|".join(sorted(MEETING_TYPES, key=len, reverse=True)) + r")(?![A-Za-z])"
+
+TOKEN_RE = re.compile(rf"(?P<days>{_DAY_SET})|(?P<time>{_TIME_RANGE})|(?P<type>{_TYPE})")
+HAS_DIGIT_RE = re.compile(r"\d")
+LETTERS_RE = re.compile(r"Tu|Th|Sa|Su|M|T|W|R|F|S|U")
+ATOM_RE = re.compile(_DAY_ATOM)
+LOCATION_RE = re.compile(
+    r"[ \t,;:\-–—]{0,4}(?:(?i:in|at|@|location:?)\s+|(?=(?:Room|Rm\.?)\s))"
+    r"((?:[A-Z0-9][\w.#\-]*)(?:[ \t]+(?:[A-Z0-9][\w.#\-]*)){0,5})"
+)
+
+
+def _atom_days(atom):
+    """Weekday indexes for one atom, or None if it isn't a plausible day reference."""
+    word = atom.rstrip(".").lower()
+    if word.endswith("days"):
+        word = word[:-1]   # "Thursdays"
+    if word in DAY_WORDS and not (atom.isupper() and len(atom) <= 2):
+        return [DAY_WORDS[word]]
+    letters = LETTERS_RE.findall(atom)
+    if "".join(letters) != atom:
+        return None
+    days = [DAY_LETTERS[l] for l in letters]
+    # Packed codes are written in week order (MWF, TTh); "FM" or "WM" are not days
+    if any(b <= a for a, b in zip(days, days[1:])):
+        return None
+    return days
+
+
+def parse_day_set(text):
+    """
+    'MWF' -> [0, 2, 4], 'Tu/Th' -> [1, 3], 'Mon & Wed' -> [0, 2].
+    A lone single letter ('M', 'W') is too ambiguous and yields [].
+    """
+    atoms = ATOM_RE.findall(text)
+    if len(atoms) == 1 and len(atoms[0]) == 1:
+        return []
+    days = []
+    for atom in atoms:
+        found = _atom_days(atom)
+        if found is None:
+            return []
+        for d in found:
+            if d not in days:
+                days.append(d)
+    return days
+
+
+def _to_24h(hour, minute, meridiem):
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    elif hour > 23:
+        return None
+    return hour * 60 + minute
+
+
+def parse_time_range(groups):
+    """
+    Groups from a _TIME_RANGE match -> (start_min, end_min) or None.
+    A missing am/pm is borrowed from the other end; with none at all,
+    1:00-7:59 are read as afternoon (classes don't meet before dawn).
+    """
+    h1, m1, a1, h2, m2, a2 = groups
+    if not (m1 or m2 or a1 or a2):
+        return None   # "10-12" is as likely a page or week range as a time
+    h1, h2 = int(h1), int(h2)
+    m1, m2 = int(m1 or 0), int(m2 or 0)
+    a1 = a1.lower() if a1 else None
+    a2 = a2.lower() if a2 else None
+
+    if a1 or a2:
+        end = _to_24h(h2, m2, a2 or a1)
+        start = _to_24h(h1, m1, a1 or a2)
+        if start is not None and end is not None and not a1 and start > end:
+            start = _to_24h(h1, m1, "a")     # 11:00-12:15 PM
+        if start is not None and end is not None and not a2 and end <= start:
+            end = _to_24h(h2, m2, "p")       # 11am-1:15
+    else:
+        if 1 <= h1 <= 7:
+            h1 += 12
+        if (1 <= h2 <= 7 or h2 < h1) and h2 + 12 <= 23:
+            h2 += 12
+        start, end = _to_24h(h1, m1, None), _to_24h(h2, m2, None)
+
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
+
+
+def _hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def extract_meetings_from_text(text: str):
+    """
+    Scan syllabus text for meeting patterns like:
+      MWF 9:00–9:50 AM
+      TuTh 2:30–3:45 PM at Siebel Center 1404
+      Lab: M/W 14:00-15:50 in Room 101
+    Returns a list of meeting dicts with {type, day, start_time, end_time, location};
+    times are 24h "HH:MM". Duplicates (same type/day/times) are dropped.
+    """
+    meetings = []
+    seen = set()
+    for line in (text or "").splitlines():
+        if not HAS_DIGIT_RE.search(line):
+            continue   # no time on this line; skip tokenizing prose
+        meeting_type = "Lecture"
+        days = None        # day set waiting for a time
+        span = None        # time range waiting for a day set
+        location = ""
+
+        for tok in TOKEN_RE.finditer(line):
+            kind = tok.lastgroup
+            if kind == "type":
+                meeting_type = MEETING_TYPES[tok.group("type").lower()]
+                if meeting_type is None:
+                    break
+                continue
+            if kind == "days":
+                # Ambiguous bits like a lone "(M)" keep whatever days came before
+                days = parse_day_set(tok.group("days")) or days
+            else:
+                span = parse_time_range(tok.groups()[2:8])
+                if span is None:
+                    continue
+            # "MWF 9:00-9:50 in X" or "9:00-9:50 MWF in X"
+            loc = LOCATION_RE.match(line, tok.end())
+            if loc:
+                location = loc.group(1).rstrip(".-")
+
+            if days and span:
+                for d in days:
+                    sig = (meeting_type, d, span)
+                    if sig in seen:
+                        continue
+                    seen.add(sig)
+                    meetings.append({
+                        "type": meeting_type,
+                        "day": DAY_CODES[d],
+                        "start_time": _hhmm(span[0]),
+                        "end_time": _hhmm(span[1]),
+                        "location": location,
+                    })
+                days = span = None
+                location = ""
+    return meetings
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from services.calendar_utils import WEEKDAYS, term_dates, normalize_day, parse_clock
+
+# ===== Slot-bitmap occupancy =====
+#
+# Each day is a Python int used as a bitmap of SLOT_MINUTES-wide slots
+# (288 bits at 5 minutes). Recurring class meetings are stored once per
+# weekday and term; one-off events are stored per date. Testing whether a
+# candidate session is free is a single AND of two ints.
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+DEFAULT_MEETING_MINUTES = 50
+
+
+def slot_mask(start_min, end_min):
+    """Bits for every slot touched by [start_min, end_min) minutes after midnight."""
+    lo = max(0, start_min // SLOT_MINUTES)
+    hi = min(SLOTS_PER_DAY, -(-end_min // SLOT_MINUTES))
+    if hi <= lo:
+        hi = min(SLOTS_PER_DAY, lo + 1)
+    return ((1 << (hi - lo)) - 1) << lo
+
+
+def _minutes(dt):
+    return dt.hour * 60 + dt.minute
+
+
+class WeeklyOccupancy:
+    """Busy slots for one user: weekly meeting masks per term plus dated event masks."""
+
+    def __init__(self):
+        self._terms = {}    # (first_date, last_date) -> [mask per weekday]
+        self._dated = {}    # date -> mask
+        self._days = {}     # date -> combined mask (memoized)
+
+    def add_meeting(self, weekday, start_min, end_min, first_date, last_date):
+        masks = self._terms.setdefault((first_date, last_date), [0] * 7)
+        masks[weekday] |= slot_mask(start_min, end_min)
+        self._days.clear()
+
+    def add_span(self, start, end=None):
+        """Mark [start, end) busy, splitting across midnight. No end marks a single slot."""
+        if end is None or end <= start:
+            self._mark(start.date(), slot_mask(_minutes(start), _minutes(start) + 1))
+            return
+        day = start.date()
+        while True:
+            lo = _minutes(start) if day == start.date() else 0
+            hi = _minutes(end) if day == end.date() else 24 * 60
+            if hi > lo:
+                self._mark(day, slot_mask(lo, hi))
+            if day >= end.date():
+                break
+            day += timedelta(days=1)
+
+    def _mark(self, day, mask):
+        self._dated[day] = self._dated.get(day, 0) | mask
+        if day in self._days:
+            self._days[day] |= mask
+
+    def day_mask(self, day):
+        mask = self._days.get(day)
+        if mask is None:
+            mask = self._dated.get(day, 0)
+            wd = day.weekday()
+            for (first, last), masks in self._terms.items():
+                if first <= day <= last:
+                    mask |= masks[wd]
+            self._days[day] = mask
+        return mask
+
+    def is_free(self, start, end):
+        """True if no busy slot intersects [start, end)."""
+        if end <= start:
+            return not (self.day_mask(start.date()) & slot_mask(_minutes(start), _minutes(start) + 1))
+        day = start.date()
+        while day <= end.date():
+            lo = _minutes(start) if day == start.date() else 0
+            hi = _minutes(end) if day == end.date() else 24 * 60
+            if hi > lo and self.day_mask(day) & slot_mask(lo, hi):
+                return False
+            day += timedelta(days=1)
+        return True
+
+
+def build_occupancy(classes, events=()):
+    """
+    Occupancy for a user from their classes' recurring meetings (bounded by
+    each class's term) and persisted events (objects with .start/.end datetimes).
+    """
+    occ = WeeklyOccupancy()
+    for c in classes:
+        term_start, term_end = term_dates(c.term)
+        if not term_start:
+            continue
+        for m in (c.meetings or []):
+            day_num = WEEKDAYS.get(normalize_day(m.get("day")))
+            start_min = parse_clock(m.get("start_time"))
+            if day_num is None or start_min is None:
+                continue
+            end_min = parse_clock(m.get("end_time"))
+            if end_min is None or end_min <= start_min:
+                end_min = start_min + DEFAULT_MEETING_MINUTES
+            occ.add_meeting(day_num, start_min, end_min, term_start.date(), term_end.date())
+    for ev in events:
+        if isinstance(ev.start, datetime):
+            occ.add_span(ev.start, ev.end)
+    return occ
@@ -0,0 +1,90 @@
+import os
+import re
+import hashlib
+from datetime import timedelta
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from db.models import ParseCache, utcnow
+from services.ai_parser import PARSER_MODEL, PARSER_VERSION
+
+# ===== Syllabus parse cache =====
+#
+# The same syllabus gets uploaded over and over (retries, a whole section
+# uploading one PDF). Results are stored in the database keyed by a hash of
+# the whitespace-normalized text plus the parser model/version, so a repeat
+# upload skips the LLM call entirely.
+
+PARSE_CACHE_TTL = timedelta(days=int(os.getenv("PARSE_CACHE_TTL_DAYS", "30")))
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "5000"))
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WS_RE.sub(" ", text or "").strip()
+
+
+def parse_cache_key(text: str) -> str:
+    raw = f"{PARSER_MODEL}|{PARSER_VERSION}|{normalize_text(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(parsed: dict) -> bool:
+    """Only keep real results; the parser's empty fallback means it failed or the text was blank."""
+    if not parsed:
+        return False
+    return any(parsed.get(k) for k in ("title", "term", "instructor", "assignments", "exams", "meetings"))
+
+
+def get_cached_parse(db, key):
+    row = db.get(ParseCache, key)
+    if not row:
+        return None
+    now = utcnow()
+    if row.created_at < now - PARSE_CACHE_TTL:
+        db.delete(row)
+        db.commit()
+        return None
+    row.last_used_at = now
+    row.hits = (row.hits or 0) + 1
+    db.commit()
+    return row.result
+
+
+def store_parse(db, key, result):
+    """Insert or refresh an entry. Safe when several workers parse the same syllabus at once."""
+    now = utcnow()
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(ParseCache).values(
+            key=key, result=result, created_at=now, last_used_at=now, hits=0)
+        db.execute(stmt.on_conflict_do_update(index_elements=["key"], set_={
+            "result": stmt.excluded.result,
+            "created_at": stmt.excluded.created_at,
+            "last_used_at": stmt.excluded.last_used_at,
+        }))
+        db.commit()
+    else:
+        try:
+            db.merge(ParseCache(key=key, result=result, created_at=now, last_used_at=now, hits=0))
+            db.commit()
+        except IntegrityError:
+            db.rollback()   # another worker stored the same key first
+    evict(db, now)
+
+
+def evict(db, now=None):
+    """Drop expired entries, then the least recently used ones beyond the size cap."""
+    now = now or utcnow()
+    db.query(ParseCache).filter(ParseCache.created_at < now - PARSE_CACHE_TTL).delete(synchronize_session=False)
+    excess = db.query(func.count(ParseCache.key)).scalar() - PARSE_CACHE_MAX_ENTRIES
+    if excess > 0:
+        stale = (
+            select(ParseCache.key)
+            .order_by(ParseCache.last_used_at.asc())
+            .limit(excess)
+            .scalar_subquery()
+        )
+        db.query(ParseCache).filter(ParseCache.key.in_(stale)).delete(synchronize_session=False)
+    db.commit()
@@ -0,0 +1,212 @@
+import os
+import uuid
+import socket
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from db.base import SessionLocal
+from db.models import ParseJob, utcnow
+from services.ai_parser import parse_with_ai
+from services.parser_service import save_upload, UploadRejected
+from services.extraction_pool import extraction_pool
+from services.parse_cache import parse_cache_key, get_cached_parse, store_parse, is_cacheable
+
+# ===== Background syllabus parse jobs =====
+#
+# POST /api/classes/parse only saves the upload and records a ParseJob row;
+# a small thread pool does the extraction (itself offloaded to the
+# extraction process pool) and the LLM call. Job state lives in the
+# database, so any worker can answer status polls and queued jobs survive
+# a restart. A job is claimed with a conditional UPDATE, so several
+# processes resuming the same queue never run it twice.
+#
+# A running job records the process that claimed it (worker_id). When that
+# process is gone (a restart, a crashed gunicorn worker), the job is
+# re-queued at startup and reported as failed to anyone polling it, instead
+# of staying "running" forever.
+
+PARSE_JOB_WORKERS = int(os.getenv("PARSE_JOB_WORKERS", "4"))
+PARSE_JOB_RETENTION = timedelta(hours=int(os.getenv("PARSE_JOB_RETENTION_HOURS", "24")))
+PARSE_JOB_STALE_AFTER = timedelta(minutes=int(os.getenv("PARSE_JOB_STALE_MINUTES", "15")))
+
+_executor = ThreadPoolExecutor(max_workers=PARSE_JOB_WORKERS, thread_name_prefix="parse-job")
+_HOST = socket.gethostname()
+_worker = {}   # pid -> worker id; a forked child gets its own
+
+
+def worker_id():
+    """This process's identity: host:pid:boot-nonce (the nonce tells a reused pid apart)."""
+    pid = os.getpid()
+    if pid not in _worker:
+        _worker.clear()
+        _worker[pid] = f"{_HOST}:{pid}:{uuid.uuid4().hex[:8]}"
+    return _worker[pid]
+
+
+def owner_alive(owner):
+    """
+    True / False when we can tell whether the process that claimed a job is
+    still running, None when we can't (it ran on another host).
+    """
+    if not owner:
+        return False
+    if owner == worker_id():
+        return True
+    host, _, rest = owner.partition(":")
+    pid, _, _ = rest.partition(":")
+    if host != _HOST or not pid.isdigit():
+        return None
+    if int(pid) == os.getpid():
+        return False   # an earlier process that had our pid
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return None
+    return True
+
+
+def job_view(job):
+    out = {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": job.progress,
+        "filename": job.filename,
+    }
+    if job.status == "done":
+        out["draft"] = job.result
+        out["cached"] = job.cached
+    elif job.status == "failed":
+        out["error"] = job.error
+    return out
+
+
+def submit_parse_job(db, user_id, file_storage):
+    """Save the upload, record a queued job and hand it to the worker pool. Raises UploadRejected."""
+    path = save_upload(file_storage)
+    now = utcnow()
+    job = ParseJob(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        filename=file_storage.filename,
+        upload_path=path,
+        status="queued",
+        progress=0,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(job)
+    prune_finished_jobs(db, now)
+    db.commit()
+    _executor.submit(run_parse_job, job.id)
+    return job
+
+
+def _update(db, job, **fields):
+    for k, v in fields.items():
+        setattr(job, k, v)
+    job.updated_at = utcnow()
+    db.commit()
+
+
+def run_parse_job(job_id):
+    db = SessionLocal()
+    try:
+        claimed = (
+            db.query(ParseJob)
+            .filter_by(id=job_id, status="queued")
+            .update({"status": "running", "stage": "extracting", "progress": 10,
+                     "worker_id": worker_id(), "updated_at": utcnow()}, synchronize_session=False)
+        )
+        db.commit()
+        if not claimed:
+            return
+        job = db.get(ParseJob, job_id)
+
+        try:
+            text = extraction_pool.extract(job.upload_path, job.filename)
+            _update(db, job, stage="parsing", progress=40)
+
+            key = parse_cache_key(text)
+            parsed = get_cached_parse(db, key)
+            cached = parsed is not None
+            if not cached:
+                parsed = parse_with_ai(text, user_id=job.user_id)
+                if is_cacheable(parsed):
+                    store_parse(db, key, parsed)
+
+            _update(db, job, status="done", stage=None, progress=100, result=parsed, cached=cached)
+        except UploadRejected as e:
+            _update(db, job, status="failed", stage=None, error=str(e))
+        except Exception as e:
+            print(f"[Parse Job Error] {job_id}: {e}")
+            _update(db, job, status="failed", stage=None, error="Could not parse the syllabus")
+        finally:
+            if job.upload_path and os.path.exists(job.upload_path):
+                os.unlink(job.upload_path)
+    finally:
+        db.close()
+
+
+def prune_finished_jobs(db, now=None):
+    now = now or utcnow()
+    db.query(ParseJob).filter(
+        ParseJob.status.in_(["done", "failed"]),
+        ParseJob.updated_at < now - PARSE_JOB_RETENTION,
+    ).delete(synchronize_session=False)
+
+
+def is_orphaned(job, now=None):
+    """A queued/running job nobody will finish: its process died, or it has been silent too long."""
+    if job.status not in ("queued", "running"):
+        return False
+    now = now or utcnow()
+    if job.status == "running" and owner_alive(job.worker_id) is False:
+        return True
+    return job.updated_at < now - PARSE_JOB_STALE_AFTER
+
+
+def fail_if_orphaned(db, job):
+    """Status-poll check: mark an orphaned job failed so clients stop waiting on it."""
+    if is_orphaned(job):
+        _update(db, job, status="failed", stage=None, error="Interrupted, please upload again")
+    return job
+
+
+def resume_pending_jobs():
+    """
+    On startup: re-queue jobs whose process died (owner not alive) or that
+    never started, as long as their upload is still on disk, and fail the
+    rest. Jobs run by a live sibling worker are left alone; ones claimed on
+    another host are only failed once silent for PARSE_JOB_STALE_AFTER.
+    """
+    db = SessionLocal()
+    try:
+        now = utcnow()
+        for job in db.query(ParseJob).filter_by(status="running").all():
+            alive = owner_alive(job.worker_id)
+            if alive is None and job.updated_at < now - PARSE_JOB_STALE_AFTER:
+                alive = False
+            if alive is False:
+                job.status, job.stage, job.progress, job.worker_id = "queued", None, 0, None
+                job.updated_at = now
+        db.flush()   # so the queued query below picks them up
+
+        resumed = 0
+        for job in db.query(ParseJob).filter_by(status="queued").all():
+            if job.upload_path and os.path.exists(job.upload_path):
+                _executor.submit(run_parse_job, job.id)
+                resumed += 1
+            else:
+                job.status = "failed"
+                job.stage = None
+                job.error = "Upload expired, please upload again"
+                job.updated_at = now
+        db.commit()
+        if resumed:
+            print(f"[Parse Jobs] Resumed {resumed} queued job(s).")
+    finally:
+        db.close()
@@ -1,14 +1,94 @@
-import io
-from pdfminer.high_level import extract_text
+import os
+import tempfile
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTTextContainer
+from services.ai_parser import MAX_PROMPT_CHARS
 
-def extract_text_from_upload(file_storage) -> str:
+# Uploads are copied in chunks to a spooled temp file (memory up to
+# SPOOL_MEMORY_BYTES, disk beyond) and PDFs are read one page at a time,
+# stopping once we have as much text as the parser will ever use.
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "60"))
+TEXT_CHAR_BUDGET = MAX_PROMPT_CHARS
+SPOOL_MEMORY_BYTES = 1024 * 1024
+CHUNK_BYTES = 64 * 1024
+
+
+class UploadRejected(ValueError):
+    """The upload is over a configured limit; carries the HTTP status to answer with."""
+
+    def __init__(self, message, status=413):
+        super().__init__(message)
+        self.status = status
+
+
+def _copy_limited(stream, dst, max_bytes):
+    total = 0
+    while True:
+        chunk = stream.read(CHUNK_BYTES)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadRejected(f"File is larger than {max_bytes // (1024 * 1024)} MB")
+        dst.write(chunk)
+
+
+def spool_upload(file_storage, max_bytes=MAX_UPLOAD_BYTES):
+    """Copy an upload into a SpooledTemporaryFile, refusing anything over max_bytes."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    try:
+        _copy_limited(file_storage.stream, spool, max_bytes)
+    except UploadRejected:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def save_upload(file_storage, max_bytes=MAX_UPLOAD_BYTES) -> str:
     """
-    Extract raw text from uploaded file (.pdf or .txt).
+    Copy an upload to a named temp file another process can open.
+    Returns the path; the caller is responsible for deleting it.
+    """
+    suffix = os.path.splitext(file_storage.filename or "")[1].lower()
+    fd, path = tempfile.mkstemp(prefix="syllabus-", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as dst:
+            _copy_limited(file_storage.stream, dst, max_bytes)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def extract_text_from_file(fp, filename, char_budget=TEXT_CHAR_BUDGET, max_pages=MAX_PDF_PAGES) -> str:
+    """
+    Extract up to char_budget characters from an open binary file (.pdf or .txt).
+    PDFs are laid out page by page and extraction stops at the budget or max_pages.
     """
-    filename = file_storage.filename.lower()
-    data = file_storage.read()
+    if (filename or "").lower().endswith(".txt"):
+        # UTF-8 is at most 4 bytes per character
+        return fp.read(char_budget * 4).decode("utf-8", errors="ignore")[:char_budget]
 
-    if filename.endswith(".txt"):
-        return data.decode("utf-8", errors="ignore")
+    parts = []
+    total = 0
+    for page in extract_pages(fp, maxpages=max_pages, laparams=LAParams()):
+        for element in page:
+            if isinstance(element, LTTextContainer):
+                text = element.get_text()
+                parts.append(text)
+                total += len(text)
+        parts.append("\f")
+        if total >= char_budget:
+            break
+    return "".join(parts)[:char_budget]
 
-    return extract_text(io.BytesIO(data))
\ No newline at end of file
+
+def extract_text_from_upload(file_storage) -> str:
+    """
+    Extract raw text from uploaded file (.pdf or .txt).
+    Raises UploadRejected if the file is over MAX_UPLOAD_BYTES.
+    """
+    with spool_upload(file_storage) as fp:
+        return extract_text_from_file(fp, file_storage.filename)
@@ -0,0 +1,149 @@
+import re
+import threading
+from collections import OrderedDict
+
+# ===== Local chat relevance pre-filter =====
+#
+# Decides the clear cases of "is this about the student's classes?"
+# without an LLM call: keyword scoring over generic course/schedule
+# vocabulary plus the user's own class codes, titles, instructors and
+# assignment/exam names. Returns None when unsure so the caller can fall
+# back to the LLM check.
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+
+DOMAIN_TERMS = {
+    "exam", "exams", "midterm", "midterms", "final", "finals", "quiz", "quizzes", "test", "tests",
+    "homework", "hw", "assignment", "assignments", "due", "deadline", "deadlines", "submit",
+    "submission", "lecture", "lectures", "lab", "labs", "discussion", "recitation", "section",
+    "class", "classes", "course", "courses", "syllabus", "professor", "prof", "instructor",
+    "ta", "tas", "schedule", "calendar", "study", "studying", "grade", "grades", "grading",
+    "project", "projects", "essay", "paper", "reading", "readings", "semester", "term",
+    "office", "units", "credits", "weight", "weighted", "percent", "meeting", "meetings",
+}
+TIME_TERMS = {
+    "when", "today", "tomorrow", "tonight", "week", "weekly", "weekend", "next", "upcoming",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "time", "date", "dates", "days", "morning", "afternoon", "evening", "month",
+}
+OFF_TOPIC_TERMS = {
+    "weather", "recipe", "recipes", "joke", "jokes", "poem", "song", "lyrics", "movie", "movies",
+    "bitcoin", "crypto", "stock", "stocks", "nba", "nfl", "football", "soccer", "celebrity",
+    "horoscope", "dating", "girlfriend", "boyfriend", "game", "games", "restaurant", "pizza",
+}
+STOPWORDS = {
+    "of", "to", "in", "on", "at", "is", "it", "me", "my", "do", "be", "an", "or", "if", "so",
+    "up", "we", "us", "am", "as", "by", "hi", "hey", "the", "and", "for", "you", "your", "are", "was", "what", "whats", "who", "how", "why",
+    "can", "could", "would", "should", "does", "did", "have", "has", "had", "with", "about",
+    "this", "that", "there", "their", "they", "them", "from", "into", "tell", "give", "please",
+    "any", "all", "some", "much", "many", "more", "most", "out", "get", "got", "need", "want",
+    "introduction", "intro", "principles", "fundamentals", "topics", "advanced", "basic", "ii",
+    "iii", "part", "unit", "assignment", "exam",
+}
+
+YES_SCORE = 1.0
+TIME_WEIGHT = 0.5
+MIN_TOKENS_FOR_NO = 3
+
+
+def normalize_message(message: str) -> str:
+    return _NORMALIZE_RE.sub(" ", (message or "").lower()).strip()
+
+
+def tokenize(text: str):
+    """Lowercase word tokens, plus joined letter+number pairs so 'CS 101' also yields 'cs101'."""
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    joined = [a + b for a, b in zip(tokens, tokens[1:]) if a.isalpha() and b.isdigit()]
+    return tokens + joined
+
+
+def user_vocabulary(classes):
+    """Distinctive tokens from a user's class rows (code, title, instructor, assignment/exam titles)."""
+    vocab = set()
+    for c in classes:
+        for field in (c.code, c.title, c.instructor):
+            vocab.update(tokenize(field))
+        if c.code:
+            vocab.add(_NORMALIZE_RE.sub("", c.code.lower()))
+        for item in (c.assignments or []) + (c.exams or []):
+            vocab.update(tokenize(item.get("title")))
+    return {t for t in vocab if len(t) >= 3 and t not in STOPWORDS}
+
+
+def classify(message: str, vocab=frozenset()):
+    """
+    Returns (verdict, generic) where verdict is "yes", "no" or None (unsure),
+    and generic is True when the verdict did not depend on the user's vocabulary.
+    """
+    tokens = tokenize(message)
+    content = [t for t in tokens if t not in STOPWORDS and len(t) > 1]
+
+    domain = sum(1.0 for t in tokens if t in DOMAIN_TERMS)
+    personal = sum(1.0 for t in tokens if t in vocab and t not in DOMAIN_TERMS)
+    timing = sum(TIME_WEIGHT for t in tokens if t in TIME_TERMS)
+    score = domain + personal + timing
+    off_topic = any(t in OFF_TOPIC_TERMS for t in tokens)
+
+    # "final game tonight": mixed signals are for the LLM to settle
+    if off_topic and score > 0:
+        return None, False
+    # Time words only add weight; a yes needs a real course or class term
+    if domain and domain + timing >= YES_SCORE:
+        return "yes", True
+    if domain + personal and score >= YES_SCORE:
+        return "yes", False
+    if score == 0 and off_topic:
+        return "no", False
+    if score == 0 and len(content) >= MIN_TOKENS_FOR_NO:
+        return "no", False
+    return None, False
+
+
+class VerdictCache:
+    """Bounded LRU of user-independent relevance verdicts keyed by normalized message."""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, message):
+        key = normalize_message(message)
+        with self._lock:
+            verdict = self._items.get(key)
+            if verdict is not None:
+                self._items.move_to_end(key)
+            return verdict
+
+    def put(self, message, verdict):
+        key = normalize_message(message)
+        with self._lock:
+            self._items[key] = verdict
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+verdict_cache = VerdictCache()
+
+
+def check_relevance(message, classes, llm_check):
+    """
+    Cache -> local classifier -> llm_check(message) fallback.
+    Returns (is_relevant, source) where source is "cache", "local" or "llm".
+    Verdicts that depended on this user's own classes are not cached.
+    """
+    cached = verdict_cache.get(message)
+    if cached is not None:
+        return cached == "yes", "cache"
+
+    verdict, generic = classify(message, user_vocabulary(classes))
+    if verdict is not None:
+        if generic:
+            verdict_cache.put(message, verdict)
+        return verdict == "yes", "local"
+
+    verdict = "yes" if llm_check(message) else "no"
+    verdict_cache.put(message, verdict)
+    return verdict == "yes", "llm"
@@ -0,0 +1,184 @@
+import os
+import re
+import time
+import random
+import cProfile
+import threading
+from datetime import datetime
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from services.metrics import registry
+
+# ===== Request timing =====
+#
+# Per-endpoint latency, DB time / query count (from engine cursor events)
+# and response size, exported through /api/metrics. Every response also
+# carries a Server-Timing header so the numbers show up in the browser's
+# network panel.
+#
+# Optional profiling: a request is run under cProfile when
+#   - PROFILE_SAMPLE_RATE > 0 and it is sampled (e.g. 0.01 = 1%), or
+#   - it sends `X-Profile: <PROFILE_TOKEN>` (only if PROFILE_TOKEN is set).
+# Sampled profiles are written to PROFILE_DIR when the request took longer
+# than PROFILE_SLOW_MS; header-triggered ones are always written.
+# Inspect with `python -m pstats <file>` or snakeviz.
+#
+# Streamed responses (SSE) are timed until their headers are sent.
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "500"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+REQUEST_SLOW_MS = float(os.getenv("REQUEST_SLOW_MS", "1000"))
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request, by endpoint.",
+    ("method", "endpoint", "status"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUEST_DB_SECONDS = registry.histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request.",
+    ("method", "endpoint"),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ("method", "endpoint"),
+    buckets=QUERY_BUCKETS,
+)
+RESPONSE_SIZE = registry.histogram(
+    "http_response_size_bytes",
+    "Response body size (non-streamed responses).",
+    ("method", "endpoint"),
+    buckets=SIZE_BUCKETS,
+)
+PROFILES_WRITTEN = registry.counter(
+    "http_profiles_written_total",
+    "cProfile dumps written for slow or requested requests.",
+    ("endpoint",),
+)
+
+# cProfile can't run two profilers at once in one process reliably, so
+# concurrent requests skip profiling instead of waiting.
+_profile_lock = threading.Lock()
+
+
+def endpoint_label():
+    """Route pattern (not the raw path) so metric cardinality stays bounded."""
+    return request.url_rule.rule if request.url_rule else "<unmatched>"
+
+
+# ----- DB time via engine events -----
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    # Background jobs (parse worker threads) have no request to charge this to
+    if has_request_context() and "db_queries" in g:
+        g.db_queries += 1
+        g.db_seconds += elapsed
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ----- profiling -----
+
+def _wants_profile():
+    if PROFILE_TOKEN and request.headers.get("X-Profile") == PROFILE_TOKEN:
+        return "header"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+def _dump_profile(profiler, endpoint, elapsed_ms):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", endpoint).strip("_") or "root"
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = os.path.join(PROFILE_DIR, f"{stamp}-{request.method}-{slug}-{int(elapsed_ms)}ms.prof")
+    profiler.dump_stats(path)
+    PROFILES_WRITTEN.inc(endpoint=endpoint)
+    print(f"[Timing] Profile written: {path}")
+
+
+def _stop_profiler():
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _profile_lock.release()
+    return profiler
+
+
+# ----- hooks -----
+
+def _start_timer():
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+    g.profile_reason = _wants_profile()
+    if g.profile_reason and _profile_lock.acquire(blocking=False):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+
+def _record_timing(response):
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    profiler = _stop_profiler()
+    elapsed = time.perf_counter() - started
+    elapsed_ms = elapsed * 1000
+    endpoint = endpoint_label()
+    method = request.method
+
+    REQUEST_DURATION.observe(elapsed, method=method, endpoint=endpoint, status=str(response.status_code))
+    REQUEST_DB_SECONDS.observe(g.db_seconds, method=method, endpoint=endpoint)
+    REQUEST_DB_QUERIES.observe(g.db_queries, method=method, endpoint=endpoint)
+    if not response.is_streamed:
+        size = response.calculate_content_length()
+        if size is not None:
+            RESPONSE_SIZE.observe(size, method=method, endpoint=endpoint)
+
+    response.headers.add(
+        "Server-Timing",
+        f"app;dur={elapsed_ms:.1f}, db;dur={g.db_seconds * 1000:.1f};desc=\"{g.db_queries} queries\"",
+    )
+
+    if elapsed_ms >= REQUEST_SLOW_MS:
+        print(f"[Timing] Slow request: {method} {endpoint} {elapsed_ms:.0f}ms "
+              f"({g.db_queries} queries, {g.db_seconds * 1000:.0f}ms in DB)")
+
+    if profiler is not None and (g.profile_reason == "header" or elapsed_ms >= PROFILE_SLOW_MS):
+        try:
+            _dump_profile(profiler, endpoint, elapsed_ms)
+        except OSError as e:
+            print(f"[Timing] Could not write profile: {e}")
+    return response
+
+
+def _cleanup(exc):
+    # after_request is skipped when a handler raises; don't leave the profiler running
+    _stop_profiler()
+
+
+def init_request_timing(app, engine):
+    """Install the timing hooks on the app and the query listeners on the engine."""
+    instrument_engine(engine)
+    app.before_request(_start_timer)
+    app.after_request(_record_timing)
+    app.teardown_request(_cleanup)
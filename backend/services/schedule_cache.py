@@ -0,0 +1,205 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# ===== Per-user schedule cache =====
+#
+# Entries are keyed by (user_id, window) and stamped with the user's
+# schedule_version. A lookup only hits when the stamp matches the version
+# just read from the database, so a process that missed an invalidation
+# (another gunicorn worker, say) can never serve a stale schedule.
+
+
+class ScheduleCache:
+    """
+    Two-tier cache of built event lists.
+      - L1: bounded in-process LRU, one slot per user holding up to
+        `max_windows` windows for that user's current version.
+      - L2 (optional): SQLite file shared by every worker on the host.
+        It holds only each user's latest version, at most `max_windows`
+        windows per user and `max_shared_rows` rows overall (least
+        recently used go first).
+    """
+
+    PRUNE_EVERY = 64   # shared puts between global row-cap checks
+
+    def __init__(self, max_users=512, max_windows=16, shared_path=None, max_shared_rows=10000):
+        self.max_users = max_users
+        self.max_windows = max_windows
+        self.shared_path = shared_path
+        self.max_shared_rows = max_shared_rows
+        self._shared_puts = 0
+        self._lru = OrderedDict()   # user_id -> (version, {window_key: events})
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        if shared_path:
+            self._create_shared()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_users=int(os.getenv("SCHEDULE_CACHE_SIZE", "512")),
+            max_windows=int(os.getenv("SCHEDULE_CACHE_WINDOWS", "16")),
+            shared_path=os.getenv("SCHEDULE_CACHE_PATH") or None,
+            max_shared_rows=int(os.getenv("SCHEDULE_CACHE_SHARED_ROWS", "10000")),
+        )
+
+    # ----- shared tier -----
+
+    def _shared(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.shared_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_shared(self):
+        conn = self._shared()
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(schedule_cache)")}
+        if columns and "used_at" not in columns:
+            conn.execute("DROP TABLE schedule_cache")   # file from an older release; it's only a cache
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schedule_cache ("
+            " user_id TEXT NOT NULL, window_key TEXT NOT NULL,"
+            " version INTEGER NOT NULL, payload TEXT NOT NULL, used_at REAL NOT NULL,"
+            " PRIMARY KEY (user_id, window_key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_schedule_cache_used_at ON schedule_cache (used_at)")
+
+    def _shared_get(self, user_id, window_key, version):
+        try:
+            conn = self._shared()
+            row = conn.execute(
+                "SELECT payload FROM schedule_cache WHERE user_id=? AND window_key=? AND version=?",
+                (user_id, window_key, version),
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE schedule_cache SET used_at=? WHERE user_id=? AND window_key=?",
+                    (time.time(), user_id, window_key),
+                )
+        except sqlite3.Error as e:
+            print(f"[Schedule Cache] shared read failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _shared_put(self, user_id, window_key, version, events):
+        payload = json.dumps(events)
+        try:
+            conn = self._shared()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                # Older versions can never hit again
+                conn.execute("DELETE FROM schedule_cache WHERE user_id=? AND version<>?", (user_id, version))
+                conn.execute(
+                    "INSERT OR REPLACE INTO schedule_cache (user_id, window_key, version, payload, used_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (user_id, window_key, version, payload, time.time()),
+                )
+                conn.execute(
+                    "DELETE FROM schedule_cache WHERE user_id=? AND window_key NOT IN ("
+                    " SELECT window_key FROM schedule_cache WHERE user_id=? ORDER BY used_at DESC LIMIT ?)",
+                    (user_id, user_id, self.max_windows),
+                )
+        except sqlite3.Error as e:
+            print(f"[Schedule Cache] shared write failed: {e}")
+            return
+
+        with self._lock:
+            self._shared_puts += 1
+            prune = self._shared_puts % self.PRUNE_EVERY == 0
+        if prune:
+            self._shared_prune()
+
+    def _shared_prune(self):
+        """Drop the least recently used rows beyond max_shared_rows."""
+        try:
+            self._shared().execute(
+                "DELETE FROM schedule_cache WHERE rowid IN ("
+                " SELECT rowid FROM schedule_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_shared_rows,),
+            )
+        except sqlite3.Error as e:
+            print(f"[Schedule Cache] shared prune failed: {e}")
+
+    def _shared_delete(self, user_id):
+        try:
+            self._shared().execute("DELETE FROM schedule_cache WHERE user_id=?", (user_id,))
+        except sqlite3.Error as e:
+            print(f"[Schedule Cache] shared delete failed: {e}")
+
+    # ----- public API -----
+
+    def get(self, user_id, version, window_key):
+        with self._lock:
+            slot = self._lru.get(user_id)
+            if slot and slot[0] == version and window_key in slot[1]:
+                self._lru.move_to_end(user_id)
+                self.hits += 1
+                return slot[1][window_key]
+
+        if self.shared_path:
+            events = self._shared_get(user_id, window_key, version)
+            if events is not None:
+                self._remember(user_id, version, window_key, events)
+                with self._lock:
+                    self.shared_hits += 1
+                return events
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, user_id, version, window_key, events):
+        self._remember(user_id, version, window_key, events)
+        if self.shared_path:
+            self._shared_put(user_id, window_key, version, events)
+
+    def _remember(self, user_id, version, window_key, events):
+        with self._lock:
+            slot = self._lru.get(user_id)
+            if not slot or slot[0] != version:
+                slot = (version, OrderedDict())
+                self._lru[user_id] = slot
+            windows = slot[1]
+            windows[window_key] = events
+            windows.move_to_end(window_key)
+            while len(windows) > self.max_windows:
+                windows.popitem(last=False)
+            self._lru.move_to_end(user_id)
+            while len(self._lru) > self.max_users:
+                self._lru.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Drop every cached window for a user. Call after committing a write."""
+        with self._lock:
+            self._lru.pop(user_id, None)
+            self.invalidations += 1
+        if self.shared_path:
+            self._shared_delete(user_id)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+                "users": len(self._lru),
+                "max_users": self.max_users,
+                "shared": bool(self.shared_path),
+            }
+
+
+schedule_cache = ScheduleCache.from_env()
@@ -0,0 +1,43 @@
+import hashlib
+import uuid
+from flask import request, jsonify, make_response
+from db.models import User
+
+# Fixed namespace so generated event IDs are identical across processes and restarts
+EVENT_NAMESPACE = uuid.UUID("6f1c1a52-3b7e-4c55-9a43-0d2f6b8e4a17")
+
+
+def stable_event_id(class_id, kind, key, occurrence) -> str:
+    """Deterministic ID for a generated event: same class/item/date -> same ID."""
+    return str(uuid.uuid5(EVENT_NAMESPACE, f"{class_id}/{kind}/{key}/{occurrence}"))
+
+
+def bump_schedule_version(db, user_id):
+    """
+    Mark a user's classes/schedule as changed. Call inside the same
+    transaction as the write, before db.commit().
+    """
+    db.query(User).filter_by(id=user_id).update(
+        {User.schedule_version: User.schedule_version + 1},
+        synchronize_session=False,
+    )
+
+
+def schedule_etag(user, *parts) -> str:
+    """Opaque ETag for one representation of a user's data at its current version."""
+    raw = "|".join([user.id, str(user.schedule_version or 0)] + [str(p) for p in parts])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def conditional_json(etag, build):
+    """
+    Answer 304 if the client already holds `etag`; otherwise call build()
+    and return its result as JSON tagged with the ETag.
+    """
+    if request.if_none_match.contains_weak(etag):
+        resp = make_response("", 304)
+    else:
+        resp = jsonify(build())
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Run from backend/ (python -m pytest tests). Point the app at a throwaway
+# database before anything imports db.base.
+_workdir = tempfile.mkdtemp(prefix="buttons-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ.setdefault("SESSION_SECRET", "test-secret")
+os.environ.setdefault("OPENAI_API_KEY", "test-no-network")
+os.environ.pop("SCHEDULE_CACHE_PATH", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
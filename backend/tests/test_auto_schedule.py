@@ -0,0 +1,27 @@
+from sqlalchemy import event
+from benchmarks.data import seed_users
+from db.base import SessionLocal, engine
+from db.models import Base, User
+from services.ai_scheduler import ai_schedule_for_user
+
+
+def test_new_sessions_and_version_bump_commit_together():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    if not db.get(User, "bench-user-0"):
+        seed_users(db, classes=3, meetings=2, assignments=4, events=2)
+    user = db.get(User, "bench-user-0")
+    before = user.schedule_version
+
+    seen = []
+
+    @event.listens_for(db, "before_commit")
+    def record(session):
+        seen.append(session.query(User.schedule_version).filter_by(id=user.id).scalar())
+
+    try:
+        result = ai_schedule_for_user(user, settings={"planner": "local"}, db=db)
+        assert result["success"] and result["added"]
+        assert seen == [before + 1]
+    finally:
+        db.close()
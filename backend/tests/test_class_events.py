@@ -0,0 +1,64 @@
+import uuid
+from app import app
+from db.base import SessionLocal
+from db.models import Class, Event, User
+from services.auth import issue_session_token
+
+
+def auth(user_id):
+    return {"Authorization": "Bearer " + issue_session_token({"id": user_id, "email": f"{user_id}@example.edu"})}
+
+
+def setup_module():
+    db = SessionLocal()
+    for user_id in ("sync-a", "sync-b"):
+        if not db.get(User, user_id):
+            db.add(User(id=user_id, email=f"{user_id}@example.edu", name=user_id))
+    db.commit()
+    db.close()
+
+
+def add_class(user_id):
+    db = SessionLocal()
+    c = Class(id=str(uuid.uuid4()), user_id=user_id, code="SYNC 1")
+    db.add(c)
+    db.commit()
+    class_id = c.id
+    db.close()
+    return class_id
+
+
+def put_events(user_id, class_id, events):
+    return app.test_client().put(f"/api/classes/{class_id}", json={"custom_events": events}, headers=auth(user_id))
+
+
+def events_of(class_id):
+    db = SessionLocal()
+    rows = {e.id: e.title for e in db.query(Event).filter_by(class_id=class_id)}
+    db.close()
+    return rows
+
+
+def test_keeps_own_ids_and_drops_removed():
+    class_id = add_class("sync-a")
+    assert put_events("sync-a", class_id, [{"title": "One", "start": "2026-09-01T10:00"},
+                                           {"title": "Two", "start": "2026-09-02T10:00"}]).status_code == 200
+    ids = events_of(class_id)
+    one = next(i for i, t in ids.items() if t == "One")
+    assert put_events("sync-a", class_id, [{"id": one, "title": "One!", "start": "2026-09-01T11:00"}]).status_code == 200
+    assert events_of(class_id) == {one: "One!"}
+
+
+def test_foreign_id_gets_a_fresh_primary_key():
+    theirs = add_class("sync-b")
+    put_events("sync-b", theirs, [{"title": "Theirs", "start": "2026-09-01T10:00"}])
+    (their_id,) = events_of(theirs)
+
+    mine = add_class("sync-a")
+    resp = put_events("sync-a", mine, [{"id": their_id, "title": "Mine", "start": "2026-09-03T10:00"},
+                                       {"id": "client-picked", "title": "Also mine", "start": "2026-09-04T10:00"}])
+    assert resp.status_code == 200
+    created = events_of(mine)
+    assert sorted(created.values()) == ["Also mine", "Mine"]
+    assert their_id not in created and "client-picked" not in created
+    assert events_of(theirs) == {their_id: "Theirs"}
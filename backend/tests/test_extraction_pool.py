@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+import pytest
+from services.extraction_pool import ExtractionPool, ExtractionFailed, ExtractionTimeout
+
+
+def sleep_job(path, filename):
+    """Test job: `path` is how long to take, `filename` is echoed back as the text."""
+    if filename == "boom":
+        raise ValueError("unreadable")
+    time.sleep(float(path))
+    return f"{filename}:{os.getpid()}", 1.0
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**kwargs):
+        kwargs.setdefault("job", sleep_job)
+        pool = ExtractionPool(**kwargs)
+        pools.append(pool)
+        return pool
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def run_concurrently(pool, jobs):
+    """Run (delay, path, filename) jobs on their own threads; {filename: text or exception}."""
+    results = {}
+
+    def run(delay, path, filename):
+        time.sleep(delay)
+        try:
+            results[filename] = pool.extract(path, filename)
+        except Exception as e:
+            results[filename] = e
+
+    threads = [threading.Thread(target=run, args=job) for job in jobs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_timeout_kills_only_the_stuck_job(make_pool):
+    pool = make_pool(workers=2, timeout=1.0)
+    # "fast" is still running when "slow" times out
+    results = run_concurrently(pool, [(0, "5", "slow"), (0.6, "0.8", "fast")])
+    assert isinstance(results["slow"], ExtractionTimeout)
+    assert results["fast"].startswith("fast:")
+    assert pool.stats["timeouts"] == 1
+    assert pool.stats["completed"] == 1
+
+
+def test_time_waiting_for_a_worker_does_not_count(make_pool):
+    pool = make_pool(workers=1, timeout=1.0)
+    results = run_concurrently(pool, [(0, "0.7", "a"), (0, "0.7", "b")])
+    assert results["a"].startswith("a:")
+    assert results["b"].startswith("b:")
+
+
+def test_workers_are_reused_then_recycled(make_pool):
+    pool = make_pool(workers=1, max_jobs_per_worker=2)
+    pids = [pool.extract("0", f"f{i}").split(":")[1] for i in range(3)]
+    assert pids[0] == pids[1] != pids[2]
+    assert pool.stats["recycled"] == 1
+
+
+def test_job_error_is_reported_and_worker_kept(make_pool):
+    pool = make_pool(workers=1)
+    with pytest.raises(ExtractionFailed):
+        pool.extract("0", "boom")
+    first = pool.extract("0", "ok").split(":")[1]
+    assert pool.extract("0", "ok").split(":")[1] == first
+    assert pool.stats["failures"] == 1
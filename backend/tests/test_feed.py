@@ -0,0 +1,57 @@
+import pytest
+from itsdangerous import URLSafeSerializer
+from app import app
+from db.base import SessionLocal
+from db.models import User
+from services.auth import FEED_SALT, SESSION_SECRET, issue_session_token
+
+
+@pytest.fixture
+def client():
+    db = SessionLocal()
+    user = db.get(User, "feed-user")
+    if not user:
+        user = User(id="feed-user", email="feed@example.edu", name="Feed")
+        db.add(user)
+    user.feed_nonce = None
+    db.commit()
+    db.close()
+    return app.test_client()
+
+
+def auth():
+    return {"Authorization": "Bearer " + issue_session_token({"id": "feed-user", "email": "feed@example.edu"})}
+
+
+def feed_path(url):
+    return url[url.index("/api/"):]
+
+
+def test_feed_url_serves_calendar(client):
+    url = client.get("/api/schedule/feed", headers=auth()).get_json()["url"]
+    resp = client.get(feed_path(url))
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/calendar"
+
+
+def test_rotate_revokes_earlier_urls(client):
+    old = client.get("/api/schedule/feed", headers=auth()).get_json()["url"]
+    new = client.post("/api/schedule/feed/rotate", headers=auth()).get_json()["url"]
+    assert new != old
+    assert client.get(feed_path(old)).status_code == 404
+    assert client.get(feed_path(new)).status_code == 200
+
+    newer = client.post("/api/schedule/feed/rotate", headers=auth()).get_json()["url"]
+    assert client.get(feed_path(new)).status_code == 404
+    assert client.get(feed_path(newer)).status_code == 200
+
+
+def test_legacy_bare_id_token_works_until_first_rotation(client):
+    legacy = URLSafeSerializer(SESSION_SECRET, salt=FEED_SALT).dumps("feed-user")
+    assert client.get(f"/api/schedule/feed/{legacy}.ics").status_code == 200
+    client.post("/api/schedule/feed/rotate", headers=auth())
+    assert client.get(f"/api/schedule/feed/{legacy}.ics").status_code == 404
+
+
+def test_rotate_requires_login(client):
+    assert client.post("/api/schedule/feed/rotate").status_code == 401
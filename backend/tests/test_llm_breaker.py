@@ -0,0 +1,114 @@
+import types
+import httpx
+import openai
+import pytest
+from services.llm import LLMGateway, CircuitBreaker, LLMUnavailable, LLMTimeout
+
+
+def _status_error(cls, status):
+    request = httpx.Request("POST", "http://llm.test/v1/chat/completions")
+    return cls("error", response=httpx.Response(status, request=request), body=None)
+
+
+class FakeCompletions:
+    """Plays back `outcomes` in order: an exception to raise or a value to return."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def create(self, timeout=None, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+def gateway(outcomes, threshold=1):
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=FakeCompletions(outcomes)))
+    breaker = CircuitBreaker(threshold=threshold, cooldown=0)
+    return LLMGateway(client=client, max_retries=0, breaker=breaker)
+
+
+def _open(gw):
+    """Trip the breaker with one transient failure; cooldown 0 makes it half-open at once."""
+    with pytest.raises(openai.InternalServerError):
+        gw.chat(route="test", model="m", messages=[])
+    assert gw.breaker.state == "half_open"
+
+
+def _reply():
+    return types.SimpleNamespace(usage=None)
+
+
+def test_bad_request_probe_closes_breaker():
+    gw = gateway([_status_error(openai.InternalServerError, 500),
+                  _status_error(openai.BadRequestError, 400),
+                  _reply()])
+    _open(gw)
+    with pytest.raises(openai.BadRequestError):
+        gw.chat(route="test", model="m", messages=[])
+    assert gw.breaker.state == "closed"
+    assert gw.chat(route="test", model="m", messages=[]) is not None
+
+
+def test_transient_probe_failure_reopens_and_next_probe_is_allowed():
+    gw = gateway([_status_error(openai.InternalServerError, 500),
+                  _status_error(openai.InternalServerError, 500),
+                  _reply()])
+    _open(gw)
+    with pytest.raises(openai.InternalServerError):
+        gw.chat(route="test", model="m", messages=[])
+    assert gw.chat(route="test", model="m", messages=[]) is not None
+    assert gw.breaker.state == "closed"
+
+
+def test_timeout_before_probe_does_not_wedge_breaker():
+    gw = gateway([_status_error(openai.InternalServerError, 500), _reply()])
+    _open(gw)
+    with pytest.raises(LLMTimeout):
+        gw.chat(route="test", model="m", messages=[], timeout=-1)
+    assert not gw.breaker._probing
+    assert gw.chat(route="test", model="m", messages=[]) is not None
+
+
+def test_unexpected_error_releases_probe():
+    gw = gateway([_status_error(openai.InternalServerError, 500), KeyboardInterrupt(), _reply()])
+    _open(gw)
+    with pytest.raises(KeyboardInterrupt):
+        gw.chat(route="test", model="m", messages=[])
+    assert not gw.breaker._probing
+    assert gw.chat(route="test", model="m", messages=[]) is not None
+
+
+def test_stream_closed_by_client_releases_probe_without_verdict():
+    stream = FakeStream([types.SimpleNamespace(usage=None)] * 3)
+    gw = gateway([_status_error(openai.InternalServerError, 500), stream, _reply()])
+    _open(gw)
+    chunks = gw.stream_chat(route="test", model="m", messages=[])
+    next(chunks)
+    chunks.close()   # client disconnected
+    assert stream.closed
+    assert not gw.breaker._probing
+    assert gw.breaker.state == "half_open"
+    assert gw.chat(route="test", model="m", messages=[]) is not None
+
+
+def test_open_breaker_rejects_calls():
+    breaker = CircuitBreaker(threshold=1, cooldown=60)
+    breaker.record_failure()
+    assert breaker.allow() is None
+    gw = LLMGateway(client=object(), breaker=breaker)
+    with pytest.raises(LLMUnavailable):
+        gw.chat(route="test", model="m", messages=[])
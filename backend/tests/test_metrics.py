@@ -0,0 +1,17 @@
+import routes.metrics_routes as metrics_routes
+from app import app
+
+
+def test_metrics_off_without_token(monkeypatch):
+    monkeypatch.setattr(metrics_routes, "METRICS_TOKEN", None)
+    assert app.test_client().get("/api/metrics").status_code == 404
+
+
+def test_metrics_require_the_token(monkeypatch):
+    monkeypatch.setattr(metrics_routes, "METRICS_TOKEN", "s3cret")
+    client = app.test_client()
+    assert client.get("/api/metrics").status_code == 401
+    assert client.get("/api/metrics", headers={"Authorization": "Bearer nope"}).status_code == 401
+    resp = client.get("/api/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert resp.status_code == 200
+    assert b"schedule_cache_lookups_total" in resp.data
@@ -0,0 +1,81 @@
+import threading
+import uuid
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, text
+from db.base import SessionLocal, engine
+from db.models import Base, Class, Event, User
+from db.migrations import _add_column, migrate_custom_events
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    if not session.get(User, "mig-user"):
+        session.add(User(id="mig-user", email="mig@example.edu", name="Mig"))
+        session.commit()
+    yield session
+    session.query(Event).filter(Event.user_id == "mig-user").delete()
+    session.query(Class).filter(Class.user_id == "mig-user").delete()
+    session.commit()
+    session.close()
+
+
+def add_class(db, event_ids):
+    c = Class(id=str(uuid.uuid4()), user_id="mig-user", code="MIG 101", custom_events=[
+        {"id": eid, "title": "Study", "start": "2026-09-01T10:00:00"} for eid in event_ids
+    ])
+    db.add(c)
+    db.commit()
+    return c
+
+
+def test_moves_blob_into_events(db):
+    c = add_class(db, ["mig-a", "mig-b"])
+    migrate_custom_events(engine)
+    db.expire_all()
+    assert {e.id for e in db.query(Event).filter(Event.user_id == "mig-user")} == {"mig-a", "mig-b"}
+    assert db.get(Class, c.id).custom_events == []
+
+
+def test_rows_already_written_by_another_worker_are_skipped(db):
+    c = add_class(db, ["mig-a", "mig-b"])
+    # Another worker read the same blob and committed one of its rows first
+    db.add(Event(id="mig-a", user_id="mig-user", class_id=c.id, title="Study",
+                 start=datetime(2026, 9, 1, 10)))
+    db.commit()
+
+    migrate_custom_events(engine)
+    db.expire_all()
+    assert {e.id for e in db.query(Event).filter(Event.user_id == "mig-user")} == {"mig-a", "mig-b"}
+    assert db.get(Class, c.id).custom_events == []
+
+
+def test_concurrent_runs_do_not_crash(db):
+    add_class(db, [f"mig-{i}" for i in range(50)])
+    errors = []
+
+    def run():
+        try:
+            migrate_custom_events(engine)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert db.query(Event).filter(Event.user_id == "mig-user").count() == 50
+
+
+def test_add_column_tolerates_column_added_meanwhile(tmp_path):
+    other = create_engine(f"sqlite:///{tmp_path / 'cols.db'}")
+    with other.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+    _add_column(other, "t", "extra", "VARCHAR")
+    _add_column(other, "t", "extra", "VARCHAR")   # lost the race: already there
+    with other.connect() as conn:
+        assert "extra" in [row[1] for row in conn.execute(text("PRAGMA table_info(t)"))]
@@ -0,0 +1,78 @@
+import threading
+from datetime import timedelta
+import pytest
+from db.base import SessionLocal, engine
+from db.models import Base, ParseCache, utcnow
+import services.parse_cache as parse_cache
+from services.parse_cache import evict, get_cached_parse, store_parse
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.query(ParseCache).delete()
+    session.commit()
+    session.close()
+
+
+def add_entry(db, key, last_used, created=None):
+    db.add(ParseCache(key=key, result={"title": key}, created_at=created or utcnow(),
+                      last_used_at=last_used, hits=0))
+    db.commit()
+
+
+def test_evict_drops_least_recently_used_beyond_cap(db, monkeypatch):
+    monkeypatch.setattr(parse_cache, "PARSE_CACHE_MAX_ENTRIES", 2)
+    now = utcnow()
+    for i in range(4):
+        add_entry(db, f"k{i}", now - timedelta(minutes=10 - i))   # k0 is the oldest
+    evict(db, now)
+    assert {k for (k,) in db.query(ParseCache.key)} == {"k2", "k3"}
+
+
+def test_evict_drops_expired(db):
+    now = utcnow()
+    add_entry(db, "old", now, created=now - parse_cache.PARSE_CACHE_TTL - timedelta(seconds=1))
+    add_entry(db, "fresh", now)
+    evict(db, now)
+    assert {k for (k,) in db.query(ParseCache.key)} == {"fresh"}
+
+
+def test_hit_updates_usage(db):
+    store_parse(db, "k", {"title": "Biology"})
+    assert get_cached_parse(db, "k") == {"title": "Biology"}
+    row = db.get(ParseCache, "k")
+    assert row.hits == 1
+    assert abs(row.last_used_at - utcnow()) < timedelta(minutes=1)
+
+
+def test_store_refreshes_an_existing_entry(db):
+    store_parse(db, "k", {"title": "Old"})
+    store_parse(db, "k", {"title": "New"})
+    db.expire_all()
+    assert db.get(ParseCache, "k").result == {"title": "New"}
+
+
+def test_concurrent_stores_of_the_same_key(db):
+    barrier = threading.Barrier(6)
+    errors = []
+
+    def store():
+        session = SessionLocal()
+        try:
+            barrier.wait()
+            store_parse(session, "same", {"title": "Biology"})
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=store) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert db.query(ParseCache).filter_by(key="same").count() == 1
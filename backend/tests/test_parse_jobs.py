@@ -0,0 +1,91 @@
+import subprocess
+import sys
+import uuid
+from datetime import timedelta
+import pytest
+from db.base import SessionLocal, engine
+from db.models import Base, ParseJob, User, utcnow
+import services.parse_jobs as parse_jobs
+from services.parse_jobs import worker_id, owner_alive, fail_if_orphaned, resume_pending_jobs
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    if not session.get(User, "jobs-user"):
+        session.add(User(id="jobs-user", email="jobs@example.edu", name="Jobs"))
+        session.commit()
+    yield session
+    session.query(ParseJob).delete()
+    session.commit()
+    session.close()
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    calls = []
+    monkeypatch.setattr(parse_jobs._executor, "submit", lambda fn, job_id: calls.append(job_id))
+    return calls
+
+
+def dead_worker_id():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return f"{parse_jobs._HOST}:{proc.pid}:deadbeef"
+
+
+def add_job(db, status="running", owner=None, age=timedelta(0), upload_path=None):
+    now = utcnow() - age
+    job = ParseJob(id=str(uuid.uuid4()), user_id="jobs-user", filename="s.pdf", upload_path=upload_path,
+                   status=status, stage="parsing" if status == "running" else None, progress=40,
+                   worker_id=owner, created_at=now, updated_at=now)
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_owner_alive():
+    assert owner_alive(worker_id()) is True
+    assert owner_alive(dead_worker_id()) is False
+    assert owner_alive("some-other-host:123:abcd") is None
+    # Same pid, earlier boot: a restarted process that happened to reuse our pid
+    assert owner_alive(f"{parse_jobs._HOST}:{parse_jobs.os.getpid()}:00000000") is False
+
+
+def test_restart_requeues_job_of_dead_process_even_if_recent(db, submitted, tmp_path):
+    upload = tmp_path / "s.pdf"
+    upload.write_bytes(b"%PDF")
+    job = add_job(db, owner=dead_worker_id(), upload_path=str(upload))
+    resume_pending_jobs()
+    db.refresh(job)
+    assert job.status == "queued" and job.worker_id is None
+    assert submitted == [job.id]
+
+
+def test_restart_fails_dead_job_without_upload(db, submitted):
+    job = add_job(db, owner=dead_worker_id(), upload_path="/nonexistent/s.pdf")
+    resume_pending_jobs()
+    db.refresh(job)
+    assert job.status == "failed"
+    assert submitted == []
+
+
+def test_restart_leaves_live_and_recent_remote_jobs_alone(db, submitted):
+    mine = add_job(db, owner=worker_id())
+    remote = add_job(db, owner="some-other-host:123:abcd")
+    resume_pending_jobs()
+    db.refresh(mine)
+    db.refresh(remote)
+    assert (mine.status, remote.status) == ("running", "running")
+
+
+def test_status_poll_fails_orphaned_jobs(db):
+    dead = add_job(db, owner=dead_worker_id())
+    stale_remote = add_job(db, owner="some-other-host:123:abcd", age=parse_jobs.PARSE_JOB_STALE_AFTER * 2)
+    live = add_job(db, owner=worker_id())
+    for job in (dead, stale_remote, live):
+        fail_if_orphaned(db, job)
+    assert dead.status == "failed" and dead.error
+    assert stale_remote.status == "failed"
+    assert live.status == "running"
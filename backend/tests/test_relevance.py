@@ -0,0 +1,42 @@
+import types
+from services.relevance import classify, check_relevance, user_vocabulary, VerdictCache
+import services.relevance as relevance
+
+
+def test_time_words_alone_are_not_a_yes():
+    assert classify("what time is the superbowl tonight") == (None, False)
+    assert classify("what are you doing next week") == (None, False)
+
+
+def test_off_topic_with_positive_score_goes_to_llm():
+    assert classify("nfl game next week") == (None, False)
+    assert classify("final game tonight") == (None, False)
+    assert classify("weather for my exam tomorrow") == (None, False)
+
+
+def test_clear_cases_are_still_local():
+    assert classify("when is the midterm") == ("yes", True)
+    assert classify("homework due friday") == ("yes", True)
+    assert classify("tell me a joke") == ("no", False)
+    assert classify("best pizza restaurant downtown") == ("no", False)
+
+
+def test_personal_terms_count_but_are_not_generic():
+    vocab = user_vocabulary([types.SimpleNamespace(code="CS 225", title="Data Structures",
+                                                   instructor="Evans", assignments=[], exams=[])])
+    assert classify("when does cs225 meet", vocab) == ("yes", False)
+    assert classify("what time is evans tomorrow", vocab) == ("yes", False)
+
+
+def test_mixed_messages_are_never_cached_as_generic_yes(monkeypatch):
+    monkeypatch.setattr(relevance, "verdict_cache", VerdictCache())
+    calls = []
+
+    def llm_check(message):
+        calls.append(message)
+        return False
+
+    assert check_relevance("what time is the superbowl tonight", [], llm_check) == (False, "llm")
+    assert check_relevance("nfl game next week", [], llm_check) == (False, "llm")
+    assert calls == ["what time is the superbowl tonight", "nfl game next week"]
+    assert relevance.verdict_cache.get("nfl game next week") == "no"
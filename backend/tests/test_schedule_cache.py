@@ -0,0 +1,54 @@
+import sqlite3
+from services.schedule_cache import ScheduleCache
+
+
+def shared_rows(path):
+    with sqlite3.connect(path) as conn:
+        return sorted(conn.execute("SELECT user_id, window_key, version FROM schedule_cache"))
+
+
+def test_shared_tier_keeps_only_the_latest_version(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ScheduleCache(shared_path=path)
+    cache.put("u1", 1, "w1", [{"id": 1}])
+    cache.put("u1", 1, "w2", [{"id": 2}])
+    cache.put("u1", 2, "w3", [{"id": 3}])
+    assert shared_rows(path) == [("u1", "w3", 2)]
+
+
+def test_shared_tier_caps_windows_per_user(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ScheduleCache(max_windows=3, shared_path=path)
+    for i in range(10):
+        cache.put("u1", 1, f"w{i}", [])
+    assert [w for _, w, _ in shared_rows(path)] == ["w7", "w8", "w9"]
+
+
+def test_shared_tier_caps_rows_overall(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ScheduleCache(shared_path=path, max_shared_rows=50)
+    for i in range(ScheduleCache.PRUNE_EVERY * 2):
+        cache.put(f"u{i}", 1, "w", [])
+    rows = shared_rows(path)
+    assert len(rows) == 50
+    # The most recently written users survive
+    assert ("u127", "w", 1) in rows and ("u0", "w", 1) not in rows
+
+
+def test_shared_hit_from_another_process(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ScheduleCache(shared_path=path).put("u1", 4, "w", [{"id": 1}])
+    other = ScheduleCache(shared_path=path)
+    assert other.get("u1", 4, "w") == [{"id": 1}]
+    assert other.get("u1", 5, "w") is None
+    assert other.stats()["shared_hits"] == 1
+
+
+def test_table_from_older_release_is_replaced(tmp_path):
+    path = str(tmp_path / "cache.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE schedule_cache (user_id TEXT, window_key TEXT, version INTEGER,"
+                     " payload TEXT, PRIMARY KEY (user_id, window_key))")
+    cache = ScheduleCache(shared_path=path)
+    cache.put("u1", 1, "w", [])
+    assert shared_rows(path) == [("u1", "w", 1)]
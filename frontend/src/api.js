@@ -1,24 +1,35 @@
 // Centralized API base URL (auto-switches between dev + production)
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || "http://localhost:5000";
 
-// Generic JSON request helper
-export async function apiFetch(path, { method = "GET", body, headers } = {}) {
+// Session token issued by /auth/google (stored with the user at login)
+function authHeaders() {
   const user = JSON.parse(localStorage.getItem("user")) || {};
+  return user.token ? { Authorization: `Bearer ${user.token}` } : {};
+}
+
+// Expired/invalid session (or one from before tokens existed): sign in again
+function handleUnauthorized(response) {
+  if (response.status === 401) {
+    localStorage.removeItem("user");
+    window.location.href = "/login";
+  }
+}
 
+// Generic JSON request helper
+export async function apiFetch(path, { method = "GET", body, headers } = {}) {
   try {
     const response = await fetch(`${API_BASE_URL}${path}`, {
       method,
       headers: {
         "Content-Type": "application/json",
-        "X-User-Id": user.id,
-        "X-User-Email": user.email,
-        "X-User-Name": user.name,
+        ...authHeaders(),
         ...headers,
       },
       body: body ? JSON.stringify(body) : undefined,
     });
 
     if (!response.ok) {
+      handleUnauthorized(response);
       const errorText = await response.text();
       console.error(`❌ API ${method} ${path} → ${response.status}`, errorText);
       throw new Error(`Request failed (${response.status}): ${errorText}`);
@@ -33,22 +44,18 @@ export async function apiFetch(path, { method = "GET", body, headers } = {}) {
 
 // File upload helper (for syllabus uploads, etc.)
 export async function apiUpload(path, file) {
-  const user = JSON.parse(localStorage.getItem("user")) || {};
   const formData = new FormData();
   formData.append("file", file);
 
   try {
     const response = await fetch(`${API_BASE_URL}${path}`, {
       method: "POST",
-      headers: {
-        "X-User-Id": user.id,
-        "X-User-Email": user.email,
-        "X-User-Name": user.name,
-      },
+      headers: authHeaders(),
       body: formData,
     });
 
     if (!response.ok) {
+      handleUnauthorized(response);
       const errorText = await response.text();
       console.error(`❌ Upload Error ${path} → ${response.status}`, errorText);
       throw new Error(`Upload failed: ${errorText}`);
@@ -60,3 +67,53 @@ export async function apiUpload(path, file) {
     return { error: true, message: err.message };
   }
 }
+
+// Streaming helper for Server-Sent Events endpoints (POST, so EventSource can't be used).
+// Calls onToken(text) for each `token` frame; resolves on `done`, throws on `error`.
+// Abort `signal` to cancel — the backend then stops generating.
+export async function apiStream(path, body, { onToken, signal } = {}) {
+  const response = await fetch(`${API_BASE_URL}${path}`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "text/event-stream",
+      ...authHeaders(),
+    },
+    body: JSON.stringify(body),
+    signal,
+  });
+
+  if (!response.ok) {
+    handleUnauthorized(response);
+    const errorText = await response.text();
+    throw new Error(`Request failed (${response.status}): ${errorText}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      const payload = data ? JSON.parse(data) : {};
+
+      if (event === "token") onToken?.(payload.text);
+      else if (event === "error") throw new Error(payload.error);
+      else if (event === "done") return;
+    }
+  }
+}
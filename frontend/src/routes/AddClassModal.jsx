@@ -3,6 +3,9 @@ import { apiUpload, apiFetch } from "../api";
 import { Upload, FileText, Sparkles, ChevronLeft } from "lucide-react";
 import "../styles/AddClassModal.css";
 
+const PARSE_POLL_INTERVAL_MS = 1000;
+const PARSE_POLL_TIMEOUT_MS = 3 * 60 * 1000;
+
 export default function AddClassModal({ open, onClose, onCreated }) {
   const [step, setStep] = useState("upload");
   const [loading, setLoading] = useState(false);
@@ -25,16 +28,33 @@ export default function AddClassModal({ open, onClose, onCreated }) {
   const handleFile = async (file) => {
     setError("");
     setLoading(true);
-    
-    // Simulate minimum loading time for better UX
-    const [out] = await Promise.all([
-      apiUpload("/api/classes/parse", file),
-      new Promise(resolve => setTimeout(resolve, 1500))
-    ]);
-    
-    setLoading(false);
-    
-    if (out.error) return setError(out.error);
+
+    let out;
+    try {
+      // Simulate minimum loading time for better UX
+      const [job] = await Promise.all([
+        apiUpload("/api/classes/parse", file),
+        new Promise(resolve => setTimeout(resolve, 1500))
+      ]);
+
+      // Parsing runs in the background; poll until the draft is ready (or we give up)
+      out = job;
+      const deadline = Date.now() + PARSE_POLL_TIMEOUT_MS;
+      while (!out.error && (out.status === "queued" || out.status === "running")) {
+        if (Date.now() > deadline) {
+          out = { error: true, message: "Parsing is taking too long. Please try again." };
+          break;
+        }
+        await new Promise(resolve => setTimeout(resolve, PARSE_POLL_INTERVAL_MS));
+        out = await apiFetch(`/api/classes/parse/${job.job_id}`);
+      }
+    } catch (err) {
+      out = { error: true, message: err.message || "Upload failed" };
+    } finally {
+      setLoading(false);
+    }
+
+    if (out.error) return setError(out.message || out.error);
 
     const draft = out.draft || {};
     setForm((prev) => ({
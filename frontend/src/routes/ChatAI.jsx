@@ -2,7 +2,7 @@ import "../styles/ChatAI.css";
 import "../styles/Dashboard.css";
 import { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
-import { apiFetch } from "../api";
+import { apiStream } from "../api";
 import { Sparkles, LogOut, BookOpen, Calendar, MessageSquare, Send } from "lucide-react";
 
 export default function ChatAI() {
@@ -14,6 +14,10 @@ export default function ChatAI() {
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
   const chatEndRef = useRef(null);
+  const abortRef = useRef(null);
+
+  // Stop any in-flight reply when leaving the page
+  useEffect(() => () => abortRef.current?.abort(), []);
 
   const scrollToBottom = () => {
     chatEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -27,19 +31,29 @@ export default function ChatAI() {
     setMessages((prev) => [...prev, { role: "user", content: userMsg }]);
     setInput("");
     setLoading(true);
+    setMessages((prev) => [...prev, { role: "assistant", content: "" }]);
+
+    const appendToReply = (text) =>
+      setMessages((prev) => {
+        const next = [...prev];
+        const last = next[next.length - 1];
+        next[next.length - 1] = { ...last, content: last.content + text };
+        return next;
+      });
+
+    const controller = new AbortController();
+    abortRef.current = controller;
     try {
-      const res = await apiFetch("/api/chat", {
-        method: "POST",
-        body: { message: userMsg },
+      await apiStream("/api/chat/stream", { message: userMsg }, {
+        onToken: appendToReply,
+        signal: controller.signal,
       });
-      if (res.reply) {
-        setMessages((prev) => [...prev, { role: "assistant", content: res.reply }]);
-      } else {
-        setMessages((prev) => [...prev, { role: "assistant", content: "Sorry, I couldn't process that right now." }]);
-      }
     } catch (err) {
-      setMessages((prev) => [...prev, { role: "assistant", content: "⚠️ Error: " + err.message }]);
+      if (err.name !== "AbortError") {
+        appendToReply("⚠️ Error: " + err.message);
+      }
     } finally {
+      abortRef.current = null;
       setLoading(false);
     }
   };
@@ -20,10 +20,18 @@ export default function Dashboard() {
   };
 
   const loadClasses = async () => {
-    const data = await apiFetch("/api/classes");
+    // Cards only need names; the Edit modal fetches the full class on open
+    const data = await apiFetch("/api/classes?summary=1");
     setClasses(data.classes || []);
   };
 
+  const openEditor = async (id) => {
+    const full = await apiFetch(`/api/classes/${id}`);
+    if (full.error) return;
+    setEditingClass(full);
+    setEditOpen(true);
+  };
+
   const handleDelete = async (id) => {
     if (!window.confirm("Are you sure you want to delete this class?")) return;
     await apiFetch(`/api/classes/${id}`, { method: "DELETE" });
@@ -109,10 +117,7 @@ export default function Dashboard() {
                     <div className="card-actions">
                       <button
                         className="icon-btn edit-btn"
-                        onClick={() => {
-                          setEditingClass(cls);
-                          setEditOpen(true);
-                        }}
+                        onClick={() => openEditor(cls.id)}
                         title="Edit class"
                       >
                         <Settings className="action-icon" />
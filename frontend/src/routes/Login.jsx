@@ -15,7 +15,8 @@ export default function Login() {
 
     const data = await res.json();
     if (data.success) {
-      localStorage.setItem("user", JSON.stringify(data.user));
+      // Keep the session token with the user so logging out clears both
+      localStorage.setItem("user", JSON.stringify({ ...data.user, token: data.token }));
       navigate("/dashboard");
     } else {
       alert("Login failed: " + data.error);
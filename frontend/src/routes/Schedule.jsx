@@ -1,7 +1,7 @@
 import { useEffect, useState, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { apiFetch } from "../api";
-import { Sparkles, LogOut, BookOpen, Calendar, MessageSquare, Settings, Bot, X } from "lucide-react";
+import { Sparkles, LogOut, BookOpen, Calendar, MessageSquare, Settings, Bot, X, Link, RotateCcw } from "lucide-react";
 import FullCalendar from "@fullcalendar/react";
 import dayGridPlugin from "@fullcalendar/daygrid";
 import timeGridPlugin from "@fullcalendar/timegrid";
@@ -27,6 +27,7 @@ export default function Schedule() {
   const navigate = useNavigate();
   const calendarRef = useRef();
   const [calendarVersion, setCalendarVersion] = useState(0);
+  const [range, setRange] = useState(null);
 
   const [settings, setSettings] = useState(() => {
     const saved = localStorage.getItem("aiSettings");
@@ -37,6 +38,7 @@ export default function Schedule() {
           endHour: "18:00",
           avoidWeekends: true,
           sessionsPerWeek: 3,
+          planner: "ai",
         };
   });
 
@@ -47,12 +49,16 @@ export default function Schedule() {
   };
 
   const loadEvents = async () => {
-    const data = await apiFetch("/api/schedule");
+    // Only ask for the dates the calendar is currently showing
+    const query = range
+      ? `?start=${encodeURIComponent(range.start)}&end=${encodeURIComponent(range.end)}`
+      : "";
+    const data = await apiFetch(`/api/schedule${query}`);
     setEvents((data && data.events) || []);
   };
 
   const loadClasses = async () => {
-    const data = await apiFetch("/api/classes");
+    const data = await apiFetch("/api/classes?fields=id,code,title");
     setClasses(data.classes || []);
   };
 
@@ -62,10 +68,21 @@ export default function Schedule() {
   };
 
   useEffect(() => {
-    loadEvents();
     loadClasses();
   }, []);
 
+  useEffect(() => {
+    if (range) loadEvents();
+  }, [range]);
+
+  const handleDatesSet = (info) => {
+    setRange((r) =>
+      r && r.start === info.startStr && r.end === info.endStr
+        ? r
+        : { start: info.startStr, end: info.endStr }
+    );
+  };
+
   const handleDateClick = (info) => {
     const start = `${info.dateStr}T09:00`;
     const end = `${info.dateStr}T10:00`;
@@ -157,6 +174,30 @@ export default function Schedule() {
   }
 };
 
+  const copyFeedUrl = async (res, message) => {
+    if (!res.url) {
+      alert(res.message || "Could not create a calendar feed.");
+      return;
+    }
+    try {
+      await navigator.clipboard.writeText(res.url);
+      alert(message);
+    } catch {
+      window.prompt("Subscribe to this URL from your calendar app:", res.url);
+    }
+  };
+
+  const handleSubscribe = async () => {
+    const res = await apiFetch("/api/schedule/feed");
+    await copyFeedUrl(res, "📋 Calendar feed URL copied. Add it in Google/Apple/Outlook Calendar under \"Subscribe from URL\".");
+  };
+
+  const handleResetFeed = async () => {
+    if (!window.confirm("Reset your calendar feed link? Calendars subscribed to the old link will stop updating.")) return;
+    const res = await apiFetch("/api/schedule/feed/rotate", { method: "POST" });
+    await copyFeedUrl(res, "📋 New calendar feed URL copied. The old link no longer works; re-subscribe with this one.");
+  };
+
   return (
     <div className="dashboard">
       {/* Navbar */}
@@ -225,6 +266,16 @@ export default function Schedule() {
                 Settings
               </button>
 
+              <button className="settings-btn" onClick={handleSubscribe}>
+                <Link className="btn-icon" />
+                Subscribe
+              </button>
+
+              <button className="settings-btn" onClick={handleResetFeed}>
+                <RotateCcw className="btn-icon" />
+                Reset feed link
+              </button>
+
               <button
                 className="ai-btn"
                 onClick={handleAutoSchedule}
@@ -257,6 +308,7 @@ export default function Schedule() {
                 right: "dayGridMonth,timeGridWeek,timeGridDay",
               }}
               events={events}
+              datesSet={handleDatesSet}
               selectable
               dateClick={handleDateClick}
               eventClick={handleEventClick}
@@ -398,6 +450,17 @@ export default function Schedule() {
                 />
               </div>
 
+              <div className="form-field">
+                <label>Planner</label>
+                <select
+                  value={settings.planner || "ai"}
+                  onChange={(e) => setSettings({ ...settings, planner: e.target.value })}
+                >
+                  <option value="ai">AI (GPT)</option>
+                  <option value="local">Instant (local)</option>
+                </select>
+              </div>
+
               <div className="form-field checkbox-field">
                 <label>
                   <input